@@ -0,0 +1,48 @@
+# Import packages
+import argparse
+import json
+import os
+
+# Import functions, classes
+from trading_desk.data_models import MainConfig, StrategyConfig
+from trading_desk.functions import KlineArchive
+from trading_desk.backtest import Backtester, load_price_history, load_archive_history, load_exchange_metadata
+
+
+# Main code
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay historical klines through the configured strategy.")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--data-dir", default=None, help="Directory with one '<SYMBOL>.csv' kline file per traded asset")
+    parser.add_argument("--archive-dir", default=None, help="KlineArchive root (alternative to --data-dir)")
+    parser.add_argument("--interval", default="1m", help="Archived kline interval to replay, e.g. '1m'")
+    parser.add_argument("--exchange-info", default=None, help="Saved '/fapi/v1/exchangeInfo' response (enables min order quantity checks)")
+    args = parser.parse_args()
+
+    # Configuration setup
+    with open(args.config) as f:
+        raw = json.load(f)
+    raw["strategyconfig"] = StrategyConfig(**raw["strategyconfig"])
+    raw.pop("exitconfig", None) # Intra-bar exits are not simulated
+    config = MainConfig(**raw)
+
+    # Data loading
+    if args.archive_dir:
+        history = load_archive_history(KlineArchive(root=args.archive_dir),
+                                       symbols=config.traded_assets,
+                                       interval=args.interval)
+    else:
+        history = load_price_history({symbol: os.path.join(args.data_dir, f"{symbol}.csv")
+                                      for symbol in config.traded_assets})
+
+    metadata = None
+    if args.exchange_info:
+        metadata = load_exchange_metadata(args.exchange_info, symbols=config.traded_assets)
+
+    # Backtest
+    result = Backtester(config=config,
+                        history=history,
+                        metadata=metadata).run()
+
+    for name, value in result.summary().items():
+        print(f"{name:<20} | {value:>20.6f}")
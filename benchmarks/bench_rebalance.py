@@ -0,0 +1,237 @@
+# Import packages
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+
+# Import functions, classes
+from trading_desk.data_models import MainConfig, StrategyConfig, ExitConfig
+from trading_desk import TradingDesk
+from trading_desk.simulator import ExchangeSimulator, FaultInjector
+from benchmarks.fake_binance import FakeBinance
+
+STEP_SPANS = ["step1", "step2", "step2.klines", "step2.positions", "step3", "step3.orders"]
+
+
+class RecordingScheduler:
+    """
+    Stands in for the scheduler passed to `run_strategy`: a failed rebalance calls `shutdown`.
+    """
+    def __init__(self):
+        self.failed = False
+
+
+    def shutdown(self,
+                 wait:bool=False):
+        self.failed = True
+
+
+def make_config(symbols,
+                is_mock:bool,
+                workdir:str,
+                fake,
+                strategy_name:str,
+                session_name:str):
+    n_side = max(1, len(symbols) // 5)
+
+    return MainConfig(session_name=session_name,
+                      tmux_session_name=session_name,
+                      description="Rebalance benchmark",
+                      is_mock=is_mock,
+                      traded_assets=symbols,
+                      n_traded_assets=len(symbols),
+                      init_capital=10000.0,
+                      strategyconfig=StrategyConfig(strategy_name=strategy_name,
+                                                    unit="m",
+                                                    every=1,
+                                                    n_asset_buy=n_side,
+                                                    n_asset_sell=n_side,
+                                                    asset_weight_type="equal"),
+                      exitconfig=ExitConfig(take_profit=None),
+                      kline_archive_dir=None,
+                      ledger_path=os.path.join(workdir, f"{session_name}.db"),
+                      gspread_mirror=False,
+                      state_dir=None,
+                      metrics_dir=os.path.join(workdir, "metrics"),
+                      rest_base_url=fake.base_url,
+                      ws_base_url=fake.ws_base_url)
+
+
+def stop_desk(desk:TradingDesk):
+    """
+    Stop the desk's background threads and close its ledger.
+    """
+    desk.kill_switch.stop()
+    desk.exit_poll_stop.set()
+    desk.price_stream.stop()
+    if desk.user_stream is not None:
+        desk.user_stream.stop()
+    if desk.ledger is not None:
+        desk.ledger.close()
+
+
+def read_last_summary(path:str):
+    with open(path) as f:
+        return json.loads(f.readlines()[-1])
+
+
+def bench_universe(n_symbols:int,
+                   is_mock:bool,
+                   rebalances:int,
+                   latency:float,
+                   strategy_name:str,
+                   workdir:str,
+                   exchange:str="fake",
+                   error_rates:dict=None):
+    """
+    Build a desk over `n_symbols` against a fresh FakeBinance (or ExchangeSimulator) and run `rebalances` timed
+    rebalances, then one more under tracemalloc for the peak memory.
+
+    The simulator fills through an order book and can inject `error_rates` ({"-1007": rate, ...}) into the
+    rebalances. Errors are only injected once the desk is built: startup (leverage, exchangeInfo) fails fast.
+    A rebalance failed by injected errors shuts the desk down, like in production: the remaining rebalances
+    are skipped and the failure is reported.
+    """
+    symbols = [f"SYM{i:03d}USDT" for i in range(n_symbols)]
+    if exchange == "simulator":
+        fake = ExchangeSimulator(symbols=symbols,
+                                 faults=FaultInjector(latency=latency, seed=n_symbols)).start()
+    else:
+        fake = FakeBinance(symbols=symbols, latency=latency).start()
+    session_name = f"bench_{'mock' if is_mock else 'live'}_{n_symbols}_{int(time.time()*1000)}"
+
+    try:
+        config = make_config(symbols=symbols,
+                             is_mock=is_mock,
+                             workdir=workdir,
+                             fake=fake,
+                             strategy_name=strategy_name,
+                             session_name=session_name)
+
+        start = time.perf_counter()
+        desk = TradingDesk(config=config,
+                           binance_api_key="bench",
+                           binance_secret_key="bench")
+        startup = time.perf_counter() - start
+        startup_requests, startup_weight = fake.stats()
+
+        if exchange == "simulator":
+            fake.faults = FaultInjector(latency=latency, error_rates=error_rates, seed=n_symbols)
+
+        desk.kline_close_delay = 0
+        desk.logger.setLevel(logging.ERROR)
+
+        scheduler = RecordingScheduler()
+        summary_path = os.path.join(config.metrics_dir, f"{session_name}.jsonl")
+
+        runs = []
+        failed = None
+        for i in range(rebalances + 1):
+            traced = i == rebalances
+            if traced:
+                tracemalloc.start()
+
+            fake.reset_stats()
+            start = time.perf_counter()
+            desk.run_strategy(scheduler=scheduler)
+            wall = time.perf_counter() - start
+            requests, weight = fake.stats()
+
+            peak = None
+            if traced:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+            if scheduler.failed:
+                if traced:
+                    tracemalloc.stop()
+                if not any((error_rates or {}).values()):
+                    raise RuntimeError(f"Rebalance {i} failed for {n_symbols} symbols. See logs/{session_name}.")
+                failed = i
+                break
+
+            summary = read_last_summary(summary_path)
+            runs.append({"traced": traced,
+                         "wall": wall,
+                         "requests": requests,
+                         "weight": weight,
+                         "peak_memory": peak,
+                         "spans": summary["spans"]})
+
+        stop_desk(desk)
+
+    finally:
+        fake.stop()
+
+    timed = [run for run in runs if not run["traced"]]
+    mean = lambda values: sum(values) / len(values) if values else 0.0
+
+    return {"mode": "mock" if is_mock else "live",
+            "exchange": exchange,
+            "symbols": n_symbols,
+            "startup": startup,
+            "startup_requests": startup_requests,
+            "startup_weight": startup_weight,
+            "wall": mean([run["wall"] for run in timed]),
+            "steps": {span: mean([run["spans"].get(span, 0.0) for run in timed]) for span in STEP_SPANS},
+            "requests": mean([run["requests"] for run in timed]),
+            "weight": mean([run["weight"] for run in timed]),
+            "peak_memory": next((run["peak_memory"] for run in runs if run["traced"]), None),
+            "failed_rebalance": failed}
+
+
+def print_report(results):
+    header = (f"{'mode':<5} {'symbols':>7} {'startup':>8} {'wall':>8} "
+              + " ".join(f"{span:>15}" for span in STEP_SPANS)
+              + f" {'requests':>9} {'weight':>7} {'peak MiB':>9} {'failed':>6}")
+    print(header)
+    print("-"*len(header))
+
+    for r in results:
+        print(f"{r['mode']:<5} {r['symbols']:>7} {r['startup']:>8.3f} {r['wall']:>8.3f} "
+              + " ".join(f"{r['steps'][span]:>15.3f}" for span in STEP_SPANS)
+              + f" {r['requests']:>9.1f} {r['weight']:>7.1f}"
+              + (f" {r['peak_memory']/2**20:>9.2f}" if r['peak_memory'] is not None else f" {'-':>9}")
+              + f" {'-' if r['failed_rebalance'] is None else r['failed_rebalance']:>6}")
+
+
+# Main code
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark TradingDesk rebalances against a local fake Binance or exchange simulator (no network, no Google credentials).")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 20, 50, 100, 200], help="Universe sizes to sweep")
+    parser.add_argument("--modes", nargs="+", default=["mock", "live"], choices=["mock", "live"])
+    parser.add_argument("--rebalances", type=int, default=3, help="Timed rebalances per size (plus one traced for memory)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds injected before every stub response")
+    parser.add_argument("--exchange", default="fake", choices=["fake", "simulator"], help="Instant-fill stub or order-book simulator")
+    parser.add_argument("--error-rate", type=float, nargs=3, default=[0.0, 0.0, 0.0], metavar=("E1007", "E1021", "E503"),
+                        help="Injected error rates (simulator only)")
+    parser.add_argument("--strategy", default="momentum1")
+    parser.add_argument("--workdir", default=None, help="Logs, ledgers and metrics (default: a temporary directory)")
+    parser.add_argument("--output", default=None, help="JSON path for the raw results")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+    workdir = args.workdir or tempfile.mkdtemp(prefix="trading_desk_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir) # The desk writes ./logs relative to the working directory
+
+    results = []
+    for mode in args.modes:
+        for n_symbols in args.sizes:
+            results.append(bench_universe(n_symbols=n_symbols,
+                                          is_mock=(mode == "mock"),
+                                          rebalances=args.rebalances,
+                                          latency=args.latency,
+                                          strategy_name=args.strategy,
+                                          workdir=workdir,
+                                          exchange=args.exchange,
+                                          error_rates=dict(zip(["-1007", "-1021", "503"], args.error_rate))))
+
+    print_report(results)
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,73 @@
+# Import packages
+import argparse
+import os
+import tempfile
+
+import pyarrow.parquet as pq
+
+# Import functions, classes
+from trading_desk.ledger import ParquetLedger
+from trading_desk.strategy.position_model import Position
+from benchmarks.check_user_stream import expect
+
+
+def record(ledger:ParquetLedger,
+           n:int,
+           start_ms:int):
+    for i in range(n):
+        ledger.record(positions=[Position(symbol="SYM004USDT",
+                                          position=1,
+                                          fetched_price=100.0,
+                                          entry_price=100.0,
+                                          quantity=1.0,
+                                          amount=-100.0)],
+                      open_close="open",
+                      collateral_long=100.0,
+                      collateral_short=0.0,
+                      capital=1000.0,
+                      time_ms=start_ms + i)
+
+
+def part_sessions(root:str):
+    """
+    {part file path: set of sessions of its rows} of every part under `root`.
+    """
+    return {os.path.join(directory, name): set(pq.read_table(os.path.join(directory, name), columns=["session"]).column("session").to_pylist())
+            for directory, _, names in os.walk(root) for name in names if name.endswith(".parquet")}
+
+
+def check_prefix_sessions(root:str):
+    """
+    Sessions "a" and "a-b" share a ledger directory: compacting "a" leaves the parts of "a-b" alone.
+    """
+    other = ParquetLedger(root=root, session_name="a-b", compact_every=1000)
+    record(other, n=3, start_ms=0)
+    other_parts = {path for path, sessions in part_sessions(root).items() if sessions == {"a-b"}}
+
+    ledger = ParquetLedger(root=root, session_name="a", compact_every=2)
+    record(ledger, n=5, start_ms=1000)
+    ledger.close()
+
+    parts = part_sessions(root)
+    expect(all(len(sessions) == 1 for sessions in parts.values()),
+           f"Compacting 'a' merged parts of several sessions: {[p for p, s in parts.items() if len(s) > 1]}.")
+    expect(other_parts <= set(parts), "Compacting 'a' deleted parts of 'a-b'.")
+
+    expect(len(other.fills()) == 3, f"Session 'a-b' has {len(other.fills())} fills after 'a' compacted, expected 3.")
+    expect(len(ledger.fills()) == 5, f"Session 'a' has {len(ledger.fills())} fills after compaction, expected 5.")
+
+    other.close()
+    reopened = {name: ParquetLedger(root=root, session_name=name) for name in ["a", "a-b"]}
+    expect(len(reopened["a"].fills()) == 5 and len(reopened["a-b"].fills()) == 3,
+           "Reopened sessions do not read back their own fills.")
+    expect(reopened["a"].turnover() == 500.0 and reopened["a-b"].turnover() == 300.0,
+           "Reopened sessions do not resume their own snapshots.")
+
+
+# Main code
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that Parquet ledger sessions sharing a directory stay separate.")
+    args = parser.parse_args()
+
+    check_prefix_sessions(root=tempfile.mkdtemp(prefix="trading_desk_ledger_"))
+    print("ok  check_prefix_sessions")
@@ -0,0 +1,85 @@
+# Import packages
+import argparse
+import logging
+import os
+import tempfile
+import threading
+
+# Import functions, classes
+from trading_desk import TradingDesk
+from trading_desk.simulator import ExchangeSimulator
+from benchmarks.bench_rebalance import RecordingScheduler, make_config, stop_desk
+from benchmarks.check_user_stream import expect
+
+
+def check_failed_prepare(n_symbols:int,
+                         workdir:str):
+    """
+    One of N order preparations raises: the rebalance goes on, the other N-1 orders are placed
+    and the failed asset is held flat.
+    """
+    symbols = [f"SYM{i:03d}USDT" for i in range(n_symbols)]
+    simulator = ExchangeSimulator(symbols=symbols).start()
+
+    try:
+        config = make_config(symbols=symbols,
+                             is_mock=False,
+                             workdir=workdir,
+                             fake=simulator,
+                             strategy_name="momentum1",
+                             session_name="check_partial_prepare")
+        desk = TradingDesk(config=config,
+                           binance_api_key="check",
+                           binance_secret_key="check")
+        desk.kline_close_delay = 0
+        desk.logger.setLevel(logging.CRITICAL)
+
+        prepared = []
+        lock = threading.Lock()
+        prepare_order = desk.prepare_order
+
+        def failing_prepare_order(position):
+            # Preparations run concurrently: the first one fails
+            with lock:
+                prepared.append(position.symbol)
+                first = len(prepared) == 1
+            if first:
+                raise RuntimeError("HTTP error 503 (injected by the check)")
+            return prepare_order(position=position)
+
+        desk.prepare_order = failing_prepare_order
+
+        scheduler = RecordingScheduler()
+        try:
+            desk.run_strategy(scheduler=scheduler)
+        finally:
+            stop_desk(desk)
+
+        failed = prepared[:1]
+        ordered = sorted(set(order["symbol"] for order in simulator.exchange.orders.values()))
+
+        expect(not scheduler.failed, "The rebalance failed on one failed preparation.")
+        expect(len(prepared) > 1, f"Only {len(prepared)} order was prepared: nothing to compare.")
+        expect(not set(failed) & set(ordered), f"Orders were placed for failed preparations {failed}.")
+        expect(ordered == sorted(set(prepared) - set(failed)),
+               f"Orders placed for {ordered}, expected every prepared symbol but {failed}.")
+        expect(all(p.quantity == 0 for p in desk.positions_holding if p.symbol in failed),
+               "An asset whose preparation failed is not held flat.")
+        expect(desk.metrics.counters.get(("trading_desk_leg_failures_total", (("stage", "prepare"),))) == len(failed),
+               "Failed preparations are not counted in the metrics.")
+
+    finally:
+        simulator.stop()
+
+
+# Main code
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that a failed order preparation in step 3 only skips its own leg.")
+    parser.add_argument("--n-symbols", type=int, default=20)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="trading_desk_check_")
+    os.chdir(workdir) # The desk writes ./logs relative to the working directory
+
+    check_failed_prepare(n_symbols=args.n_symbols, workdir=workdir)
+    print("ok  check_failed_prepare")
@@ -0,0 +1,82 @@
+# Import packages
+import argparse
+import threading
+import time
+
+# Import functions, classes
+from trading_desk.data_models import ExitConfig
+from trading_desk.functions.price_stream import PriceStream
+from trading_desk.strategy.exit_engine import ExitEngine
+from trading_desk.strategy.position_model import Position
+from trading_desk.simulator import ExchangeSimulator
+from benchmarks.check_user_stream import expect, wait_until
+
+
+def check_mark_price_exit(symbols:list):
+    """
+    Mark prices served by the simulator's '/stream' reach PriceStream, and fire an armed stop-loss through ExitEngine.
+    The other symbol, armed at its mark price, does not fire.
+    """
+    simulator = ExchangeSimulator(symbols=symbols, mark_price_interval=0.2).start()
+    price_stream = PriceStream(symbols=symbols, base_url=simulator.ws_base_url, reconnect_delay=0.1)
+
+    exits = []
+    fired = threading.Event()
+
+    def on_exit(position, reason, price):
+        exits.append((position, reason, price))
+        fired.set()
+
+    exit_engine = ExitEngine(exit_config=ExitConfig(take_profit=None, stop_loss=0.05), on_exit=on_exit)
+    price_stream.add_listener(exit_engine.on_price)
+    price_stream.start()
+
+    try:
+        expect(wait_until(lambda: all(price_stream.get_price(symbol=s) is not None for s in symbols)),
+               "No mark price was received from the simulator.")
+
+        exchange = simulator.exchange
+        for symbol in symbols:
+            mark = float(exchange.premium_index(symbol, exchange.now_ms())["markPrice"])
+            expect(abs(price_stream.get_price(symbol=symbol) - mark) <= 0.01*mark,
+                   f"Streamed price of {symbol} is far from the mark price {mark}.")
+
+        # Long entered 10% above the mark: the stop-loss (-5%) is hit on the next update
+        losing, holding = symbols
+        stopped = Position(symbol=losing,
+                           position=1,
+                           fetched_price=0.0,
+                           entry_price=price_stream.get_price(symbol=losing)*1.1,
+                           quantity=1.0,
+                           amount=100.0)
+        exit_engine.arm(stopped)
+        exit_engine.arm(Position(symbol=holding,
+                                 position=1,
+                                 fetched_price=0.0,
+                                 entry_price=price_stream.get_price(symbol=holding),
+                                 quantity=1.0,
+                                 amount=100.0))
+
+        expect(fired.wait(timeout=5.0), "The stop-loss did not fire on streamed mark prices.")
+        time.sleep(1.0) # A few more updates: nothing else may fire
+        expect(len(exits) == 1,
+               f"Expected exactly one exit, got {[(p.symbol, reason) for p, reason, _ in exits]}.")
+
+        position, reason, price = exits[0]
+        expect(position is stopped and reason == "stop_loss", f"Unexpected exit {position.symbol}: {reason}.")
+        expect(price <= stopped.entry_price*0.95, f"Stop-loss fired at {price}, above its stop price.")
+        expect(holding in exit_engine.triggers, "The trigger of the position at its mark price was removed.")
+
+    finally:
+        price_stream.stop()
+        simulator.stop()
+
+
+# Main code
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that mark price streams of the local exchange simulator drive ExitEngine.")
+    parser.add_argument("--symbols", nargs=2, default=["SYM004USDT", "SYM005USDT"])
+    args = parser.parse_args()
+
+    check_mark_price_exit(symbols=args.symbols)
+    print("ok  check_mark_price_exit")
@@ -0,0 +1,152 @@
+# Import packages
+import argparse
+import time
+
+# Import functions, classes
+from trading_desk.functions import APIHandler, UserDataStream
+from trading_desk.simulator import ExchangeSimulator, FaultInjector
+
+
+def wait_until(condition,
+               timeout:float=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def expect(condition:bool,
+           message:str):
+    if not condition:
+        raise AssertionError(message)
+
+
+def check_order_trade_update(simulator:ExchangeSimulator,
+                             api_handler:APIHandler,
+                             stream:UserDataStream,
+                             symbol:str):
+    """
+    A filled order reaches the book as ORDER_TRADE_UPDATE (order state and fills).
+    """
+    response = api_handler.place_market_order(symbol=symbol, side="BUY", quantity=0.01)
+    client_order_id = response["clientOrderId"]
+
+    order = stream.account_book.wait_for_order(client_order_id=client_order_id, timeout=5.0)
+    expect(order is not None, "ORDER_TRADE_UPDATE: the order never reached a final status in the book.")
+    expect(order["status"] == response["status"], f"ORDER_TRADE_UPDATE: status {order['status']} != REST {response['status']}.")
+    expect(abs(order["executedQty"] - float(response["executedQty"])) < 1e-9, "ORDER_TRADE_UPDATE: executed quantity differs from REST.")
+
+    fills = [f for f in stream.account_book.fills if f["clientOrderId"] == client_order_id]
+    expect(abs(sum(f["quantity"] for f in fills) - order["executedQty"]) < 1e-9, "ORDER_TRADE_UPDATE: fills do not add up to the executed quantity.")
+
+
+def check_account_update(simulator:ExchangeSimulator,
+                         api_handler:APIHandler,
+                         stream:UserDataStream,
+                         symbol:str):
+    """
+    Balances and positions in the book follow ACCOUNT_UPDATE and match REST.
+    """
+    api_handler.place_market_order(symbol=symbol, side="SELL", quantity=0.02)
+
+    amount = float(api_handler.fetch_position(symbol=symbol)[0]["positionAmt"])
+    expect(stream.account_book.wait_for_positions(expected={symbol: amount}, timeout=5.0),
+           f"ACCOUNT_UPDATE: position {stream.account_book.positions.get(symbol)} != REST {amount}.")
+
+    wallet = float(api_handler.get_balance(symbol="USDT")["balance"])
+    expect(wait_until(lambda: abs(stream.account_book.balances["USDT"]["wallet_balance"] - wallet) < 1e-6),
+           "ACCOUNT_UPDATE: wallet balance differs from REST.")
+
+
+def check_timeout_resolution(simulator:ExchangeSimulator,
+                             api_handler:APIHandler,
+                             stream:UserDataStream,
+                             symbol:str):
+    """
+    A -1007 timeout on an executed order is resolved from the book, without polling '/fapi/v1/order'.
+    """
+    faults = simulator.faults
+    simulator.faults = FaultInjector(error_rates={"-1007": 1.0}, timeout_execution_rate=1.0)
+    simulator.reset_stats()
+    try:
+        response = api_handler.place_market_order(symbol=symbol, side="BUY", quantity=0.01)
+    finally:
+        simulator.faults = faults
+
+    expect(response["status"] == "FILLED", f"-1007: resolved as {response['status']} instead of FILLED.")
+    expect(simulator.exchange.requests[("GET", "/fapi/v1/order")] == 0, "-1007: the order was polled through REST.")
+
+
+def check_listen_key_expired(simulator:ExchangeSimulator,
+                             api_handler:APIHandler,
+                             stream:UserDataStream,
+                             symbol:str):
+    """
+    listenKeyExpired: the stream reconnects with a new key, and events flow again.
+    """
+    expired = simulator.expire_listen_key()
+    expect(wait_until(lambda: stream.listen_key != expired and stream.connected, timeout=10.0),
+           "listenKeyExpired: the stream did not reconnect with a new listenKey.")
+
+    response = api_handler.place_market_order(symbol=symbol, side="BUY", quantity=0.01)
+    expect(stream.account_book.wait_for_order(client_order_id=response["clientOrderId"], timeout=5.0) is not None,
+           "listenKeyExpired: no ORDER_TRADE_UPDATE after reconnecting.")
+
+
+def check_shared_listen_key(simulator:ExchangeSimulator,
+                            api_handler:APIHandler,
+                            stream:UserDataStream,
+                            symbol:str):
+    """
+    Streams sharing an API key share its listenKey: stopping one of them does not close it for the others.
+    """
+    other = UserDataStream(api_handler=APIHandler(binance_api_key=api_handler.binance_api_key,
+                                                  binance_secret_key=api_handler.binance_secret_key,
+                                                  base_url=api_handler.base_url),
+                           base_url=stream.base_url,
+                           reconnect_delay=0.1)
+    other.start()
+    expect(wait_until(lambda: other.connected), "The second user data stream did not connect.")
+    expect(other.listen_key == stream.listen_key, "Streams of one API key got different listenKeys.")
+
+    other.stop()
+    expect(simulator.exchange.listen_key == stream.listen_key, "Stopping one stream closed the shared listenKey.")
+
+    response = api_handler.place_market_order(symbol=symbol, side="SELL", quantity=0.01)
+    expect(stream.account_book.wait_for_order(client_order_id=response["clientOrderId"], timeout=5.0) is not None,
+           "The remaining stream stopped receiving events.")
+
+
+CHECKS = [check_order_trade_update,
+          check_account_update,
+          check_timeout_resolution,
+          check_listen_key_expired,
+          check_shared_listen_key]
+
+
+# Main code
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check UserDataStream / AccountBook against the user data stream of the local exchange simulator.")
+    parser.add_argument("--symbol", default="SYM004USDT")
+    args = parser.parse_args()
+
+    simulator = ExchangeSimulator(symbols=[args.symbol]).start()
+    api_handler = APIHandler(binance_api_key="key", binance_secret_key="secret", base_url=simulator.base_url)
+    stream = UserDataStream(api_handler=api_handler, base_url=simulator.ws_base_url, reconnect_delay=0.1)
+    api_handler.account_book = stream.account_book
+
+    stream.start()
+    try:
+        expect(wait_until(lambda: stream.connected), "The user data stream did not connect.")
+
+        for check in CHECKS:
+            check(simulator, api_handler, stream, args.symbol)
+            print(f"ok  {check.__name__}")
+    finally:
+        stream.stop()
+        simulator.stop()
+
+    expect(simulator.exchange.listen_key is None, "The last stream did not close the listenKey.")
+    print("ok  listenKey closed by the last stream")
@@ -0,0 +1,279 @@
+import json
+import math
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+from urllib.parse import parse_qs, urlparse
+
+from trading_desk.functions.rate_limiter import request_weight
+
+
+class FakeBinance:
+    """
+    Local stub of the '/fapi' REST endpoints used by `TradingDesk`, for headless benchmarks.
+
+    - Prices are a deterministic function of (symbol, minute), so klines can be served for any window.
+    - Market orders fill immediately at the current price and update one-way positions and the USDT balance.
+    - Every request sleeps `latency` seconds first and is counted with its request weight.
+
+    WebSocket upgrades are refused, so the desk's streams stay disconnected and every price,
+    balance and order confirmation goes through REST.
+    """
+    def __init__(self,
+                 symbols:List[str],
+                 latency:float=0.0,
+                 balance:float=10000.0,
+                 fee:float=0.0005,
+                 host:str="127.0.0.1",
+                 port:int=0):
+        self.symbols = list(symbols)
+        self.latency = latency
+        self.fee = fee
+
+        self.wallet = balance
+        self.positions = {} # symbol -> (amount, entry price)
+
+        self.requests = Counter() # (method, endpoint) -> count
+        self.weight = 0
+
+        self._lock = threading.Lock()
+        self._order_id = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+
+    @property
+    def ws_base_url(self):
+        host, port = self._server.server_address
+        return f"ws://{host}:{port}"
+
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-binance", daemon=True)
+        self._thread.start()
+        return self
+
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests.clear()
+            self.weight = 0
+
+
+    def stats(self):
+        """
+        (request count, request weight) since the last `reset_stats`.
+        """
+        with self._lock:
+            return sum(self.requests.values()), self.weight
+
+
+    # Market
+    def price(self,
+              symbol:str,
+              time_ms:int):
+        """
+        Deterministic price of `symbol` at `time_ms`: a per-symbol level times slow waves of different phases.
+        """
+        k = zlib.crc32(symbol.encode())
+        minute = time_ms / 60000
+        level = 1 + k % 1000
+        return level*(1 + 0.02*math.sin(minute/37 + k % 97) + 0.005*math.sin(minute/3 + k % 13))
+
+
+    def klines(self,
+               symbol:str,
+               interval:str,
+               start_time:int,
+               end_time:int,
+               limit:int):
+        every, unit = int(interval[:-1]), interval[-1]
+        step = every*60000 if unit == "m" else every*3600000
+
+        now = int(time.time()*1000)
+        first = -(-start_time // step)*step
+        last = min(end_time, now)
+
+        rows = []
+        open_time = first
+        while open_time <= last and len(rows) < limit:
+            o = self.price(symbol, open_time)
+            c = self.price(symbol, open_time + step - 1)
+            rows.append([open_time, f"{o:.6f}", f"{max(o, c)*1.001:.6f}", f"{min(o, c)*0.999:.6f}", f"{c:.6f}", "1000.0",
+                         open_time + step - 1, f"{1000*c:.2f}", 100, "500.0", f"{500*c:.2f}", "0"])
+            open_time += step
+
+        return rows
+
+
+    def exchange_info(self):
+        return {
+            "rateLimits": [
+                {"rateLimitType": "REQUEST_WEIGHT", "interval": "MINUTE", "intervalNum": 1, "limit": 2400},
+                {"rateLimitType": "ORDERS", "interval": "SECOND", "intervalNum": 10, "limit": 300},
+                {"rateLimitType": "ORDERS", "interval": "MINUTE", "intervalNum": 1, "limit": 1200},
+            ],
+            "symbols": [
+                {"symbol": symbol,
+                 "status": "TRADING",
+                 "quantityPrecision": 3,
+                 "filters": [{"filterType": "MARKET_LOT_SIZE", "minQty": "0.001", "stepSize": "0.001", "maxQty": "100000"},
+                             {"filterType": "MIN_NOTIONAL", "notional": "5"}]}
+                for symbol in self.symbols
+            ],
+        }
+
+
+    # Account
+    def balance(self):
+        with self._lock:
+            margin = sum(abs(amount)*entry for amount, entry in self.positions.values())
+            return [{"asset": "USDT",
+                     "balance": f"{self.wallet:.8f}",
+                     "crossWalletBalance": f"{self.wallet:.8f}",
+                     "availableBalance": f"{self.wallet - margin:.8f}"}]
+
+
+    def position_risk(self,
+                      symbol:str=None):
+        with self._lock:
+            return [{"symbol": s, "positionAmt": f"{amount:.3f}", "entryPrice": f"{entry:.6f}", "unRealizedProfit": "0"}
+                    for s, (amount, entry) in self.positions.items()
+                    if amount != 0 and (symbol is None or s == symbol)]
+
+
+    def market_order(self,
+                     symbol:str,
+                     side:str,
+                     quantity:float,
+                     client_order_id:str):
+        now = int(time.time()*1000)
+        price = self.price(symbol, now)
+        signed = quantity if side == "BUY" else -quantity
+
+        with self._lock:
+            amount, entry = self.positions.get(symbol, (0.0, 0.0))
+            new_amount = round(amount + signed, 8)
+
+            # Realized PnL on the reduced part, entry price kept; a flip or an increase re-averages
+            if amount != 0 and amount*signed < 0:
+                closed = min(abs(signed), abs(amount))
+                self.wallet += closed*(price - entry)*(1 if amount > 0 else -1)
+                entry = entry if abs(signed) <= abs(amount) else price
+            else:
+                entry = (abs(amount)*entry + quantity*price) / abs(new_amount) if new_amount else 0.0
+
+            self.wallet -= quantity*price*self.fee
+            self.positions[symbol] = (new_amount, entry)
+
+            self._order_id += 1
+            order_id = self._order_id
+
+        return {"symbol": symbol,
+                "orderId": order_id,
+                "clientOrderId": client_order_id,
+                "side": side,
+                "type": "MARKET",
+                "status": "FILLED",
+                "origQty": f"{quantity}",
+                "executedQty": f"{quantity}",
+                "avgPrice": f"{price:.6f}",
+                "cumQuote": f"{quantity*price:.6f}",
+                "updateTime": now}
+
+
+    def route(self,
+              method:str,
+              endpoint:str,
+              params:dict):
+        now = int(time.time()*1000)
+
+        if endpoint == "/fapi/v1/time":
+            return {"serverTime": now}
+        if endpoint == "/fapi/v1/exchangeInfo":
+            return self.exchange_info()
+        if endpoint == "/fapi/v1/klines":
+            return self.klines(symbol=params["symbol"],
+                               interval=params["interval"],
+                               start_time=int(params.get("startTime", 0)),
+                               end_time=int(params.get("endTime", now)),
+                               limit=int(params.get("limit", 500)))
+        if endpoint == "/fapi/v1/ticker/price":
+            return {"symbol": params["symbol"], "price": f"{self.price(params["symbol"], now):.6f}", "time": now}
+        if endpoint == "/fapi/v1/premiumIndex":
+            return {"symbol": params["symbol"], "markPrice": f"{self.price(params["symbol"], now):.6f}", "time": now}
+        if endpoint == "/fapi/v2/balance":
+            return self.balance()
+        if endpoint == "/fapi/v1/leverage":
+            return {"symbol": params["symbol"], "leverage": int(params["leverage"]), "maxNotionalValue": "1000000"}
+        if endpoint == "/fapi/v3/positionRisk":
+            return self.position_risk(symbol=params.get("symbol"))
+        if endpoint == "/fapi/v1/listenKey":
+            return {"listenKey": "fake-listen-key"} if method == "POST" else {}
+        if endpoint == "/fapi/v1/order" and method == "POST":
+            return self.market_order(symbol=params["symbol"],
+                                     side=params["side"],
+                                     quantity=float(params["quantity"]),
+                                     client_order_id=params.get("newClientOrderId", ""))
+
+        return None
+
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # Keep-alive, like the real API
+
+            def _serve(self):
+                url = urlparse(self.path)
+                params = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+                if self.headers.get("Upgrade"):
+                    self._send(400, {"code": -1, "msg": "WebSocket streams are not served."})
+                    return
+
+                if fake.latency:
+                    time.sleep(fake.latency)
+
+                with fake._lock:
+                    fake.requests[(self.command, url.path)] += 1
+                    fake.weight += request_weight(url.path, self.command, params)
+
+                body = fake.route(self.command, url.path, params)
+                if body is None:
+                    self._send(404, {"code": -5000, "msg": f"{self.command} {url.path} is not stubbed."})
+                else:
+                    self._send(200, body)
+
+            def _send(self,
+                      status:int,
+                      body):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _serve
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,58 @@
+# Import packages
+import argparse
+import datetime
+import json
+
+# Import functions, classes
+from trading_desk.functions import APIHandler, KlineArchive, KlineDownloader, RateLimiter
+
+
+def parse_date_ms(value:str):
+    """
+    'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM' (UTC) to milliseconds.
+    """
+    date = datetime.datetime.fromisoformat(value).replace(tzinfo=datetime.timezone.utc)
+    return int(date.timestamp() * 1000)
+
+
+# Main code
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download historical klines into a local KlineArchive (resumable).")
+    parser.add_argument("--config", default="config.json", help="Config whose traded_assets are downloaded (unless --symbols is given)")
+    parser.add_argument("--symbols", nargs="+", default=None)
+    parser.add_argument("--interval", default="1m", help="Kline interval, e.g. '1m', '4h'")
+    parser.add_argument("--start", required=True, help="UTC start date, e.g. '2025-01-01'")
+    parser.add_argument("--end", default=None, help="UTC end date (default: now)")
+    parser.add_argument("--archive-dir", default="./data/klines")
+    parser.add_argument("--base-url", default="https://fapi.binance.com", help="REST base URL, e.g. a local mock server")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--weight-per-minute", type=int, default=1200, help="Request weight budget used by the download")
+    args = parser.parse_args()
+
+    symbols = args.symbols
+    if symbols is None:
+        with open(args.config) as f:
+            symbols = json.load(f)["traded_assets"]
+
+    every, unit = int(args.interval[:-1]), args.interval[-1]
+
+    # Klines are public: no API key needed
+    api_handler = APIHandler(binance_api_key="",
+                             binance_secret_key="",
+                             max_workers=args.workers,
+                             base_url=args.base_url,
+                             rate_limiter=RateLimiter(weight_limit=args.weight_per_minute))
+    downloader = KlineDownloader(api_handler=api_handler,
+                                 archive=KlineArchive(root=args.archive_dir),
+                                 max_workers=args.workers)
+
+    counts, errors = downloader.download(symbols=symbols,
+                                         every=every,
+                                         unit=unit,
+                                         start_time=parse_date_ms(args.start),
+                                         end_time=parse_date_ms(args.end) if args.end else None)
+
+    for symbol, n in counts.items():
+        print(f"{symbol:<20} | {n:>10} klines")
+    for symbol, error in errors.items():
+        print(f"{symbol:<20} | FAILED: {error}")
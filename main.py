@@ -4,7 +4,7 @@ import json
 from apscheduler.schedulers.blocking import BlockingScheduler
 
 # Import functions, classes
-from trading_desk.data_models import MainConfig, StrategyConfig
+from trading_desk.data_models import MainConfig, StrategyConfig, ExitConfig
 from trading_desk import TradingDesk
 
 # Import environment variables
@@ -18,6 +18,8 @@ if __name__ == "__main__":
     with open("config.json") as f:
         raw = json.load(f)
     raw["strategyconfig"] = StrategyConfig(**raw["strategyconfig"])
+    if "exitconfig" in raw:
+        raw["exitconfig"] = ExitConfig(**raw["exitconfig"])
     config = MainConfig(**raw)
 
     # TradingDesk instantiation
@@ -42,11 +44,7 @@ if __name__ == "__main__":
                           minute=0,
                           kwargs={"scheduler": scheduler})
 
-    if not config.is_mock:
-        scheduler.add_job(trading_desk.observe_and_clear,
-                          "cron",
-                          #minute="5-59/5",
-                          minute="3-59/3",
-                          kwargs={"scheduler": scheduler})
+    # Take-profit/stop-loss exits are evaluated by the desk's exit engine on every streamed price update.
+    # No periodic `observe_and_clear` job is needed.
 
     scheduler.start()
@@ -0,0 +1,104 @@
+# Import packages
+import argparse
+import os
+import json
+from apscheduler.schedulers.blocking import BlockingScheduler
+from apscheduler.executors.pool import ThreadPoolExecutor
+
+# Import functions, classes
+from trading_desk.data_models import MainConfig, StrategyConfig, ExitConfig
+from trading_desk.functions import APIHandler, Metrics, MetricsServer
+from trading_desk import TradingDesk, MarketData
+
+# Import environment variables
+BINANCE_API_KEY = os.getenv("BINANCE_API_KEY")
+BINANCE_SECRET_KEY = os.getenv("BINANCE_SECRET_KEY")
+
+
+def load_config(path:str):
+    with open(path) as f:
+        raw = json.load(f)
+    raw["strategyconfig"] = StrategyConfig(**raw["strategyconfig"])
+    if "exitconfig" in raw:
+        raw["exitconfig"] = ExitConfig(**raw["exitconfig"])
+    return MainConfig(**raw)
+
+
+# Main code
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run several trading sessions in one process with shared market data.")
+    parser.add_argument("configs", nargs="+", help="Session config files (one TradingDesk each)")
+    parser.add_argument("--kline-archive-dir", default=None, help="Shared kline archive ('' to disable; default: the sessions' kline_archive_dir)")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Serve the shared market data metrics at http://127.0.0.1:{port}/metrics")
+    args = parser.parse_args()
+
+    # Configuration setup
+    configs = [load_config(path) for path in args.configs]
+
+    session_names = [config.session_name for config in configs]
+    if len(set(session_names)) != len(session_names):
+        raise ValueError(f"Session names must be unique: {session_names}")
+
+    # Live sessions share one account (one-way position mode): a symbol can only belong to one of them
+    live_assets = [symbol for config in configs if not config.is_mock for symbol in config.traded_assets]
+    overlapping = sorted(set(symbol for symbol in live_assets if live_assets.count(symbol) > 1))
+    if overlapping:
+        raise ValueError(f"Live sessions must trade disjoint symbols. Shared: {overlapping}")
+
+    # Shared market data is served from one endpoint: the sessions must agree on it
+    for field in ["rest_base_url", "ws_base_url"] + (["kline_archive_dir"] if args.kline_archive_dir is None else []):
+        values = sorted(set(str(getattr(config, field)) for config in configs))
+        if len(values) > 1:
+            raise ValueError(f"Sessions sharing market data must share {field}: {values}")
+
+    kline_archive_dir = configs[0].kline_archive_dir if args.kline_archive_dir is None else args.kline_archive_dir or None
+
+    # Shared market data: one exchangeInfo snapshot, one kline fetch per (symbol, interval) and bar,
+    # one price stream and one request budget for every session
+    market_data_api_handler = APIHandler(binance_api_key=BINANCE_API_KEY,
+                                         binance_secret_key=BINANCE_SECRET_KEY,
+                                         base_url=configs[0].rest_base_url)
+    market_data_api_handler.metrics = Metrics(labels={"session": "market_data"}) # Kline / exchangeInfo request latency
+
+    market_data = MarketData(api_handler=market_data_api_handler,
+                             kline_archive_dir=kline_archive_dir,
+                             stream_base_url=configs[0].ws_base_url)
+    for config in configs:
+        market_data.subscribe(symbols=config.traded_assets,
+                              every=config.strategyconfig.every,
+                              unit=config.strategyconfig.unit)
+    market_data.start()
+
+    if args.metrics_port is not None:
+        MetricsServer(metrics=market_data_api_handler.metrics,
+                      port=args.metrics_port).start()
+
+    # TradingDesk instantiation (books, ledgers, kill switches and logs stay per session)
+    trading_desks = [TradingDesk(config=config,
+                                 binance_api_key=BINANCE_API_KEY,
+                                 binance_secret_key=BINANCE_SECRET_KEY,
+                                 market_data=market_data)
+                     for config in configs]
+
+    # Scheduler setup: every session of a bar runs concurrently
+    scheduler = BlockingScheduler(executors={"default": ThreadPoolExecutor(max_workers=len(trading_desks))})
+
+    for config, trading_desk in zip(configs, trading_desks):
+        job_id = config.session_name
+
+        if config.strategyconfig.unit == "m":
+            scheduler.add_job(trading_desk.run_strategy, 
+                              "cron", 
+                              id=job_id,
+                              minute=f"*/{config.strategyconfig.every}",
+                              kwargs={"scheduler": scheduler, "job_id": job_id})
+
+        elif config.strategyconfig.unit == "h":
+            scheduler.add_job(trading_desk.run_strategy, 
+                              "cron", 
+                              id=job_id,
+                              hour=f"*/{config.strategyconfig.every}",
+                              minute=0,
+                              kwargs={"scheduler": scheduler, "job_id": job_id})
+
+    scheduler.start()
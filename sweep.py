@@ -0,0 +1,63 @@
+# Import packages
+import argparse
+import json
+import os
+
+# Import functions, classes
+from trading_desk.data_models import MainConfig, StrategyConfig
+from trading_desk.functions import KlineArchive
+from trading_desk.backtest import (load_price_history, load_archive_history, load_exchange_metadata, save_price_history,
+                                   expand_grid, run_sweep)
+
+
+# Main code
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest a grid of strategy configs in parallel.")
+    parser.add_argument("--config", default="config.json", help="Base config. traded_assets and init_capital are shared by every variant.")
+    parser.add_argument("--grid", required=True, help="JSON file: {StrategyConfig field: [candidate values]}")
+    parser.add_argument("--history-dir", required=True, help="Memory-mapped price history (created from --data-dir if missing)")
+    parser.add_argument("--data-dir", default=None, help="Directory with one '<SYMBOL>.csv' kline file per traded asset")
+    parser.add_argument("--archive-dir", default=None, help="KlineArchive root (alternative to --data-dir)")
+    parser.add_argument("--interval", default="1m", help="Archived kline interval to replay, e.g. '1m'")
+    parser.add_argument("--exchange-info", default=None, help="Saved '/fapi/v1/exchangeInfo' response (enables min order quantity checks)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default=None, help="CSV path for the ranked results")
+    args = parser.parse_args()
+
+    # Configuration setup
+    with open(args.config) as f:
+        raw = json.load(f)
+    raw["strategyconfig"] = StrategyConfig(**raw["strategyconfig"])
+    raw.pop("exitconfig", None) # Intra-bar exits are not simulated
+    config = MainConfig(**raw)
+
+    with open(args.grid) as f:
+        grid = json.load(f)
+    variants = expand_grid(config.strategyconfig, grid)
+
+    # Price history is parsed once and saved for memory-mapping
+    if not os.path.exists(os.path.join(args.history_dir, "close.npy")):
+        if args.archive_dir:
+            history = load_archive_history(KlineArchive(root=args.archive_dir),
+                                           symbols=config.traded_assets,
+                                           interval=args.interval)
+        else:
+            history = load_price_history({symbol: os.path.join(args.data_dir, f"{symbol}.csv")
+                                          for symbol in config.traded_assets})
+        save_price_history(history, args.history_dir)
+
+    metadata = None
+    if args.exchange_info:
+        metadata = load_exchange_metadata(args.exchange_info, symbols=config.traded_assets)
+
+    # Sweep
+    results = run_sweep(config=config,
+                        history_dir=args.history_dir,
+                        variants=variants,
+                        metadata=metadata,
+                        max_workers=args.workers)
+
+    print(results.to_string())
+
+    if args.output:
+        results.to_csv(args.output)
@@ -1,3 +1,4 @@
 from .trading_desk import TradingDesk
+from .market_data import MarketData
 
-__all__ = ["TradingDesk"]
+__all__ = ["TradingDesk", "MarketData"]
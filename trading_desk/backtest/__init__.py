@@ -0,0 +1,15 @@
+from .engine import Backtester, BacktestResult
+from .data import load_kline_csv, align_price_history, load_price_history, load_archive_history, load_exchange_metadata
+from .sweep import save_price_history, load_price_history_mmap, expand_grid, run_sweep
+
+__all__ = ["Backtester",
+           "BacktestResult",
+           "load_kline_csv",
+           "align_price_history",
+           "load_price_history",
+           "load_archive_history",
+           "load_exchange_metadata",
+           "save_price_history",
+           "load_price_history_mmap",
+           "expand_grid",
+           "run_sweep"]
@@ -0,0 +1,91 @@
+import json
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ..data_models import PriceWindow
+from ..functions import ExchangeMetadataCache
+
+
+def load_kline_csv(path:str):
+    """
+    Load (open_time, close) from a kline CSV in the '/fapi/v1/klines' column order
+    (e.g. files from https://data.binance.vision). A header row is skipped if present.
+    """
+    with open(path) as f:
+        first_line = f.readline()
+    has_header = not first_line.split(",")[0].strip().isdigit()
+
+    data = np.loadtxt(path, delimiter=",", usecols=(0, 4), skiprows=int(has_header), ndmin=2)
+
+    open_time = data[:, 0].astype(np.int64)
+    close = data[:, 1]
+
+    order = np.argsort(open_time, kind="stable")
+    return open_time[order], close[order]
+
+
+def align_price_history(series:Dict[str, tuple],
+                        interval:Optional[int]=None):
+    """
+    Align {symbol: (open_time, close)} on a regular open_time grid of step `interval` (ms).
+    Klines missing for a symbol are NaN. `interval` defaults to the smallest step found in the data.
+    """
+    symbols = list(series)
+
+    if interval is None:
+        steps = [np.diff(open_time) for open_time, _ in series.values() if len(open_time) > 1]
+        interval = int(min(step[step > 0].min() for step in steps))
+
+    start = min(int(open_time[0]) for open_time, _ in series.values() if len(open_time))
+    end = max(int(open_time[-1]) for open_time, _ in series.values() if len(open_time))
+    grid = np.arange(start, end + interval, interval, dtype=np.int64)
+
+    close = np.full((len(grid), len(symbols)), np.nan)
+    for j, symbol in enumerate(symbols):
+        open_time, symbol_close = series[symbol]
+        on_grid = (open_time - start) % interval == 0
+        close[(open_time[on_grid] - start) // interval, j] = symbol_close[on_grid]
+
+    return PriceWindow(open_time=grid, symbols=symbols, close=close)
+
+
+def load_price_history(paths:Dict[str, str],
+                       interval:Optional[int]=None):
+    """
+    Load {symbol: kline CSV path} into one aligned PriceWindow.
+    """
+    series = {symbol: load_kline_csv(path) for symbol, path in paths.items()}
+    return align_price_history(series, interval=interval)
+
+
+def load_archive_history(archive,
+                         symbols:List[str],
+                         interval:str,
+                         start_time:Optional[int]=None,
+                         end_time:Optional[int]=None):
+    """
+    Load closing prices of `symbols` from a `KlineArchive` into one aligned PriceWindow.
+    Columns are read through np.memmap. Only the aligned close matrix is materialized.
+    """
+    series = {}
+    for symbol in symbols:
+        open_time, ohlcv = archive.read(symbol, interval, start_time=start_time, end_time=end_time)
+        series[symbol] = (np.asarray(open_time), np.asarray(ohlcv[:, 3]))
+
+    return align_price_history(series)
+
+
+def load_exchange_metadata(path:str,
+                           symbols:Optional[List[str]]=None):
+    """
+    Parse a saved '/fapi/v1/exchangeInfo' response into {symbol: SymbolMetadata}.
+    """
+    with open(path) as f:
+        exchange_info = json.load(f)
+
+    return {
+        asset_info["symbol"]: ExchangeMetadataCache.parse_symbol(asset_info)
+        for asset_info in exchange_info["symbols"]
+        if symbols is None or asset_info["symbol"] in symbols
+    }
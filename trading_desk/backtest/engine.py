@@ -0,0 +1,267 @@
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from ..data_models import MainConfig, PriceWindow
+from ..functions import SymbolMetadata, interval_ms, calc_order_quantity, calc_min_order_quantity, mock_fill_amount
+from ..strategy import get_strategy, select_long_short
+
+
+@dataclass
+class BacktestResult:
+    open_time: np.ndarray   # (K,) rebalance times in milliseconds, followed by the final liquidation time
+    equity: np.ndarray      # (K,) mark-to-market equity right before each rebalance, then after the final liquidation
+    init_capital: float
+    fees: float             # Total fee paid
+    turnover: float         # Total traded notional
+    n_orders: int
+
+    @property
+    def pnl(self):
+        return float(self.equity[-1] - self.init_capital)
+
+    @property
+    def max_drawdown(self):
+        """
+        Largest peak-to-trough decline of the equity curve, as a fraction of the peak.
+        """
+        equity = np.concatenate([[self.init_capital], self.equity])
+        peak = np.maximum.accumulate(equity)
+        return float(np.max((peak - equity) / peak))
+
+    def summary(self):
+        return {
+            "pnl": self.pnl,
+            "return": self.pnl / self.init_capital,
+            "turnover": self.turnover,
+            "fees": self.fees,
+            "max_drawdown": self.max_drawdown,
+            "n_orders": self.n_orders,
+        }
+
+
+class Backtester:
+    """
+    Replay a price history through the same strategy and mock accounting as `TradingDesk.strategy_func`.
+
+    At every {every}{unit} boundary T:
+    1. Held positions are cleared at the price at T (the close of the last complete kline).
+    2. Positions are calculated from the `lookback` klines closed before T.
+    3. Capital is split equally, and order quantity uses the same 0.95 buffer, precision rounding,
+       minimum order quantity check and `transaction_cost` as mock trading.
+
+    Signals for all rebalances are computed up front in vectorized chunks. Only the accounting loops in Python.
+    Intra-bar exits (`ExitEngine`) are not simulated.
+    """
+    def __init__(self,
+                 config:MainConfig,
+                 history:PriceWindow,
+                 metadata:Optional[Dict[str, SymbolMetadata]]=None,
+                 transaction_cost:float=0.0005,
+                 chunk_size:int=4096):
+        self.config = config
+        self.strategy = get_strategy(config.strategyconfig.strategy_name)
+        self.transaction_cost = transaction_cost
+        self.chunk_size = chunk_size
+
+        self.symbols = list(config.traded_assets)
+        missing = [s for s in self.symbols if s not in history.symbols]
+        if missing:
+            raise ValueError(f"Price history has no data for {missing}.")
+
+        # Avoid copying the history when possible (e.g. memory-mapped history shared by sweep workers)
+        columns = [history.symbols.index(s) for s in self.symbols]
+        if columns == list(range(history.close.shape[1])):
+            close = history.close
+        else:
+            close = history.close[:, columns]
+
+        # Closing prices at every {every}{unit} boundary: klines whose close time falls on a boundary
+        data_interval = int(history.open_time[1] - history.open_time[0])
+        strategy_interval = interval_ms(every=config.strategyconfig.every, unit=config.strategyconfig.unit)
+
+        if strategy_interval % data_interval != 0:
+            raise ValueError(f"Strategy interval {strategy_interval}ms is not a multiple of the data interval {data_interval}ms.")
+
+        on_boundary = (history.open_time + data_interval) % strategy_interval == 0
+        self.boundary_time = history.open_time[on_boundary] + data_interval # Rebalance time T
+        self.close = close if on_boundary.all() else close[on_boundary]
+
+        # Fill price: last known price (live trading uses the ticker price even if a kline is missing)
+        self.fill_price = self._forward_fill(self.close) if np.isnan(self.close).any() else self.close
+
+        self._load_metadata(metadata)
+
+
+    @staticmethod
+    def _forward_fill(close:np.ndarray):
+        idx = np.where(np.isnan(close), 0, np.arange(len(close))[:, None])
+        np.maximum.accumulate(idx, axis=0, out=idx)
+        return close[idx, np.arange(close.shape[1])]
+
+
+    def _load_metadata(self,
+                       metadata:Optional[Dict[str, SymbolMetadata]]):
+        # Without metadata, quantities are rounded to 8 decimals and the minimum order quantity check is skipped
+        self.has_metadata = metadata is not None
+        self.quantity_precision = []
+        self.min_qty = []
+        self.step_size = []
+        self.min_notional = []
+
+        for symbol in self.symbols:
+            if metadata is None:
+                self.quantity_precision.append(8)
+                self.min_qty.append(0.0)
+                self.step_size.append(None)
+                self.min_notional.append(0.0)
+                continue
+
+            m = metadata[symbol]
+            self.quantity_precision.append(m.quantity_precision)
+            self.min_qty.append(m.min_qty)
+            self.step_size.append(m.step_size)
+            self.min_notional.append(m.min_notional)
+
+
+    def signals(self):
+        """
+        Long/short masks (K, N) for every rebalance with a full lookback window.
+        """
+        lookback = self.strategy.lookback
+        windows = sliding_window_view(self.close, lookback, axis=0) # (K, N, lookback) view, no copy
+
+        long_masks = []
+        short_masks = []
+
+        for start in range(0, len(windows), self.chunk_size):
+            chunk = windows[start:start + self.chunk_size].transpose(2, 0, 1) # (lookback, chunk, N)
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                signal = self.strategy.signal_func(chunk)
+
+            long_mask, short_mask = select_long_short(signal=signal,
+                                                      n_asset_buy=self.config.strategyconfig.n_asset_buy,
+                                                      n_asset_sell=self.config.strategyconfig.n_asset_sell,
+                                                      sign_constraint=self.strategy.sign_constraint)
+            long_masks.append(long_mask)
+            short_masks.append(short_mask)
+
+        if not long_masks:
+            empty = np.zeros((0, len(self.symbols)), dtype=bool)
+            return empty, empty
+
+        return np.concatenate(long_masks), np.concatenate(short_masks)
+
+
+    def run(self):
+        lookback = self.strategy.lookback
+        long_masks, short_masks = self.signals()
+        n_rebalances = len(long_masks)
+
+        # Every (rebalance, asset) entry selected by the strategy, longs before shorts within a rebalance
+        long_rows, long_cols = np.nonzero(long_masks)
+        short_rows, short_cols = np.nonzero(short_masks)
+
+        rows = np.concatenate([long_rows, short_rows])
+        order = np.argsort(rows, kind="stable")
+        rows = rows[order]
+        cols = np.concatenate([long_cols, short_cols])[order]
+        sides = np.concatenate([np.ones(len(long_rows), dtype=np.int64),
+                                -np.ones(len(short_rows), dtype=np.int64)])[order]
+
+        # Entry price at the rebalance, and exit price at the next one (or the last price)
+        open_price = self.fill_price[rows + lookback - 1, cols]
+        close_price = self.fill_price[np.minimum(rows + lookback, len(self.fill_price) - 1), cols]
+
+        # Minimum order quantity does not depend on capital: evaluate every entry at once
+        min_order_quantity = np.zeros(len(rows))
+        if self.has_metadata:
+            step_size = np.array([np.nan if s is None else s for s in self.step_size])[cols]
+            min_order_quantity = calc_min_order_quantity(min_notional=np.array(self.min_notional)[cols],
+                                                         min_qty=np.array([0.0 if q is None else q for q in self.min_qty])[cols],
+                                                         step_size=step_size,
+                                                         mark_price=open_price)
+            min_order_quantity = np.where(np.isnan(step_size), 0.0, min_order_quantity)
+
+        bounds = np.searchsorted(rows, np.arange(n_rebalances + 1)).tolist()
+        precision = np.array(self.quantity_precision)[cols].tolist()
+        sides = sides.tolist()
+        open_price = open_price.tolist()
+        close_price = close_price.tolist()
+        min_order_quantity = min_order_quantity.tolist()
+
+        cost = self.transaction_cost
+        capital = float(self.config.init_capital)
+        fees = 0.0
+        turnover = 0.0
+        n_orders = 0
+
+        holdings = [] # (entry index, quantity)
+        equity = np.empty(n_rebalances + 1)
+
+        for k in range(n_rebalances):
+            # Step 1: Close existing positions
+            equity[k] = capital # Mark-to-market equity: capital + value of held positions at the current price
+
+            for p, quantity in holdings:
+                price = close_price[p]
+                equity[k] += sides[p]*quantity*price
+
+                capital += mock_fill_amount(position=-sides[p], quantity=quantity, price=price, transaction_cost=cost)
+                fees += quantity*price*cost
+                turnover += quantity*price
+
+            holdings = []
+
+            # Step 2: Position calculation
+            start, end = bounds[k], bounds[k + 1]
+            n_active = end - start
+
+            if n_active == 0:
+                continue
+
+            # Step 3: Open new positions
+            amount = capital / n_active
+
+            for p in range(start, end):
+                price = open_price[p]
+                if not price > 0:
+                    continue
+
+                quantity = calc_order_quantity(amount=amount,
+                                               price=price,
+                                               quantity_precision=precision[p])
+
+                ## Do NOT place order if calculated quantity is less then minimum order quantity
+                if quantity <= 0 or quantity < min_order_quantity[p]:
+                    continue
+
+                capital += mock_fill_amount(position=sides[p], quantity=quantity, price=price, transaction_cost=cost)
+                fees += quantity*price*cost
+                turnover += quantity*price
+                holdings.append((p, quantity))
+
+            n_orders += len(holdings)
+
+        # Liquidate at the last price
+        for p, quantity in holdings:
+            price = close_price[p]
+            capital += mock_fill_amount(position=-sides[p], quantity=quantity, price=price, transaction_cost=cost)
+            fees += quantity*price*cost
+            turnover += quantity*price
+        equity[-1] = capital
+
+        n_orders *= 2 # Every opened position is also closed
+
+        open_time = np.concatenate([self.boundary_time[lookback - 1:lookback - 1 + n_rebalances],
+                                    self.boundary_time[-1:]])
+
+        return BacktestResult(open_time=open_time,
+                              equity=equity,
+                              init_capital=float(self.config.init_capital),
+                              fees=fees,
+                              turnover=turnover,
+                              n_orders=n_orders)
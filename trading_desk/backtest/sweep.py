@@ -0,0 +1,110 @@
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, replace
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..data_models import MainConfig, PriceWindow, StrategyConfig
+from ..functions import SymbolMetadata
+from .engine import Backtester
+
+
+def save_price_history(history:PriceWindow,
+                       directory:str):
+    """
+    Save a PriceWindow as raw .npy files, so that workers can memory-map it instead of unpickling it.
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    np.save(os.path.join(directory, "open_time.npy"), np.ascontiguousarray(history.open_time, dtype=np.int64))
+    np.save(os.path.join(directory, "close.npy"), np.ascontiguousarray(history.close, dtype=np.float64))
+    with open(os.path.join(directory, "symbols.json"), "w") as f:
+        json.dump(list(history.symbols), f)
+
+
+def load_price_history_mmap(directory:str):
+    """
+    Memory-map a history saved by `save_price_history`. Pages are shared through the OS page cache.
+    """
+    with open(os.path.join(directory, "symbols.json")) as f:
+        symbols = json.load(f)
+
+    return PriceWindow(open_time=np.load(os.path.join(directory, "open_time.npy"), mmap_mode="r"),
+                       symbols=symbols,
+                       close=np.load(os.path.join(directory, "close.npy"), mmap_mode="r"))
+
+
+def expand_grid(base:StrategyConfig,
+                grid:Dict[str, List]):
+    """
+    Cartesian product of `grid` ({StrategyConfig field: candidate values}) applied on top of `base`.
+    """
+    names = list(grid)
+    return [replace(base, **dict(zip(names, values)))
+            for values in itertools.product(*(grid[name] for name in names))]
+
+
+# Worker state: loaded once per process by `_init_worker`
+_WORKER = {}
+
+
+def _init_worker(config:MainConfig,
+                 history_dir:str,
+                 metadata:Optional[Dict[str, SymbolMetadata]],
+                 transaction_cost:float):
+    _WORKER["config"] = config
+    _WORKER["history"] = load_price_history_mmap(history_dir)
+    _WORKER["metadata"] = metadata
+    _WORKER["transaction_cost"] = transaction_cost
+
+
+def _run_variant(strategyconfig:StrategyConfig):
+    config = replace(_WORKER["config"], strategyconfig=strategyconfig)
+
+    try:
+        result = Backtester(config=config,
+                            history=_WORKER["history"],
+                            metadata=_WORKER["metadata"],
+                            transaction_cost=_WORKER["transaction_cost"]).run()
+        row = result.summary()
+        row["error"] = None
+
+    except Exception as e:
+        row = {"error": str(e)}
+
+    row.update(asdict(strategyconfig))
+    return row
+
+
+def run_sweep(config:MainConfig,
+              history_dir:str,
+              variants:List[StrategyConfig],
+              metadata:Optional[Dict[str, SymbolMetadata]]=None,
+              transaction_cost:float=0.0005,
+              max_workers:Optional[int]=None):
+    """
+    Backtest every StrategyConfig in `variants` on a process pool.
+
+    Each worker memory-maps the history saved in `history_dir` once, and tasks only carry
+    a StrategyConfig, so price data is never pickled per task.
+
+    Returns a DataFrame ranked by PnL (rank 1 = best), one row per variant.
+    """
+    with ProcessPoolExecutor(max_workers=max_workers,
+                             initializer=_init_worker,
+                             initargs=(config, history_dir, metadata, transaction_cost)) as executor:
+        rows = list(executor.map(_run_variant, variants))
+
+    columns = list(asdict(variants[0])) if variants else []
+    results = pd.DataFrame(rows)
+    results = results[columns + [c for c in results.columns if c not in columns]]
+
+    if "pnl" in results:
+        results = results.sort_values("pnl", ascending=False, na_position="last")
+    results.index = pd.RangeIndex(1, len(results) + 1, name="rank")
+
+    return results
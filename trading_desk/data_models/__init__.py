@@ -1,3 +1,5 @@
-from .config_models import MainConfig, StrategyConfig
+from .config_models import MainConfig, StrategyConfig, ExitConfig
+from .price_window import PriceWindow
+from .desk_state import DeskState
 
-__all__ = ["MainConfig", "StrategyConfig"]
+__all__ = ["MainConfig", "StrategyConfig", "ExitConfig", "PriceWindow", "DeskState"]
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import List, Dict
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional
 
 # Configuration data models
 @dataclass
@@ -11,6 +11,14 @@ class StrategyConfig:
     n_asset_sell: int
     asset_weight_type: str
 
+@dataclass
+class ExitConfig:
+    take_profit: Optional[float] = 0.015    # e.g. 0.015: close once the position gains 1.5%
+    stop_loss: Optional[float] = None       # e.g. 0.02: close once the position loses 2%
+    trailing_stop: Optional[float] = None   # e.g. 0.01: close once the price retraces 1% from its best level
+    symbol_overrides: Dict[str, Dict[str, float]] = field(default_factory=dict) # e.g. {"BTCUSDT": {"take_profit": 0.01}}
+    rest_poll_interval: Optional[float] = 15.0 # REST prices for exits of symbols whose price stream is down, every N seconds. None disables it.
+
 @dataclass
 class MainConfig:
     session_name: str
@@ -21,3 +29,14 @@ class MainConfig:
     n_traded_assets: int
     init_capital: float
     strategyconfig: StrategyConfig
+    exitconfig: ExitConfig = field(default_factory=ExitConfig)
+    kline_archive_dir: Optional[str] = "./data/klines" # Local kline archive. None disables it.
+    ledger_backend: Optional[str] = "sqlite" # "sqlite", "parquet" (requires pyarrow) or None
+    ledger_path: str = "./data/ledger.db" # Database file (sqlite) or directory (parquet)
+    gspread_mirror: bool = True # Mirror transaction logs to Google Sheets
+    state_dir: Optional[str] = "./data/state" # Crash-safe desk state for warm restarts. None disables it.
+    kill_switch_file: Optional[str] = None # File holding 1/0, polled instead of the 'is_running' cell (C9) if set
+    metrics_port: Optional[int] = None # Prometheus text at http://127.0.0.1:{port}/metrics. None disables it.
+    metrics_dir: Optional[str] = None # Per-run JSON summaries ({metrics_dir}/{session_name}.jsonl). None disables them.
+    rest_base_url: str = "https://fapi.binance.com" # e.g. a local stub or simulator
+    ws_base_url: str = "wss://fstream.binance.com" # Price and user data streams
@@ -0,0 +1,16 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from ..strategy.position_model import Position
+
+
+@dataclass
+class DeskState:
+    session_name: str
+    saved_at: int                   # Milliseconds
+    capital: float
+    collateral_long: float
+    collateral_short: float
+    positions: List[Position] = field(default_factory=list)
+    leverage_set: List[str] = field(default_factory=list)   # Symbols whose leverage is already set
+    sheet_next_row: Optional[int] = None                    # Next free transaction log row of the worksheet
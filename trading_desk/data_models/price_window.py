@@ -0,0 +1,22 @@
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+# Market data models
+@dataclass
+class PriceWindow:
+    open_time: np.ndarray   # (T,) int64, kline open time in milliseconds, ascending
+    symbols: List[str]      # (N,)
+    close: np.ndarray       # (T, N) float64 closing prices, NaN where a kline is missing
+
+    def __len__(self):
+        return len(self.open_time)
+
+    def to_frame(self):
+        """
+        pandas view with the same layout as `build_dataframe` (open_time index, one column per symbol).
+        """
+        index = pd.DatetimeIndex(pd.to_datetime(self.open_time, unit="ms", utc=True), name="open_time")
+        return pd.DataFrame(self.close, index=index, columns=self.symbols)
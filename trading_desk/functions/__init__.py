@@ -1,15 +1,60 @@
-from .api_handler import APIHandler
+from .api_handler import APIHandler, interval_ms
+from .async_api_handler import AsyncAPIHandler
 from .dataframe_builder import build_closing_price_series, build_dataframe
+from .kline_decoder import decode_klines, decode_close, build_price_window
 from .order import place_market_buy, place_market_sell
 from .get_quantity_precision import get_quantity_precision
-from .get_min_order_quantity import get_min_order_quantity
+from .get_min_order_quantity import get_min_order_quantity, calc_min_order_quantity
+from .accounting import calc_order_quantity, mock_fill_amount
+from .exchange_metadata import ExchangeMetadataCache, SymbolMetadata, is_filter_rejection
+from .order_executor import OrderExecutor, OrderLeg, LegResult
+from .position_reconciler import PositionReconciler, PositionDiff
+from .kline_store import KlineStore, KlineRingBuffer
+from .price_stream import PriceStream
+from .user_data_stream import UserDataStream, AccountBook
+from .kline_archive import KlineArchive
+from .kline_downloader import KlineDownloader
+from .rate_limiter import RateLimiter, request_weight
+from .kill_switch import KillSwitch, file_source
+from .metrics import Metrics, NullMetrics, NULL_METRICS, MetricsServer
 
 __all__ = [
     "APIHandler",
+    "AsyncAPIHandler",
+    "interval_ms",
     "build_closing_price_series",
     "build_dataframe",
+    "decode_klines",
+    "decode_close",
+    "build_price_window",
     "get_quantity_precision",
     "get_min_order_quantity",
+    "calc_min_order_quantity",
+    "calc_order_quantity",
+    "mock_fill_amount",
+    "ExchangeMetadataCache",
+    "SymbolMetadata",
+    "is_filter_rejection",
+    "OrderExecutor",
+    "OrderLeg",
+    "LegResult",
+    "PositionReconciler",
+    "PositionDiff",
+    "KlineStore",
+    "KlineRingBuffer",
+    "PriceStream",
+    "UserDataStream",
+    "AccountBook",
+    "KlineArchive",
+    "KlineDownloader",
+    "RateLimiter",
+    "request_weight",
+    "KillSwitch",
+    "file_source",
+    "Metrics",
+    "NullMetrics",
+    "NULL_METRICS",
+    "MetricsServer",
     "place_market_buy",
     "place_market_sell",
     "place_mock_market_buy",
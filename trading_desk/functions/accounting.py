@@ -0,0 +1,40 @@
+"""
+Order sizing and mock-fill math shared by `TradingDesk.strategy_func` and the backtester.
+"""
+import math
+
+SAFETY_BUFFER = 0.95 # Decrease quantity as a safety buffer to avoid error {"code":-2019,"msg":"Margin is insufficient."}
+
+
+def calc_order_quantity(amount:float,
+                        price:float,
+                        quantity_precision:int,
+                        safety_buffer:float=SAFETY_BUFFER):
+    """
+    1. decrease quantity by multiplying `safety_buffer`
+    2. round down at quantity precision decimal points
+    """
+    factor = 10**quantity_precision
+    quantity = amount/price
+
+    return math.floor((quantity*safety_buffer)*factor)/factor
+
+
+def mock_fill_amount(position:int,
+                     quantity:float,
+                     price:float,
+                     transaction_cost:float):
+    """
+    Cash flow of a mock market order with the fee deducted.
+    `position` is the side of the order: 1 for buy, -1 for sell.
+
+    Fee deduction example: open short -> close with long
+    
+    Quantity |  Price  | Position | Executed |     Fee    | Fee deducted |  balance
+    ---------------------------------------------------------------------------------
+             |         |          |          |            |              |  6.742414
+         3.1 |  2.1915 |       -1 |  6.7937  | 0.00339683 |       6.7903 | 13.532667
+         3.1 |  2.1908 |        1 | -6.7915  | 0.00339574 |      -6.7949 |  6.737791
+    """
+    order_amount = -1*position*quantity*price            # `Executed`
+    return order_amount*(1 + position*transaction_cost)  # `Fee deducted`
@@ -1,21 +1,91 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import datetime
 import hashlib
 import hmac
 from requests import Session, exceptions
+from requests.adapters import HTTPAdapter
 from requests.exceptions import Timeout, HTTPError, RequestException
 from urllib.parse import urlencode
 import time
 import uuid
-from typing import Optional
+from typing import Dict, List, Optional
+
+from .clock_sync import ClockSync
+from .rate_limiter import RateLimiter
+from .metrics import NULL_METRICS, REQUEST_METRIC
+
+# Writes that set a state rather than add one: like reads, they are retried after a 5xx
+IDEMPOTENT_WRITES = ["/fapi/v1/leverage", "/fapi/v1/listenKey"]
+MAX_5XX_RETRIES = 2
+RETRY_5XX_DELAY = 0.2 # Seconds, doubled on every retry
+
+
+def is_idempotent(endpoint:str,
+                  method:str):
+    """
+    Whether a request can be repeated when its outcome is unknown (5xx). New orders never are.
+    """
+    return method.upper() == "GET" or endpoint in IDEMPOTENT_WRITES
+
+
+def interval_ms(every:int,
+                unit:str):
+    """
+    Length of one {every}{unit} kline in milliseconds.
+    """
+    if unit=="m":
+        return every * 60 * 1000
+    elif unit=="h":
+        return every * 60 * 60 * 1000
+    else:
+        raise NotImplementedError(f"The unit {unit} is not supported yet.")
 
 class APIHandler:
     def __init__(self,
                  binance_api_key:str,
-                 binance_secret_key:str):
-        self.base_url = "https://fapi.binance.com"
+                 binance_secret_key:str,
+                 max_workers:int=10,
+                 base_url:str="https://fapi.binance.com",
+                 rate_limiter:Optional[RateLimiter]=None):
+        self.base_url = base_url # Overridable, e.g. to point at a local mock server
+        self.max_workers = max_workers # Concurrency limit for batched requests
+
+        # Connection pool sized for concurrent requests from the batch helpers
         self.session = Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.binance_api_key = binance_api_key
         self.binance_secret_key = binance_secret_key
+        self.clock_sync = ClockSync(api_handler=self)
+
+        # Request weight / order count budget. Pass the same limiter to handlers sharing an IP.
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+
+        # Optional `AccountBook` fed by a `UserDataStream`. Order confirmations are read from it before polling REST.
+        self.account_book = None
+
+        # Per-endpoint latency histograms. Replace with a `Metrics` instance to enable.
+        self.metrics = NULL_METRICS
+
+
+    def sign(self,
+             params:dict,
+             headers:dict):
+        """
+        Add `timestamp`, `signature` and the API-key header to a signed request (in place).
+        """
+        params.setdefault("timestamp", self.clock_sync.now_ms())
+
+        query_string = urlencode(params)
+        signature = hmac.new(
+            self.binance_secret_key.encode("utf-8"),
+            query_string.encode("utf-8"),
+            hashlib.sha256
+        ).hexdigest()
+
+        params["signature"] = signature
+        headers["X-MBX-APIKEY"] = self.binance_api_key
 
 
     def fetch(self,
@@ -26,42 +96,50 @@ class APIHandler:
               params: Optional[dict]=None,
               data: Optional[dict]=None,
               signed: bool=False,
-              timeout: int = 10):
+              timeout: int = 10,
+              _resynced: bool=False,
+              _rate_limited: bool=False,
+              _retries: int=0):
 
         url = self.base_url + endpoint
 
+        unsigned_params = params
         params = params.copy() if params else {}
         headers = headers.copy() if headers else {}
 
-        if signed:
-
-            # To prevent recvWindow error that once occurred from '/fapi/v3/positionRisk': 
-            # {"code":-1021,"msg":"Timestamp for this request is outside of the recvWindow."}
-            server_time= self.get_server_time(is_unix=True)
-            offset = server_time - int(datetime.datetime.now(datetime.timezone.utc).timestamp() * 1000)
+        # Wait for request weight (and order count) before signing, so the timestamp is fresh
+        self.rate_limiter.acquire(endpoint=endpoint, method=method, params=params)
 
-            params.setdefault(
-                "timestamp",
-                int(datetime.datetime.now(datetime.timezone.utc).timestamp() * 1000) + offset
-            )
-
-            query_string = urlencode(params)
-            signature = hmac.new(
-                self.binance_secret_key.encode("utf-8"),
-                query_string.encode("utf-8"),
-                hashlib.sha256
-            ).hexdigest()
-
-            params["signature"] = signature
-            headers["X-MBX-APIKEY"] = self.binance_api_key
+        if signed:
+            # Timestamps are corrected with the locally tracked server-clock offset
+            # instead of a '/fapi/v1/time' round trip per signed request.
+            self.sign(params=params, headers=headers)
             
         try:
+            start = time.perf_counter()
             response = self.session.request(method=method.upper(),
                                             url=url,
                                             headers=headers,
                                             params=params,
                                             data=data,
                                             timeout=timeout)
+            self.metrics.observe(REQUEST_METRIC, time.perf_counter() - start, endpoint=endpoint, method=method.upper())
+
+            self.rate_limiter.update(headers=response.headers, status_code=response.status_code)
+
+            # 429: the request was rejected for exceeding a limit. The limiter now waits for Retry-After; retry once.
+            # 418 (IP ban) is not retried.
+            if response.status_code == 429 and not _rate_limited:
+                return self.fetch(endpoint=endpoint,
+                                  method=method,
+                                  headers=headers,
+                                  params=unsigned_params,
+                                  data=data,
+                                  signed=signed,
+                                  timeout=timeout,
+                                  _resynced=_resynced,
+                                  _rate_limited=True,
+                                  _retries=_retries)
 
             json_response = response.json()
             response.raise_for_status()
@@ -70,6 +148,35 @@ class APIHandler:
             raise RuntimeError("Request timed out") from e
 
         except HTTPError as e:
+            # {"code":-1021,"msg":"Timestamp for this request is outside of the recvWindow."}
+            # The clock estimate is stale: resync and retry once with a fresh timestamp.
+            if signed and not _resynced and "-1021" in response.text:
+                self.clock_sync.resync()
+                return self.fetch(endpoint=endpoint,
+                                  method=method,
+                                  headers=headers,
+                                  params=unsigned_params,
+                                  data=data,
+                                  signed=signed,
+                                  timeout=timeout,
+                                  _resynced=True,
+                                  _rate_limited=_rate_limited,
+                                  _retries=_retries)
+
+            # 5xx (e.g. -1001): transient server error. Idempotent requests are retried with backoff.
+            if response.status_code >= 500 and _retries < MAX_5XX_RETRIES and is_idempotent(endpoint=endpoint, method=method):
+                time.sleep(RETRY_5XX_DELAY*2**_retries)
+                return self.fetch(endpoint=endpoint,
+                                  method=method,
+                                  headers=headers,
+                                  params=unsigned_params,
+                                  data=data,
+                                  signed=signed,
+                                  timeout=timeout,
+                                  _resynced=_resynced,
+                                  _rate_limited=_rate_limited,
+                                  _retries=_retries + 1)
+
             raise RuntimeError(
                 f"HTTP error {response.status_code} for {url}: {response.text}"
             ) from e
@@ -97,6 +204,8 @@ class APIHandler:
 
         response = self.fetch(endpoint="/fapi/v1/exchangeInfo",
                               method="GET")
+
+        self.rate_limiter.update_limits(response.get("rateLimits", []))
         
         return response
 
@@ -129,8 +238,7 @@ class APIHandler:
         return float(response["price"])
 
 
-    def fetch_klines(self, 
-                     symbol:str,
+    def kline_window(self,
                      every:int,
                      unit:str,
                      timesteps:int):
@@ -199,15 +307,35 @@ class APIHandler:
 
         else:
             raise NotImplementedError(f"The unit {unit} is not supported yet.")
-        
+
+        return start_time, end_time
 
 
+    def fetch_klines(self, 
+                     symbol:str,
+                     every:int,
+                     unit:str,
+                     timesteps:int,
+                     window:Optional[tuple]=None):
+        """
+        `window` is an optional (start_time, end_time) pair in milliseconds.
+        It defaults to the window ending at the current {every}{unit} boundary (see `kline_window`).
+        """
+
+        if window is None:
+            window = self.kline_window(every=every,
+                                       unit=unit,
+                                       timesteps=timesteps)
+        else:
+            timesteps = (window[1] - window[0]) // interval_ms(every=every, unit=unit)
+        start_time, end_time = window
+
         params = {
             'symbol': symbol,
             'interval': f"{every}{unit}",
             'startTime': start_time,
             'endTime': end_time,
-            'limit': 500
+            'limit': timesteps + 1 # The window holds timesteps+1 klines. limit < 100 costs the minimum request weight (1).
         }
 
         response = self.fetch(endpoint="/fapi/v1/klines",
@@ -217,7 +345,99 @@ class APIHandler:
         return response
 
 
+    def fetch_klines_page(self,
+                          symbol:str,
+                          every:int,
+                          unit:str,
+                          start_time:int,
+                          end_time:Optional[int]=None,
+                          limit:int=1000):
+        """
+        Up to `limit` klines opened at or after `start_time` (and at or before `end_time`), oldest first.
+        Used for bulk history downloads. limit <= 1000 costs request weight 5 (max limit 1500 costs 10).
+        """
+        params = {
+            'symbol': symbol,
+            'interval': f"{every}{unit}",
+            'startTime': start_time,
+            'limit': limit
+        }
+        if end_time is not None:
+            params['endTime'] = end_time
+
+        response = self.fetch(endpoint="/fapi/v1/klines",
+                              method="GET",
+                              params=params)
+        
+        return response
+
+
+    def fetch_klines_many(self,
+                          symbols:List[str],
+                          every:int,
+                          unit:str,
+                          timesteps:Optional[int]=None,
+                          windows:Optional[Dict[str, tuple]]=None):
+        """
+        Fetch the same kline window for many symbols concurrently.
+        `windows` ({symbol: (start_time, end_time)}) overrides the shared window per symbol,
+        e.g. to request only the klines missing from a `KlineStore`.
+
+        Requests run on a thread pool bounded by `max_workers`, so a batch takes roughly
+        as long as its slowest request. Each call costs request weight 1 (limit < 100),
+        e.g. 200 symbols use 200 of the 2400 weight/min IP budget.
+
+        Returns
+        ---
+        - klines: {symbol: raw '/fapi/v1/klines' response} for the symbols that succeeded
+        - errors: {symbol: error message} for the symbols that failed
+        """
+        klines = {}
+        errors = {}
+
+        # Every symbol shares one window, even if the batch straddles a bar boundary
+        if windows is None:
+            window = self.kline_window(every=every,
+                                       unit=unit,
+                                       timesteps=timesteps)
+            windows = {symbol: window for symbol in symbols}
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, max(1, len(symbols)))) as executor:
+            futures = {
+                executor.submit(self.fetch_klines,
+                                symbol=symbol,
+                                every=every,
+                                unit=unit,
+                                timesteps=timesteps,
+                                window=windows[symbol]): symbol
+                for symbol in symbols
+            }
+
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    klines[symbol] = future.result()
+                except Exception as e:
+                    errors[symbol] = str(e)
+
+        # Keep the caller's symbol order
+        klines = {symbol: klines[symbol] for symbol in symbols if symbol in klines}
+
+        return klines, errors
+
+
     # Account-related endpoints
+    def get_balances(self):
+        """
+        Every asset of the futures wallet ('/fapi/v2/balance').
+        """
+        response = self.fetch(endpoint="/fapi/v2/balance",
+                              method="GET",
+                              signed=True)
+
+        return response
+
+
     def get_balance(self,
                     symbol:str):
     
@@ -270,6 +490,47 @@ class APIHandler:
         return response
     
 
+    def fetch_positions(self):
+        """
+        Fetch every open position in one call (symbols without a position are omitted).
+        """
+        response = self.fetch(endpoint="/fapi/v3/positionRisk",
+                              method="GET",
+                              signed=True)
+        
+        return response
+    
+
+    # User data stream endpoints (API-key header, no signature)
+    def create_listen_key(self):
+
+        response = self.fetch(endpoint="/fapi/v1/listenKey",
+                              method="POST",
+                              headers={"X-MBX-APIKEY": self.binance_api_key})
+
+        return response["listenKey"]
+
+
+    def keepalive_listen_key(self):
+        """
+        Extend the listenKey validity by 60 minutes.
+        """
+        response = self.fetch(endpoint="/fapi/v1/listenKey",
+                              method="PUT",
+                              headers={"X-MBX-APIKEY": self.binance_api_key})
+
+        return response
+
+
+    def close_listen_key(self):
+
+        response = self.fetch(endpoint="/fapi/v1/listenKey",
+                              method="DELETE",
+                              headers={"X-MBX-APIKEY": self.binance_api_key})
+
+        return response
+
+
     # Order-related endpoints
     def old_place_market_order(self,
                            symbol:str,
@@ -298,9 +559,11 @@ class APIHandler:
     def place_market_order(self,
                            symbol: str,
                            side: str,
-                           quantity: float):
+                           quantity: float,
+                           position_amount: float = 0.0):
         """
         Place Buy/Sell market order safely (handles -1007 timeout).
+        `position_amount` is the signed position before the order (0 when opening from flat).
         """
 
         client_order_id = str(uuid.uuid4())
@@ -328,6 +591,13 @@ class APIHandler:
             # 🔥 Handle Binance timeout (-1007)
             if "-1007" in str(e):
 
+                # Step 0: The user data stream reports the order without a REST round trip
+                if self.account_book is not None:
+                    order = self.account_book.wait_for_order(client_order_id=client_order_id,
+                                                             timeout=3.0)
+                    if order is not None:
+                        return order
+
                 # Step 1: Check if order actually exists
                 for _ in range(5):
                     time.sleep(0.5)
@@ -358,7 +628,9 @@ class APIHandler:
                         signed=True
                     )
 
-                    if position and abs(float(position[0]["positionAmt"])) > 0:
+                    # positionRisk v3 omits flat symbols
+                    amount = float(position[0]["positionAmt"]) if position else 0.0
+                    if abs(amount - position_amount) > 1e-12:
                         # Position changed → assume order executed
                         return {
                             "status": "UNKNOWN_BUT_POSITION_CHANGED",
@@ -0,0 +1,348 @@
+import asyncio
+import json
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlencode
+import uuid
+
+import aiohttp
+from yarl import URL
+
+from .api_handler import APIHandler, interval_ms, is_idempotent, MAX_5XX_RETRIES, RETRY_5XX_DELAY
+from .metrics import REQUEST_METRIC
+
+
+class AsyncAPIHandler:
+    """
+    asyncio counterpart of `APIHandler` on a pooled aiohttp client.
+
+    It is built on a synchronous `APIHandler` and shares its credentials, HMAC signing (`APIHandler.sign`),
+    server-clock offset and `RateLimiter`, so both handlers can be used side by side on one budget.
+
+    Connections are kept alive and reused from a pool of `max_connections` to the single API host,
+    so concurrent coroutines (market data, balance, order legs) run in parallel without new TLS handshakes.
+
+    ```python
+    async with AsyncAPIHandler(api_handler=api_handler) as handler:
+        balance, klines = await asyncio.gather(handler.get_balance("USDT"),
+                                               handler.fetch_klines("BTCUSDT", every=1, unit="m", timesteps=13))
+    ```
+    """
+    def __init__(self,
+                 api_handler:APIHandler,
+                 max_connections:int=20,
+                 keepalive_timeout:float=60):
+        self.api_handler = api_handler
+        self.base_url = api_handler.base_url
+        self.rate_limiter = api_handler.rate_limiter
+        self.max_connections = max_connections
+        self.keepalive_timeout = keepalive_timeout
+
+        self.session: Optional[aiohttp.ClientSession] = None
+
+
+    async def __aenter__(self):
+        self._get_session()
+        return self
+
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+    def _get_session(self):
+        # Created lazily: an aiohttp session must be bound to the running event loop
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections,
+                                             limit_per_host=self.max_connections,
+                                             keepalive_timeout=self.keepalive_timeout,
+                                             ttl_dns_cache=300)
+            self.session = aiohttp.ClientSession(connector=connector)
+
+        return self.session
+
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+
+
+    async def fetch(self,
+                    endpoint:str,
+                    method:str,
+                    *,
+                    headers: Optional[dict]=None,
+                    params: Optional[dict]=None,
+                    data: Optional[dict]=None,
+                    signed: bool=False,
+                    timeout: int = 10,
+                    _resynced: bool=False,
+                    _rate_limited: bool=False,
+                    _retries: int=0):
+
+        unsigned_params = params
+        params = params.copy() if params else {}
+        headers = headers.copy() if headers else {}
+
+        # Wait for request weight (and order count) without blocking the event loop
+        while True:
+            wait = self.rate_limiter.reserve(endpoint=endpoint, method=method, params=params)
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+
+        if signed:
+            # The first signed request syncs the clock (blocking REST burst + check thread): off the loop
+            if self.api_handler.clock_sync.offset is None:
+                await asyncio.to_thread(self.api_handler.clock_sync.now_ms)
+            self.api_handler.sign(params=params, headers=headers)
+
+        # The query string is sent exactly as it was signed
+        url = self.base_url + endpoint
+        if params:
+            url = f"{url}?{urlencode(params)}"
+
+        try:
+            start = time.perf_counter()
+            async with self._get_session().request(method=method.upper(),
+                                                   url=URL(url, encoded=True),
+                                                   headers=headers,
+                                                   data=data,
+                                                   timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                self.rate_limiter.update(headers=response.headers, status_code=response.status)
+                status = response.status
+                text = await response.text()
+            self.api_handler.metrics.observe(REQUEST_METRIC, time.perf_counter() - start, endpoint=endpoint, method=method.upper())
+
+        except asyncio.TimeoutError as e:
+            raise RuntimeError("Request timed out") from e
+
+        except aiohttp.ClientError as e:
+            raise RuntimeError(f"Request failed for {self.base_url + endpoint}") from e
+
+        retry = dict(endpoint=endpoint,
+                     method=method,
+                     headers=headers,
+                     params=unsigned_params,
+                     data=data,
+                     signed=signed,
+                     timeout=timeout,
+                     _resynced=_resynced,
+                     _rate_limited=_rate_limited,
+                     _retries=_retries)
+
+        # 429: rejected for exceeding a limit. The limiter now waits for Retry-After; retry once.
+        if status == 429 and not _rate_limited:
+            retry["_rate_limited"] = True
+            return await self.fetch(**retry)
+
+        if status >= 400:
+            # -1021: the clock estimate is stale. Resync (blocking call, off the loop) and retry once.
+            if signed and not _resynced and "-1021" in text:
+                await asyncio.to_thread(self.api_handler.clock_sync.resync)
+                retry["_resynced"] = True
+                return await self.fetch(**retry)
+
+            # 5xx: transient server error. Idempotent requests are retried with backoff.
+            if status >= 500 and _retries < MAX_5XX_RETRIES and is_idempotent(endpoint=endpoint, method=method):
+                await asyncio.sleep(RETRY_5XX_DELAY*2**_retries)
+                retry["_retries"] = _retries + 1
+                return await self.fetch(**retry)
+
+            raise RuntimeError(f"HTTP error {status} for {self.base_url + endpoint}: {text}")
+
+        if text:
+            return json.loads(text)
+
+
+    # Market data endpoints
+    async def get_server_time(self):
+        response = await self.fetch(endpoint="/fapi/v1/time",
+                                    method="GET")
+        return response["serverTime"]
+
+
+    async def get_exchange_info(self):
+        response = await self.fetch(endpoint="/fapi/v1/exchangeInfo",
+                                    method="GET")
+
+        self.rate_limiter.update_limits(response.get("rateLimits", []))
+
+        return response
+
+
+    async def get_current_price(self,
+                                symbol:str):
+        response = await self.fetch(endpoint="/fapi/v1/ticker/price",
+                                    method="GET",
+                                    params={"symbol": symbol})
+        return float(response["price"])
+
+
+    async def fetch_klines(self,
+                           symbol:str,
+                           every:int,
+                           unit:str,
+                           timesteps:int,
+                           window:Optional[tuple]=None):
+        """
+        Same window semantics as `APIHandler.fetch_klines`.
+        """
+        if window is None:
+            window = self.api_handler.kline_window(every=every,
+                                                   unit=unit,
+                                                   timesteps=timesteps)
+        else:
+            timesteps = (window[1] - window[0]) // interval_ms(every=every, unit=unit)
+        start_time, end_time = window
+
+        params = {
+            'symbol': symbol,
+            'interval': f"{every}{unit}",
+            'startTime': start_time,
+            'endTime': end_time,
+            'limit': timesteps + 1
+        }
+
+        return await self.fetch(endpoint="/fapi/v1/klines",
+                                method="GET",
+                                params=params)
+
+
+    async def fetch_klines_many(self,
+                                symbols:List[str],
+                                every:int,
+                                unit:str,
+                                timesteps:Optional[int]=None,
+                                windows:Optional[Dict[str, tuple]]=None):
+        """
+        Same contract as `APIHandler.fetch_klines_many`: returns (klines, errors).
+        Concurrency is bounded by the connection pool.
+        """
+        if windows is None:
+            window = self.api_handler.kline_window(every=every,
+                                                   unit=unit,
+                                                   timesteps=timesteps)
+            windows = {symbol: window for symbol in symbols}
+
+        results = await asyncio.gather(*(self.fetch_klines(symbol=symbol,
+                                                           every=every,
+                                                           unit=unit,
+                                                           timesteps=timesteps,
+                                                           window=windows[symbol])
+                                         for symbol in symbols),
+                                       return_exceptions=True)
+
+        klines = {}
+        errors = {}
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                errors[symbol] = str(result)
+            else:
+                klines[symbol] = result
+
+        return klines, errors
+
+
+    # Account-related endpoints
+    async def get_balance(self,
+                          symbol:str):
+        response = await self.fetch(endpoint="/fapi/v2/balance",
+                                    method="GET",
+                                    signed=True)
+
+        return next((bal for bal in response if bal["asset"] == symbol), None)
+
+
+    async def set_leverage(self,
+                           symbol:str,
+                           leverage:int=1):
+        return await self.fetch(endpoint="/fapi/v1/leverage",
+                                method="POST",
+                                params={'symbol': symbol, 'leverage': leverage},
+                                signed=True)
+
+
+    async def fetch_position(self,
+                             symbol:str):
+        return await self.fetch(endpoint="/fapi/v3/positionRisk",
+                                method="GET",
+                                params={'symbol': symbol},
+                                signed=True)
+
+
+    # Order-related endpoints
+    async def place_market_order(self,
+                                 symbol:str,
+                                 side:str,
+                                 quantity:float,
+                                 position_amount:float=0.0):
+        """
+        Place Buy/Sell market order. A -1007 timeout is resolved like `APIHandler.place_market_order`:
+        wait on the attached `AccountBook` (if any), look the order up by client order id,
+        then check the position against `position_amount` (signed, before the order), then retry once.
+        """
+        client_order_id = str(uuid.uuid4())
+
+        params = {
+            "symbol": symbol,
+            "side": side,
+            "type": "MARKET",
+            "quantity": quantity,
+            "newOrderRespType": "RESULT",
+            "newClientOrderId": client_order_id
+        }
+
+        try:
+            return await self.fetch(endpoint="/fapi/v1/order",
+                                    method="POST",
+                                    params=params,
+                                    signed=True)
+
+        except Exception as e:
+            if "-1007" not in str(e):
+                raise e
+
+        # Step 0: The user data stream reports the order without a REST round trip
+        account_book = self.api_handler.account_book
+        if account_book is not None:
+            order = await asyncio.to_thread(account_book.wait_for_order,
+                                            client_order_id=client_order_id,
+                                            timeout=3.0)
+            if order is not None:
+                return order
+
+        # Step 1: Check if order actually exists
+        for _ in range(5):
+            await asyncio.sleep(0.5)
+
+            try:
+                order = await self.fetch(endpoint="/fapi/v1/order",
+                                         method="GET",
+                                         params={"symbol": symbol, "origClientOrderId": client_order_id},
+                                         signed=True)
+                if order:
+                    return order
+
+            except Exception:
+                pass
+
+        # Step 2: Check position
+        try:
+            position = await self.fetch_position(symbol=symbol)
+
+            amount = float(position[0]["positionAmt"]) if position else 0.0
+            if abs(amount - position_amount) > 1e-12:
+                return {
+                    "status": "UNKNOWN_BUT_POSITION_CHANGED",
+                    "clientOrderId": client_order_id
+                }
+
+        except Exception:
+            pass
+
+        # Step 3: Safe retry (only once)
+        return await self.fetch(endpoint="/fapi/v1/order",
+                                method="POST",
+                                params=params,
+                                signed=True)
@@ -0,0 +1,140 @@
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+
+def local_time_ms():
+    return time.time() * 1000
+
+
+class ClockSync:
+    """
+    Local estimate of the Binance server clock, used to timestamp signed requests
+    without a '/fapi/v1/time' round trip per call.
+
+    The offset (server - local) is modelled as `offset + drift*(local - reference)`.
+    Each estimate is the median offset of the lowest-latency samples in a burst,
+    where a sample assumes the server stamped its time halfway through the round trip.
+    Drift is the least-squares slope over the recent estimates.
+
+    A background thread takes one sample every `check_interval` seconds and only
+    re-runs a full burst when the prediction error exceeds `max_error_ms`.
+    `resync()` forces a burst, e.g. after Binance returns -1021.
+    """
+    def __init__(self,
+                 api_handler,
+                 n_samples:int=5,
+                 check_interval:float=300,
+                 max_error_ms:float=250,
+                 history_size:int=10):
+        self.api_handler = api_handler
+        self.n_samples = n_samples
+        self.check_interval = check_interval
+        self.max_error_ms = max_error_ms
+
+        self.history = deque(maxlen=history_size) # (local_ms, offset_ms) estimates
+        self.offset: Optional[float] = None
+        self.drift = 0.0
+        self.reference = 0.0
+
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+
+    def sample(self):
+        """
+        Take one sample. Returns (local_ms at midpoint, offset_ms, round_trip_ms).
+        """
+        sent = local_time_ms()
+        server_time = self.api_handler.get_server_time(is_unix=True)
+        received = local_time_ms()
+
+        midpoint = (sent + received) / 2
+        return midpoint, server_time - midpoint, received - sent
+
+
+    def resync(self):
+        samples = [self.sample() for _ in range(self.n_samples)]
+
+        # Keep the faster half of the samples: their midpoint assumption is the most accurate
+        samples.sort(key=lambda s: s[2])
+        best = samples[:max(1, (len(samples) + 1) // 2)]
+        offsets = sorted(s[1] for s in best)
+
+        local_ms = sum(s[0] for s in best) / len(best)
+        offset = offsets[len(offsets) // 2]
+
+        with self._lock:
+            self.history.append((local_ms, offset))
+            self._fit()
+
+
+    def check(self):
+        """
+        Compare one fresh sample against the prediction, and resync if it drifted too far.
+        """
+        local_ms, offset, _ = self.sample()
+
+        if abs(offset - self.predict_offset(local_ms)) > self.max_error_ms:
+            with self._lock:
+                self.history.clear()
+            self.resync()
+        else:
+            with self._lock:
+                self.history.append((local_ms, offset))
+                self._fit()
+
+
+    def _fit(self):
+        n = len(self.history)
+        local_mean = sum(h[0] for h in self.history) / n
+        offset_mean = sum(h[1] for h in self.history) / n
+
+        var = sum((h[0] - local_mean)**2 for h in self.history)
+        cov = sum((h[0] - local_mean)*(h[1] - offset_mean) for h in self.history)
+
+        self.reference = local_mean
+        self.offset = offset_mean
+        self.drift = cov / var if var > 0 else 0.0
+
+
+    def predict_offset(self,
+                       local_ms:float):
+        with self._lock:
+            return self.offset + self.drift*(local_ms - self.reference)
+
+
+    def now_ms(self):
+        """
+        Current server time in milliseconds, corrected locally.
+        """
+        if self.offset is None:
+            self.resync()
+            self.start()
+
+        local_ms = local_time_ms()
+        return int(local_ms + self.predict_offset(local_ms))
+
+
+    # Background thread
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+
+            self._thread = threading.Thread(target=self._run, name="clock-sync", daemon=True)
+            self._thread.start()
+
+
+    def stop(self):
+        self._stop_event.set()
+
+
+    def _run(self):
+        while not self._stop_event.wait(self.check_interval):
+            try:
+                self.check()
+            except Exception:
+                pass # Keep the last estimate. Signed requests fall back to resync() on -1021.
@@ -1,15 +1,17 @@
+from typing import Dict, List
+
 import pandas as pd
 
+from .kline_decoder import decode_close
+
 def build_closing_price_series(klines:List):
-    df = pd.DataFrame(klines, columns=[
-                "open_time", "open", "high", "low", "close", "volume",
-                "close_time", "quote_volume", "num_trades",
-                "taker_buy_base_volume", "taker_buy_quote_volume", "ignore"
-            ])
-
-    df["open_time"] = pd.to_datetime(df["open_time"], unit="ms", utc=True)
-    df["close"] = df["close"].astype(float)
-    return df.set_index("open_time")["close"]
+    """
+    pandas view of the closing prices of a raw '/fapi/v1/klines' response (open_time index).
+    Prefer `decode_close` / `build_price_window` when no DataFrame is needed.
+    """
+    open_time, close = decode_close(klines)
+    index = pd.DatetimeIndex(pd.to_datetime(open_time, unit="ms", utc=True), name="open_time")
+    return pd.Series(close, index=index, name="close")
 
 def build_dataframe(close_prices:Dict):
     return pd.DataFrame(close_prices)
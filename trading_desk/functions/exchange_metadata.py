@@ -0,0 +1,133 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+# Order rejections caused by stale symbol filters (precision, LOT_SIZE, MIN_NOTIONAL, max quantity).
+# When one of them is returned, the cached exchangeInfo snapshot is considered outdated.
+FILTER_REJECTION_CODES = ["-1111", "-1013", "-4164", "-4005"]
+
+
+def is_filter_rejection(error:Exception):
+    return any(code in str(error) for code in FILTER_REJECTION_CODES)
+
+
+@dataclass
+class SymbolMetadata:
+    symbol: str
+    status: str
+    quantity_precision: int
+    step_size: Optional[float]   # None if the symbol has no 'MARKET_LOT_SIZE' filter
+    min_qty: Optional[float]
+    min_notional: float
+
+
+class ExchangeMetadataCache:
+    """
+    Symbol-keyed cache of the '/fapi/v1/exchangeInfo' fields needed for order sizing.
+
+    exchangeInfo is downloaded once per refresh and parsed into `SymbolMetadata`,
+    so `get_quantity_precision` and `get_min_order_quantity` become dictionary lookups.
+    The snapshot is refreshed when it is older than `ttl` seconds, when an unknown symbol
+    is requested, or explicitly through `refresh()` (e.g. after a filter-related order rejection).
+    """
+    def __init__(self,
+                 api_handler,
+                 ttl:float=3600):
+        self.api_handler = api_handler
+        self.ttl = ttl
+
+        self.symbols: Optional[List[str]] = None  # None -> cache every symbol in exchangeInfo
+        self.metadata: Dict[str, SymbolMetadata] = {}
+        self.last_refreshed = None
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.RLock() # One exchangeInfo download at a time; guards `symbols`
+
+
+    def load(self,
+             symbols:Optional[List[str]]=None):
+        """
+        Restrict the cache to `symbols` and fill it with a single exchangeInfo call.
+        """
+        with self._refresh_lock:
+            self.symbols = list(symbols) if symbols is not None else None
+            self.refresh()
+
+
+    def refresh(self):
+        with self._refresh_lock:
+            self._refresh()
+
+
+    def _refresh(self):
+        exchange_info = self.api_handler.get_exchange_info()
+
+        wanted = set(self.symbols) if self.symbols is not None else None
+        metadata = {}
+
+        for asset_info in exchange_info["symbols"]:
+            if wanted is not None and asset_info["symbol"] not in wanted:
+                continue
+            metadata[asset_info["symbol"]] = self.parse_symbol(asset_info)
+
+        with self._lock:
+            self.metadata = metadata
+            self.last_refreshed = time.monotonic()
+
+
+    def is_expired(self):
+        return self.last_refreshed is None or time.monotonic() - self.last_refreshed > self.ttl
+
+
+    def get(self,
+            symbol:str):
+        if self.is_expired():
+            with self._refresh_lock:
+                # Double-checked: threads that waited here find the snapshot refreshed by the first one
+                if self.is_expired():
+                    self._refresh()
+
+        with self._lock:
+            metadata = self.metadata.get(symbol)
+
+        # Symbol is not cached yet (e.g. listed after the last refresh, or outside `symbols`)
+        if metadata is None:
+            with self._refresh_lock:
+                with self._lock:
+                    metadata = self.metadata.get(symbol)
+
+                if metadata is None:
+                    if self.symbols is not None and symbol not in self.symbols:
+                        self.symbols.append(symbol)
+                    self._refresh()
+
+                    with self._lock:
+                        metadata = self.metadata.get(symbol)
+
+        if metadata is None:
+            raise ValueError(f"'{symbol}' does not exist.")
+
+        return metadata
+
+
+    @staticmethod
+    def parse_symbol(asset_info:dict):
+        filters = {f['filterType']: f for f in asset_info['filters']}
+
+        min_notional = 0.0
+        if 'MIN_NOTIONAL' in filters:
+            min_notional = float(filters['MIN_NOTIONAL']['notional'])
+
+        min_qty = None
+        step_size = None
+        if 'MARKET_LOT_SIZE' in filters:
+            min_qty = float(filters['MARKET_LOT_SIZE']['minQty'])
+            step_size = float(filters['MARKET_LOT_SIZE']['stepSize'])
+
+        return SymbolMetadata(symbol=asset_info["symbol"],
+                              status=asset_info["status"],
+                              quantity_precision=asset_info["quantityPrecision"],
+                              step_size=step_size,
+                              min_qty=min_qty,
+                              min_notional=min_notional)
@@ -1,7 +1,10 @@
-import math
+import numpy as np
+from .exchange_metadata import ExchangeMetadataCache
 
 def get_min_order_quantity(api_handler, 
-                           symbol:str):
+                           symbol:str,
+                           metadata_cache:ExchangeMetadataCache=None,
+                           mark_price:float=None):
     """
     Calculate the minimum order quantity for an asset.
     The calculation is mainly based on data retrieved from the '/fapi/v1/exchangeInfo' endpoint.
@@ -67,33 +70,52 @@ def get_min_order_quantity(api_handler,
     - Therefore, temp = max{min_notional/mark_price, min_qty} = 0.0010550955699489524.
     - temp = 0.0010550955699489524 must be rounded up using the equation `ceil(temp/step_size)*step_size`.
     - Final minimum order quantity: 0.002.
-    """
 
-    exchange_info = api_handler.get_exchange_info() # Fetches min_notional and min_qty
+    Cache
+    ---
+    - If `metadata_cache` is given, 'MIN_NOTIONAL' and 'MARKET_LOT_SIZE' are read from the cached
+      exchangeInfo snapshot. Only 'markPrice' is fetched per call.
+    - If `mark_price` is given (e.g. from the mark-price stream), '/fapi/v1/premiumIndex' is not called.
+    """
 
-    min_notional = 0
-    premium_index = api_handler.get_premium_index(symbol=symbol) # Fetch mark_price for each crypto. real-time.
-    mark_price = float(premium_index["markPrice"])
+    if metadata_cache is None:
+        metadata_cache = ExchangeMetadataCache(api_handler=api_handler)
+        metadata_cache.load(symbols=[symbol]) # Fetches min_notional and min_qty
 
-    asset_info = next((asset for asset in exchange_info["symbols"] if asset["symbol"] == symbol), None)
+    if mark_price is None:
+        premium_index = api_handler.get_premium_index(symbol=symbol) # Fetch mark_price for each crypto. real-time.
+        mark_price = float(premium_index["markPrice"])
 
-    if not asset_info:
-        raise ValueError(f"'{symbol}' does now exist.")
+    asset_info = metadata_cache.get(symbol)
 
-    if asset_info["status"] != "TRADING":
+    if asset_info.status != "TRADING":
         raise Exception(f"{symbol} is not tradable.")
     
-    filters = {f['filterType']: f for f in asset_info['filters']}
-    if 'MIN_NOTIONAL' in filters:
-        min_notional = float(filters['MIN_NOTIONAL']['notional'])
+    min_notional = asset_info.min_notional
         
-    if 'MARKET_LOT_SIZE' in filters:
-        min_qty = float(filters['MARKET_LOT_SIZE']['minQty'])
-        step_size = float(filters['MARKET_LOT_SIZE']['stepSize'])
+    if asset_info.step_size is not None:
+        min_qty = asset_info.min_qty
+        step_size = asset_info.step_size
     else:
         raise Exception(f"{symbol} does not support market order.")
     
-    temp = max(min_notional/mark_price, min_qty)
-    final_min_qty = math.ceil(temp/step_size)*step_size
+    return calc_min_order_quantity(min_notional=min_notional,
+                                   min_qty=min_qty,
+                                   step_size=step_size,
+                                   mark_price=mark_price)
+
+
+def calc_min_order_quantity(min_notional:float,
+                            min_qty:float,
+                            step_size:float,
+                            mark_price:float):
+    """
+    final_min_qty = ceil(max{min_qty, min_notional/mark_price}/step_size)*step_size
+    (see `get_min_order_quantity`)
+
+    Arguments may also be NumPy arrays, to evaluate many orders at once (e.g. in backtests).
+    """
+    temp = np.maximum(min_notional/mark_price, min_qty)
+    final_min_qty = np.ceil(temp/step_size)*step_size
     
     return final_min_qty
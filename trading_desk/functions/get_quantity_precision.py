@@ -1,15 +1,17 @@
-import math
+from .exchange_metadata import ExchangeMetadataCache
 
 def get_quantity_precision(api_handler, 
-                           symbol:str):
+                           symbol:str,
+                           metadata_cache:ExchangeMetadataCache=None):
     """
     Retrieve the quantity precision for an asset using the '/fapi/v1/exchangeInfo' endpoint.
+    If `metadata_cache` is given, the cached exchangeInfo snapshot is used instead of a new request.
     """
 
-    exchange_info = api_handler.get_exchange_info() # Fetches min_notional and min_qty
+    if metadata_cache is None:
+        metadata_cache = ExchangeMetadataCache(api_handler=api_handler)
+        metadata_cache.load(symbols=[symbol]) # Fetches quantityPrecision
 
-    asset_info = next((asset for asset in exchange_info["symbols"] if asset["symbol"] == symbol), None)
-
-    quantity_precision = asset_info["quantityPrecision"]
+    quantity_precision = metadata_cache.get(symbol).quantity_precision
 
     return quantity_precision
@@ -0,0 +1,108 @@
+import threading
+import time
+from typing import Callable, Optional
+
+
+def file_source(path:str):
+    """
+    Kill-switch source reading a local file holding "1" (running) or "0" (stop), e.g. a stand-in for the C9 cell.
+    """
+    def read():
+        with open(path) as f:
+            return f.read()
+
+    return read
+
+
+class KillSwitch:
+    """
+    Cached kill switch polled on a background thread.
+
+    `source` is a no-argument callable returning the control value ("1"/1 = running, "0"/0 = stop),
+    e.g. a read of the 'is_running' cell or `file_source(path)`. The trading path only reads memory:
+
+    - `is_stopped`: a fresh value asks for termination
+    - `is_active`: a fresh value allows trading
+    - `is_stale`: no successful poll within `max_age` seconds. Neither flag is set, so callers fail safe
+      (no new positions) without terminating on a transient outage.
+
+    The defaults suit a Google Sheets source: one read a minute per session stays well within the read quota
+    of a service account shared by many sessions. Poll a local file source faster.
+
+    A failed poll is retried after `retry_delay` seconds, doubled on each further failure up to `poll_interval`,
+    so a source that is not ready yet (e.g. the worksheet right after a warm restart) does not leave the switch
+    unread for a full interval.
+    """
+    def __init__(self,
+                 source:Callable,
+                 poll_interval:float=60.0,
+                 max_age:float=300.0,
+                 retry_delay:float=2.0,
+                 logger=None):
+        self.source = source
+        self.poll_interval = poll_interval
+        self.max_age = max_age
+        self.retry_delay = retry_delay
+        self.logger = logger
+
+        self.value: Optional[bool] = None
+        self.last_updated: Optional[float] = None
+
+        self._stop = threading.Event()
+        self._thread = None
+
+
+    def poll(self):
+        """
+        Read the source once. Returns whether the read succeeded.
+        """
+        try:
+            value = bool(int(str(self.source()).strip()))
+        except Exception:
+            if self.logger:
+                self.logger.warning("Failed to read the kill switch. Keeping the last value until it goes stale.")
+            return False
+
+        self.value = value
+        self.last_updated = time.monotonic()
+        return True
+
+
+    @property
+    def is_stale(self):
+        return self.last_updated is None or time.monotonic() - self.last_updated > self.max_age
+
+
+    @property
+    def is_active(self):
+        return not self.is_stale and self.value is True
+
+
+    @property
+    def is_stopped(self):
+        return not self.is_stale and self.value is False
+
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+
+    def stop(self):
+        self._stop.set()
+
+
+    def _run(self):
+        delay = self.retry_delay
+
+        while not self._stop.is_set():
+            if self.poll():
+                delay = self.retry_delay
+                self._stop.wait(self.poll_interval)
+            else:
+                self._stop.wait(min(delay, self.poll_interval))
+                delay = min(delay*2, self.poll_interval)
@@ -0,0 +1,233 @@
+import os
+import shutil
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+from .kline_decoder import decode_klines
+
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+class KlineArchive:
+    """
+    Columnar kline archive on local disk.
+
+    Layout: `{root}/{symbol}/{interval}/`
+    - `open_time.i8`: int64 open times in milliseconds, ascending (the index)
+    - `ohlcv.f8`: float64 rows of (open, high, low, close, volume)
+
+    Both files are raw little-endian arrays, so reads are `np.memmap` views without parsing,
+    and a time range is located with `np.searchsorted` on the open_time column.
+    Klines newer than the last stored one are appended. Older klines missing from the archive
+    (e.g. a gap left by downtime) are merged in by rewriting the directory, which is swapped in by rename.
+    """
+    def __init__(self,
+                 root:str):
+        self.root = root
+        self._lock = threading.Lock()
+
+
+    def directory(self,
+                  symbol:str,
+                  interval:str):
+        return os.path.join(self.root, symbol, interval)
+
+
+    def symbols(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(os.listdir(self.root))
+
+
+    def _n_rows(self,
+                directory:str):
+        """
+        Number of complete rows. A row is complete once both columns are written
+        (a crash between the two writes leaves a partial row, which is ignored).
+        """
+        # Finish a merge interrupted between its two renames
+        if not os.path.isdir(directory) and os.path.isdir(directory + ".merge"):
+            os.rename(directory + ".merge", directory)
+
+        open_time_path = os.path.join(directory, "open_time.i8")
+        ohlcv_path = os.path.join(directory, "ohlcv.f8")
+
+        if not os.path.exists(open_time_path) or not os.path.exists(ohlcv_path):
+            return 0
+
+        return min(os.path.getsize(open_time_path) // 8,
+                   os.path.getsize(ohlcv_path) // (8*len(OHLCV_COLUMNS)))
+
+
+    def _repair(self,
+                directory:str,
+                n_rows:int):
+        # Drop a partial row left by an interrupted append
+        for name, row_size in [("open_time.i8", 8), ("ohlcv.f8", 8*len(OHLCV_COLUMNS))]:
+            path = os.path.join(directory, name)
+
+            if os.path.exists(path) and os.path.getsize(path) != n_rows*row_size:
+                with open(path, "r+b") as f:
+                    f.truncate(n_rows*row_size)
+
+
+    def last_open_time(self,
+                       symbol:str,
+                       interval:str):
+        directory = self.directory(symbol, interval)
+        n_rows = self._n_rows(directory)
+
+        if n_rows == 0:
+            return None
+
+        with open(os.path.join(directory, "open_time.i8"), "rb") as f:
+            f.seek((n_rows - 1)*8)
+            return int(np.frombuffer(f.read(8), dtype="<i8")[0])
+
+
+    def append(self,
+               symbol:str,
+               interval:str,
+               klines:List,
+               end_time:Optional[int]=None):
+        """
+        Append a raw '/fapi/v1/klines' response.
+        Klines opened at or after `end_time` (incomplete) are dropped.
+        """
+        if not klines:
+            return 0
+
+        open_time, ohlcv = decode_klines(klines, end_time=end_time)
+
+        return self.append_arrays(symbol, interval, open_time, ohlcv)
+
+
+    def append_arrays(self,
+                      symbol:str,
+                      interval:str,
+                      open_time:np.ndarray,
+                      ohlcv:np.ndarray):
+        """
+        Add ascending `open_time` (n,) and `ohlcv` (n, 5). Returns the number of rows added.
+
+        Rows newer than the archive are appended. Older rows whose open_time is not archived yet are merged
+        (the archive is rewritten). Rows already archived are skipped.
+        """
+        directory = self.directory(symbol, interval)
+
+        with self._lock:
+            n_rows = self._n_rows(directory)
+            os.makedirs(directory, exist_ok=True)
+
+            self._repair(directory, n_rows)
+
+            last = self.last_open_time(symbol, interval)
+            if last is not None:
+                newer = open_time > last
+
+                if not newer.all():
+                    archived, _ = self.read(symbol, interval)
+                    missing = ~newer & ~np.isin(open_time, archived)
+
+                    if missing.any():
+                        return self._merge(directory, open_time[newer | missing], ohlcv[newer | missing])
+
+                open_time, ohlcv = open_time[newer], ohlcv[newer]
+
+            if len(open_time) == 0:
+                return 0
+
+            # ohlcv first: a row only counts once its open_time is written
+            with open(os.path.join(directory, "ohlcv.f8"), "ab") as f:
+                f.write(np.ascontiguousarray(ohlcv, dtype="<f8").tobytes())
+            with open(os.path.join(directory, "open_time.i8"), "ab") as f:
+                f.write(np.ascontiguousarray(open_time, dtype="<i8").tobytes())
+
+        return len(open_time)
+
+
+    def _merge(self,
+               directory:str,
+               open_time:np.ndarray,
+               ohlcv:np.ndarray):
+        """
+        Rewrite `directory` with the rows of `open_time`/`ohlcv` (none archived yet) merged in by open_time.
+        The merged copy is written next to it and swapped in with two renames (see `_n_rows` for recovery).
+        """
+        archived_open_time, archived_ohlcv = self._read_directory(directory)
+
+        merged_open_time = np.concatenate([archived_open_time, open_time])
+        order = np.argsort(merged_open_time, kind="stable")
+        merged_ohlcv = np.concatenate([archived_ohlcv, ohlcv])[order]
+        merged_open_time = merged_open_time[order]
+
+        merged = directory + ".merge"
+        shutil.rmtree(merged, ignore_errors=True) # Leftover of a merge interrupted before its renames
+        os.makedirs(merged)
+
+        with open(os.path.join(merged, "ohlcv.f8"), "wb") as f:
+            f.write(np.ascontiguousarray(merged_ohlcv, dtype="<f8").tobytes())
+        with open(os.path.join(merged, "open_time.i8"), "wb") as f:
+            f.write(np.ascontiguousarray(merged_open_time, dtype="<i8").tobytes())
+
+        replaced = directory + ".old"
+        shutil.rmtree(replaced, ignore_errors=True)
+        os.rename(directory, replaced)
+        os.rename(merged, directory)
+        shutil.rmtree(replaced, ignore_errors=True)
+
+        return len(open_time)
+
+
+    def _read_directory(self,
+                       directory:str):
+        n_rows = self._n_rows(directory)
+
+        if n_rows == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros((0, len(OHLCV_COLUMNS)), dtype=np.float64)
+
+        open_time = np.memmap(os.path.join(directory, "open_time.i8"), dtype="<i8", mode="r", shape=(n_rows,))
+        ohlcv = np.memmap(os.path.join(directory, "ohlcv.f8"), dtype="<f8", mode="r", shape=(n_rows, len(OHLCV_COLUMNS)))
+
+        return open_time, ohlcv
+
+
+    def missing_ranges(self,
+                       symbol:str,
+                       interval:str,
+                       step:int,
+                       start_time:int,
+                       end_time:int):
+        """
+        [(start, end), ...] open-time ranges within [start_time, end_time) without an archived kline:
+        the head before the first kline, holes between klines and the tail after the last one.
+        """
+        open_time, _ = self.read(symbol, interval, start_time=start_time, end_time=end_time)
+
+        first = -(-start_time // step)*step
+        stop = first + -(-(end_time - first) // step)*step # First open time at or after `end_time`
+        if first >= stop:
+            return []
+
+        bounds = np.concatenate([[first - step], np.asarray(open_time, dtype=np.int64), [stop]])
+        holes = np.flatnonzero(np.diff(bounds) > step)
+
+        return [(int(bounds[i]) + step, int(bounds[i + 1])) for i in holes]
+
+
+    def read(self,
+             symbol:str,
+             interval:str,
+             start_time:Optional[int]=None,
+             end_time:Optional[int]=None):
+        """
+        Memory-mapped (open_time (n,), ohlcv (n, 5)) for start_time <= open_time < end_time. No data is copied.
+        """
+        open_time, ohlcv = self._read_directory(self.directory(symbol, interval))
+
+        start = 0 if start_time is None else int(np.searchsorted(open_time, start_time, side="left"))
+        end = len(open_time) if end_time is None else int(np.searchsorted(open_time, end_time, side="left"))
+
+        return open_time[start:end], ohlcv[start:end]
@@ -0,0 +1,85 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ..data_models import PriceWindow
+
+# '/fapi/v1/klines' row layout
+KLINE_COLUMNS = [
+    "open_time", "open", "high", "low", "close", "volume",
+    "close_time", "quote_volume", "num_trades",
+    "taker_buy_base_volume", "taker_buy_quote_volume", "ignore"
+]
+CLOSE = 4
+
+
+def decode_klines(klines:List,
+                  end_time:Optional[int]=None):
+    """
+    Decode a raw '/fapi/v1/klines' response into typed arrays, without a DataFrame.
+
+    Returns
+    ---
+    - open_time: (n,) int64 milliseconds
+    - ohlcv: (n, 5) float64 (open, high, low, close, volume)
+
+    Klines opened at or after `end_time` (incomplete) are dropped.
+    """
+    if not klines:
+        return np.empty(0, dtype=np.int64), np.empty((0, 5), dtype=np.float64)
+
+    # One transpose in C, then one string -> float conversion per column
+    columns = list(zip(*klines))
+    open_time = np.array(columns[0], dtype=np.int64)
+    ohlcv = np.array(columns[1:6], dtype=np.float64).T
+
+    if end_time is not None:
+        closed = open_time < end_time
+        open_time, ohlcv = open_time[closed], ohlcv[closed]
+
+    return open_time, ohlcv
+
+
+def decode_close(klines:List,
+                 end_time:Optional[int]=None):
+    """
+    (open_time, close) of a raw '/fapi/v1/klines' response. Cheaper than `decode_klines` when only closes are needed.
+    """
+    open_time = np.array([k[0] for k in klines], dtype=np.int64)
+    close = np.array([k[CLOSE] for k in klines], dtype=np.float64)
+
+    if end_time is not None:
+        closed = open_time < end_time
+        open_time, close = open_time[closed], close[closed]
+
+    return open_time, close
+
+
+def build_price_window(klines:Dict[str, List],
+                       interval:int,
+                       end_time:Optional[int]=None):
+    """
+    Aligned closing-price matrix from {symbol: raw '/fapi/v1/klines' response} in one pass.
+
+    The open_time grid (step `interval` ms) spans the earliest to the latest closed kline of all symbols.
+    Each response is decoded once and scattered into its column; klines missing for a symbol are NaN.
+    Use `PriceWindow.to_frame()` for a pandas view.
+    """
+    symbols = list(klines)
+    decoded = {symbol: decode_close(k, end_time=end_time) for symbol, k in klines.items()}
+
+    non_empty = [open_time for open_time, _ in decoded.values() if len(open_time)]
+    if not non_empty:
+        return PriceWindow(open_time=np.empty(0, dtype=np.int64), symbols=symbols, close=np.empty((0, len(symbols))))
+
+    start = min(int(open_time[0]) for open_time in non_empty)
+    end = max(int(open_time[-1]) for open_time in non_empty)
+    grid = np.arange(start, end + interval, interval, dtype=np.int64)
+
+    close = np.full((len(grid), len(symbols)), np.nan)
+    for j, symbol in enumerate(symbols):
+        open_time, symbol_close = decoded[symbol]
+        on_grid = (open_time - start) % interval == 0
+        close[(open_time[on_grid] - start) // interval, j] = symbol_close[on_grid]
+
+    return PriceWindow(open_time=grid, symbols=symbols, close=close)
@@ -0,0 +1,146 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+from typing import List, Optional
+
+from .api_handler import APIHandler, interval_ms
+from .kline_archive import KlineArchive
+
+
+class KlineDownloader:
+    """
+    Bulk download of historical klines into a `KlineArchive`.
+
+    Each symbol is paged with `startTime` (`limit` klines per request) over the ranges of
+    [start_time, end_time) missing from the archive (earlier history, holes left by downtime, and
+    the tail), and every page is written to the archive as soon as it arrives.
+    The archive itself is the checkpoint: an interrupted download resumes with the ranges still missing.
+    A range the exchange has no klines for (e.g. before the listing) costs one request per run.
+
+    Symbols are downloaded concurrently. Requests are paced by the `RateLimiter` of `api_handler`:
+    give the downloader its own handler with a lower weight limit (e.g. 1200/min) to leave
+    headroom in the 2400 weight/min IP budget for live trading.
+    """
+    def __init__(self,
+                 api_handler:APIHandler,
+                 archive:KlineArchive,
+                 max_workers:int=4,
+                 limit:int=1000,
+                 max_retries:int=3,
+                 logger=None):
+        self.api_handler = api_handler
+        self.archive = archive
+        self.max_workers = max_workers
+        self.limit = limit
+        self.max_retries = max_retries
+        self.logger = logger
+
+
+    def _fetch_page(self,
+                    symbol:str,
+                    every:int,
+                    unit:str,
+                    start_time:int,
+                    end_time:int):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.api_handler.fetch_klines_page(symbol=symbol,
+                                                          every=every,
+                                                          unit=unit,
+                                                          start_time=start_time,
+                                                          end_time=end_time - 1, # endTime is inclusive
+                                                          limit=self.limit)
+            except RuntimeError:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(2**attempt)
+
+
+    def download_symbol(self,
+                        symbol:str,
+                        every:int,
+                        unit:str,
+                        start_time:int,
+                        end_time:int):
+        """
+        Archive the closed klines of `symbol` opened in [start_time, end_time). Returns the number of klines appended.
+        """
+        interval = f"{every}{unit}"
+        step = interval_ms(every=every, unit=unit)
+
+        # Only the ranges the archive lacks
+        ranges = self.archive.missing_ranges(symbol=symbol,
+                                             interval=interval,
+                                             step=step,
+                                             start_time=start_time,
+                                             end_time=end_time)
+
+        n_appended = 0
+        for range_start, range_end in ranges:
+            cursor = range_start
+            while cursor < range_end:
+                klines = self._fetch_page(symbol=symbol,
+                                          every=every,
+                                          unit=unit,
+                                          start_time=cursor,
+                                          end_time=range_end)
+                if not klines:
+                    break
+
+                n_appended += self.archive.append(symbol=symbol,
+                                                  interval=interval,
+                                                  klines=klines,
+                                                  end_time=range_end)
+
+                next_cursor = int(klines[-1][0]) + step
+                if next_cursor <= cursor:
+                    break
+                cursor = next_cursor
+
+        if self.logger:
+            self.logger.info(f"{symbol} {interval}: {n_appended} klines archived.")
+
+        return n_appended
+
+
+    def download(self,
+                 symbols:List[str],
+                 every:int,
+                 unit:str,
+                 start_time:int,
+                 end_time:Optional[int]=None):
+        """
+        Download many symbols concurrently.
+        `end_time` defaults to the current {every}{unit} boundary, so only closed klines are archived.
+
+        Returns
+        ---
+        - counts: {symbol: number of klines appended} for the symbols that completed
+        - errors: {symbol: error message} for the symbols that failed (progress so far is kept)
+        """
+        if end_time is None:
+            _, end_time = self.api_handler.kline_window(every=every, unit=unit, timesteps=0)
+
+        counts = {}
+        errors = {}
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, max(1, len(symbols)))) as executor:
+            futures = {
+                executor.submit(self.download_symbol,
+                                symbol=symbol,
+                                every=every,
+                                unit=unit,
+                                start_time=start_time,
+                                end_time=end_time): symbol
+                for symbol in symbols
+            }
+
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    counts[symbol] = future.result()
+                except Exception as e:
+                    errors[symbol] = str(e)
+
+        counts = {symbol: counts[symbol] for symbol in symbols if symbol in counts}
+
+        return counts, errors
@@ -0,0 +1,197 @@
+from typing import Dict, List
+
+import numpy as np
+
+from ..data_models import PriceWindow
+from .api_handler import interval_ms
+from .kline_decoder import decode_close
+
+
+class KlineRingBuffer:
+    """
+    Fixed-capacity ring buffer of closed klines for one symbol, keyed by open_time.
+    """
+    def __init__(self,
+                 capacity:int):
+        self.capacity = capacity
+        self.open_time = np.zeros(capacity, dtype=np.int64)
+        self.close = np.zeros(capacity, dtype=np.float64)
+
+        self.size = 0
+        self.head = 0 # Next write position
+
+
+    def last_open_time(self):
+        if self.size == 0:
+            return None
+        return int(self.open_time[(self.head - 1) % self.capacity])
+
+
+    def latest(self,
+               n:int):
+        """
+        Return (open_time, close) of the latest `n` klines in ascending order.
+        """
+        k = min(n, self.size)
+        idx = (self.head - k + np.arange(k)) % self.capacity
+        return self.open_time[idx], self.close[idx]
+
+
+    def append(self,
+               open_time:np.ndarray,
+               close:np.ndarray):
+        """
+        Append klines newer than the last stored one.
+        Older klines (backfilled gaps) are merged in by open_time.
+        """
+        last = self.last_open_time()
+
+        if last is not None and len(open_time) and open_time.min() <= last:
+            self._merge(open_time, close)
+            return
+
+        n = len(open_time)
+        if n == 0:
+            return
+
+        if n >= self.capacity:
+            open_time, close = open_time[-self.capacity:], close[-self.capacity:]
+            n = self.capacity
+
+        idx = (self.head + np.arange(n)) % self.capacity
+        self.open_time[idx] = open_time
+        self.close[idx] = close
+
+        self.head = (self.head + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+
+    def _merge(self,
+               open_time:np.ndarray,
+               close:np.ndarray):
+        stored_open_time, stored_close = self.latest(self.size)
+
+        merged_open_time = np.concatenate([stored_open_time, open_time])
+        merged_close = np.concatenate([stored_close, close])
+
+        # np.unique keeps the first occurrence: reverse so that newly fetched values win
+        unique_open_time, idx = np.unique(merged_open_time[::-1], return_index=True)
+        unique_close = merged_close[::-1][idx]
+
+        self.size = 0
+        self.head = 0
+        self.append(unique_open_time, unique_close)
+
+
+class KlineStore:
+    """
+    In-memory rolling window of closed klines for the traded assets.
+
+    Each rebalance only requests the klines that closed since the previous one
+    (`missing_windows`), appends them (`update`) and reads an aligned
+    symbol x time matrix (`window`) without rebuilding per-symbol DataFrames.
+    Holes inside the lookback (e.g. a failed fetch in a previous run) are requested again.
+    """
+    def __init__(self,
+                 symbols:List[str],
+                 every:int,
+                 unit:str,
+                 capacity:int=500):
+        self.every = every
+        self.unit = unit
+        self.interval = interval_ms(every=every, unit=unit)
+        self.capacity = capacity
+
+        self.buffers: Dict[str, KlineRingBuffer] = {symbol: KlineRingBuffer(capacity) for symbol in symbols}
+
+
+    def warm_start(self,
+                   archive,
+                   end_time:int):
+        """
+        Fill the buffers with the latest closed klines stored in a `KlineArchive` (read through np.memmap).
+        """
+        interval = f"{self.every}{self.unit}"
+        start_time = end_time - self.interval*self.capacity
+
+        for symbol, buffer in self.buffers.items():
+            open_time, ohlcv = archive.read(symbol, interval, start_time=start_time, end_time=end_time)
+            buffer.append(np.asarray(open_time), np.asarray(ohlcv[:, 3])) # close
+
+
+    def target_open_times(self,
+                          end_time:int,
+                          lookback:int):
+        """
+        Open times of the `lookback` closed klines before `end_time` (the open time of the incomplete kline).
+        """
+        return end_time - self.interval*np.arange(lookback, 0, -1, dtype=np.int64)
+
+
+    def missing_windows(self,
+                        end_time:int,
+                        lookback:int):
+        """
+        Return {symbol: (start_time, end_time)} covering the klines each symbol lacks for the next window.
+        Symbols whose window is already complete are omitted.
+        """
+        targets = self.target_open_times(end_time=end_time, lookback=lookback)
+        windows = {}
+
+        for symbol, buffer in self.buffers.items():
+            stored_open_time, _ = buffer.latest(lookback)
+            missing = targets[~np.isin(targets, stored_open_time)]
+
+            if len(missing):
+                windows[symbol] = (int(missing[0]), end_time)
+
+        return windows
+
+
+    def update(self,
+               symbol:str,
+               klines:List,
+               end_time:int):
+        """
+        Append a raw '/fapi/v1/klines' response. Klines opened at or after `end_time` are incomplete and dropped.
+        """
+        open_time, close = decode_close(klines, end_time=end_time)
+        self.update_arrays(symbol=symbol,
+                           open_time=open_time,
+                           close=close)
+
+
+    def update_arrays(self,
+                      symbol:str,
+                      open_time:np.ndarray,
+                      close:np.ndarray):
+        """
+        Append decoded closed klines (see `decode_klines` / `decode_close`).
+        """
+        if symbol not in self.buffers:
+            self.buffers[symbol] = KlineRingBuffer(self.capacity)
+
+        self.buffers[symbol].append(open_time, close)
+
+
+    def window(self,
+               symbols:List[str],
+               end_time:int,
+               lookback:int):
+        """
+        Aligned (lookback x len(symbols)) closing-price matrix ending right before `end_time`.
+        Missing klines are NaN.
+        """
+        targets = self.target_open_times(end_time=end_time, lookback=lookback)
+        close = np.full((lookback, len(symbols)), np.nan)
+
+        for j, symbol in enumerate(symbols):
+            stored_open_time, stored_close = self.buffers[symbol].latest(lookback)
+
+            pos = np.searchsorted(targets, stored_open_time)
+            valid = pos < lookback
+            valid[valid] = targets[pos[valid]] == stored_open_time[valid]
+
+            close[pos[valid], j] = stored_close[valid]
+
+        return PriceWindow(open_time=targets, symbols=list(symbols), close=close)
@@ -0,0 +1,338 @@
+import bisect
+import contextlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+# Histogram buckets in seconds (request round trips up to rebalance steps)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+SPAN_METRIC = "trading_desk_span_seconds"
+REQUEST_METRIC = "trading_desk_request_seconds"
+FILL_METRIC = "trading_desk_order_fill_seconds"
+FAILURE_METRIC = "trading_desk_leg_failures_total"
+
+METRIC_HELP = {
+    SPAN_METRIC: "Duration of strategy steps and other instrumented blocks.",
+    REQUEST_METRIC: "REST round trip per endpoint (rate-limit waits excluded).",
+    FILL_METRIC: "Decision-to-fill latency of orders (exchange 'updateTime' minus decision time).",
+    FAILURE_METRIC: "Order legs that failed, by stage (prepare, order, close).",
+}
+
+
+class Histogram:
+    def __init__(self,
+                 buckets:tuple=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0]*(len(buckets) + 1) # Last slot: above the largest bucket
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+
+    def observe(self,
+                value:float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+
+class Metrics:
+    """
+    In-process latency metrics.
+
+    - Spans (`span`, or `start_span` / `end_span` around long blocks) and raw observations go to histograms
+      keyed by metric name and labels, exported in the Prometheus text format (`prometheus_text`).
+    - Failed order legs (`record_failure`) are counted per stage.
+    - `begin_run` / `end_run` bracket one rebalance. `end_run` returns the JSON-serializable summary of the run
+      (span durations, per-metric count/sum/max, order fills and failures), which `write_summary` appends to a JSONL file.
+
+    Use `NULL_METRICS` when instrumentation is disabled: every call is a no-op.
+    """
+    enabled = True
+
+    def __init__(self,
+                 labels:Optional[Dict[str, str]]=None,
+                 buckets:tuple=DEFAULT_BUCKETS):
+        self.labels = labels or {} # Constant labels of every series, e.g. {"session": ...}
+        self.buckets = buckets
+
+        self.histograms: Dict[tuple, Histogram] = {} # (metric, label items) -> Histogram
+        self.counters: Dict[tuple, int] = {} # (metric, label items) -> count
+
+        self._run = None
+        self._span_starts: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+
+    def observe(self,
+                metric:str,
+                value:float,
+                **labels):
+        key = (metric, tuple(sorted(labels.items())))
+
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+            if self._run is not None:
+                stats = self._run["metrics"].setdefault(format_series(metric, labels), {"count": 0, "sum": 0.0, "max": 0.0})
+                stats["count"] += 1
+                stats["sum"] += value
+                stats["max"] = max(stats["max"], value)
+
+
+    @contextlib.contextmanager
+    def span(self,
+             name:str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._end(name, time.perf_counter() - start)
+
+
+    def start_span(self,
+                   name:str):
+        self._span_starts[name] = time.perf_counter()
+
+
+    def end_span(self,
+                 name:str):
+        start = self._span_starts.pop(name, None)
+        if start is not None:
+            self._end(name, time.perf_counter() - start)
+
+
+    def _end(self,
+             name:str,
+             elapsed:float):
+        self.observe(SPAN_METRIC, elapsed, span=name)
+
+        with self._lock:
+            if self._run is not None:
+                self._run["spans"][name] = self._run["spans"].get(name, 0.0) + elapsed
+
+
+    def record_fill(self,
+                    symbol:str,
+                    side:str,
+                    latency:float):
+        """
+        Decision-to-fill latency of one order, in seconds.
+        """
+        self.observe(FILL_METRIC, latency, side=side)
+
+        with self._lock:
+            if self._run is not None:
+                self._run["fills"].append({"symbol": symbol, "side": side, "latency": latency})
+
+
+    def record_failure(self,
+                       symbol:str,
+                       stage:str,
+                       error:Exception):
+        """
+        One failed order leg. `stage`: "prepare" (price / filter lookups), "order" or "close".
+        """
+        key = (FAILURE_METRIC, (("stage", stage),))
+
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+            if self._run is not None:
+                self._run["failures"].append({"symbol": symbol, "stage": stage, "error": str(error)})
+
+
+    def begin_run(self):
+        with self._lock:
+            self._run = {**self.labels,
+                         "started_at": int(time.time()*1000),
+                         "spans": {},
+                         "metrics": {},
+                         "fills": [],
+                         "failures": []}
+        self._span_starts.clear()
+
+
+    def end_run(self):
+        """
+        Summary of the run started by `begin_run`, or None if no run is open.
+        """
+        with self._lock:
+            run, self._run = self._run, None
+
+        if run is not None:
+            run["ended_at"] = int(time.time()*1000)
+        return run
+
+
+    def write_summary(self,
+                      path:str,
+                      summary:dict):
+        """
+        Append one run summary as a JSON line.
+        """
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "a") as f:
+            f.write(json.dumps(summary) + "\n")
+
+
+    def prometheus_text(self):
+        with self._lock:
+            items = sorted(self.histograms.items(), key=lambda item: item[0])
+            snapshot = [(metric, dict(labels), list(h.counts), h.sum, h.count) for (metric, labels), h in items]
+            counters = sorted(self.counters.items(), key=lambda item: item[0])
+
+        lines = []
+        current = None
+        for metric, labels, counts, total, count in snapshot:
+            if metric != current:
+                current = metric
+                lines.append(f"# HELP {metric} {METRIC_HELP.get(metric, metric)}")
+                lines.append(f"# TYPE {metric} histogram")
+
+            labels = {**self.labels, **labels}
+            cumulative = 0
+            for bucket, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f"{format_series(metric + "_bucket", {**labels, "le": repr(float(bucket))})} {cumulative}")
+            lines.append(f"{format_series(metric + "_bucket", {**labels, "le": "+Inf"})} {count}")
+            lines.append(f"{format_series(metric + "_sum", labels)} {total}")
+            lines.append(f"{format_series(metric + "_count", labels)} {count}")
+
+        current = None
+        for (metric, labels), count in counters:
+            if metric != current:
+                current = metric
+                lines.append(f"# HELP {metric} {METRIC_HELP.get(metric, metric)}")
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{format_series(metric, {**self.labels, **dict(labels)})} {count}")
+
+        return "\n".join(lines) + "\n"
+
+
+class NullMetrics(Metrics):
+    """
+    Disabled instrumentation: keeps the `Metrics` interface, records nothing.
+    """
+    enabled = False
+
+    def __init__(self):
+        super().__init__()
+        self._null_span = contextlib.nullcontext()
+
+
+    def observe(self,
+                metric:str,
+                value:float,
+                **labels):
+        pass
+
+
+    def span(self,
+             name:str):
+        return self._null_span
+
+
+    def start_span(self,
+                   name:str):
+        pass
+
+
+    def end_span(self,
+                 name:str):
+        pass
+
+
+    def record_fill(self,
+                    symbol:str,
+                    side:str,
+                    latency:float):
+        pass
+
+
+    def record_failure(self,
+                       symbol:str,
+                       stage:str,
+                       error:Exception):
+        pass
+
+
+    def begin_run(self):
+        pass
+
+
+    def end_run(self):
+        return None
+
+
+NULL_METRICS = NullMetrics()
+
+
+def format_series(metric:str,
+                  labels:Dict[str, str]):
+    """
+    'metric{label="value",...}' (Prometheus series notation).
+    """
+    if not labels:
+        return metric
+
+    escaped = {key: str(value).replace("\\", "\\\\").replace("\"", "\\\"") for key, value in labels.items()}
+    return metric + "{" + ",".join(f"{key}=\"{value}\"" for key, value in escaped.items()) + "}"
+
+
+class MetricsServer:
+    """
+    Serves `Metrics.prometheus_text()` at http://{host}:{port}/metrics from a daemon thread.
+    """
+    def __init__(self,
+                 metrics:Metrics,
+                 port:int,
+                 host:str="127.0.0.1"):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+
+        self._server = None
+        self._thread = None
+
+
+    def start(self):
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+
+                body = metrics.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass # Scrapes are not logged
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_address[1] # Resolves port 0
+
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
@@ -0,0 +1,84 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class OrderLeg:
+    symbol: str
+    side: str        # "BUY" or "SELL"
+    quantity: float
+    position_amount: float = 0.0 # Signed position before the order, to tell whether a timed-out order executed
+
+
+@dataclass
+class LegResult:
+    symbol: str
+    response: Any = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class OrderExecutor:
+    """
+    Fire independent per-symbol requests (order legs, closes, pre-order lookups) at once.
+
+    Each leg runs on a bounded thread pool, so N legs take roughly as long as the slowest one
+    instead of the sum. Failures are captured per leg and never cancel the other legs.
+    """
+    def __init__(self,
+                 api_handler,
+                 max_workers:int=10):
+        self.api_handler = api_handler
+        self.max_workers = max_workers
+
+
+    def run(self,
+            tasks:Dict[str, Callable]):
+        """
+        Run `tasks` ({symbol: no-argument callable}) concurrently.
+        Returns {symbol: LegResult} in the same order as `tasks`.
+        """
+        if not tasks:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tasks))) as executor:
+            futures = {symbol: executor.submit(task) for symbol, task in tasks.items()}
+
+        results = {}
+        for symbol, future in futures.items():
+            try:
+                results[symbol] = LegResult(symbol=symbol, response=future.result())
+            except Exception as e:
+                results[symbol] = LegResult(symbol=symbol, error=e)
+
+        return results
+
+
+    def place_market_orders(self,
+                            legs:List[OrderLeg]):
+        """
+        Place every leg as a market order at once. A leg that is not FILLED is reported as failed,
+        although it may have executed (e.g. a -1007 timeout resolved from the position): callers reconcile
+        failed legs with the exchange positions.
+        """
+        tasks = {
+            leg.symbol: (lambda leg=leg: self.api_handler.place_market_order(symbol=leg.symbol,
+                                                                            side=leg.side,
+                                                                            quantity=leg.quantity,
+                                                                            position_amount=leg.position_amount))
+            for leg in legs
+        }
+
+        results = self.run(tasks)
+
+        for result in results.values():
+            if result.ok and result.response.get("status") != "FILLED":
+                result.error = RuntimeError(
+                    f"Order not filled: status={result.response.get('status')}"
+                )
+
+        return results
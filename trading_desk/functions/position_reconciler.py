@@ -0,0 +1,93 @@
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from .order_executor import OrderLeg
+
+
+@dataclass
+class PositionDiff:
+    symbol: str
+    expected: float   # Signed quantity booked by the desk
+    actual: float     # Signed 'positionAmt' on the exchange
+
+    @property
+    def matches(self):
+        return abs(self.expected - self.actual) <= 1e-12
+
+
+class PositionReconciler:
+    """
+    Compare the desk's positions with the exchange using one '/fapi/v3/positionRisk' call for every symbol.
+
+    `flatten_legs` turns the exchange quantities into the exact market orders that flatten a set of symbols,
+    so closes never depend on per-symbol lookups or on quantities booked locally.
+    """
+    def __init__(self,
+                 api_handler):
+        self.api_handler = api_handler
+
+
+    def fetch(self):
+        """
+        {symbol: raw position} of every open position (single signed call).
+        """
+        return {p["symbol"]: p for p in self.api_handler.fetch_positions() if float(p["positionAmt"]) != 0}
+
+
+    def diff(self,
+             positions:List,
+             symbols:List[str],
+             exchange_positions:Optional[Dict[str, dict]]=None):
+        """
+        {symbol: PositionDiff} for `symbols`, comparing `positions` (the desk's `Position`s) with the exchange.
+        """
+        if exchange_positions is None:
+            exchange_positions = self.fetch()
+
+        booked = {p.symbol: p.position*abs(p.quantity) for p in positions if p.quantity != 0}
+
+        return {symbol: PositionDiff(symbol=symbol,
+                                     expected=booked.get(symbol, 0.0),
+                                     actual=float(exchange_positions[symbol]["positionAmt"]) if symbol in exchange_positions else 0.0)
+                for symbol in symbols}
+
+
+    def flatten_legs(self,
+                     symbols:List[str],
+                     max_retries:int=5,
+                     delay:float=0.5):
+        """
+        Market-order legs that flatten `symbols` at their exchange quantities.
+
+        Symbols expected to be open but missing from positionRisk are fetched again (one call for all of them)
+        up to `max_retries` times, in case a recent fill is not visible yet.
+
+        Returns (legs, missing): `missing` lists the symbols with no open position on the exchange.
+        """
+        symbols = list(symbols)
+        exchange_positions = {}
+
+        for attempt in range(max_retries):
+            exchange_positions = self.fetch()
+
+            if all(symbol in exchange_positions for symbol in symbols):
+                break
+
+            if attempt < max_retries - 1:
+                time.sleep(delay)
+
+        legs = []
+        missing = []
+        for symbol in symbols:
+            if symbol not in exchange_positions:
+                missing.append(symbol)
+                continue
+
+            amount = float(exchange_positions[symbol]["positionAmt"])
+            legs.append(OrderLeg(symbol=symbol,
+                                 side="SELL" if amount > 0 else "BUY",
+                                 quantity=abs(amount),
+                                 position_amount=amount))
+
+        return legs, missing
@@ -0,0 +1,188 @@
+import json
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import websocket
+
+# Binance USDⓈ-M futures allows up to 200 streams per connection
+MAX_STREAMS_PER_CONNECTION = 200
+
+
+class PriceStream:
+    """
+    Latest-price table fed by Binance combined WebSocket streams.
+
+    - stream="markPrice": '<symbol>@markPrice@1s', price = mark price ('p')
+    - stream="bookTicker": '<symbol>@bookTicker', price = mid of best bid ('b') and best ask ('a')
+
+    Each connection runs `websocket.WebSocketApp.run_forever` on its own daemon thread and
+    reconnects with exponential backoff. `get_price` returns None when the symbol has no
+    price yet, its connection is down, or the price is older than `max_age` seconds,
+    so callers can fall back to REST.
+
+    Listeners registered with `add_listener` are called as `listener(symbol, price)`
+    on every update, from the stream thread.
+    """
+    def __init__(self,
+                 symbols:List[str],
+                 stream:str="markPrice",
+                 base_url:str="wss://fstream.binance.com",
+                 max_age:float=5.0,
+                 reconnect_delay:float=1.0,
+                 max_reconnect_delay:float=30.0,
+                 logger=None):
+        if stream not in ["markPrice", "bookTicker"]:
+            raise ValueError(f"Stream '{stream}' is not supported.")
+
+        self.symbols = list(symbols)
+        self.stream = stream
+        self.base_url = base_url
+        self.max_age = max_age
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.logger = logger
+
+        self.prices: Dict[str, tuple] = {} # symbol -> (price, received at (time.monotonic()))
+        self.listeners: List[Callable] = []
+
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._connected: Dict[str, bool] = {} # symbol -> whether its connection is up
+        self._apps = []
+        self._threads = []
+
+
+    @property
+    def is_mark_price(self):
+        return self.stream == "markPrice"
+
+
+    def stream_name(self,
+                    symbol:str):
+        if self.stream == "markPrice":
+            return f"{symbol.lower()}@markPrice@1s"
+        return f"{symbol.lower()}@bookTicker"
+
+
+    def add_listener(self,
+                     listener:Callable):
+        self.listeners.append(listener)
+
+
+    def is_connected(self,
+                     symbol:str):
+        with self._lock:
+            return bool(self._connected.get(symbol))
+
+
+    # Price table
+    def get_price(self,
+                  symbol:str,
+                  max_age:Optional[float]=None):
+        max_age = self.max_age if max_age is None else max_age
+
+        with self._lock:
+            if not self._connected.get(symbol):
+                return None
+            entry = self.prices.get(symbol)
+
+        if entry is None:
+            return None
+
+        price, received = entry
+        if time.monotonic() - received > max_age:
+            return None
+
+        return price
+
+
+    def _on_message(self,
+                    ws,
+                    message:str):
+        payload = json.loads(message)
+        data = payload.get("data", payload) # Combined streams wrap the event in {"stream": ..., "data": ...}
+
+        event_type = data.get("e")
+        if event_type == "markPriceUpdate":
+            price = float(data["p"])
+        elif event_type == "bookTicker":
+            price = (float(data["b"]) + float(data["a"])) / 2
+        else:
+            return
+
+        symbol = data["s"]
+        with self._lock:
+            self.prices[symbol] = (price, time.monotonic())
+
+        for listener in self.listeners:
+            try:
+                listener(symbol, price)
+            except Exception:
+                if self.logger:
+                    self.logger.exception(f"Price listener failed on {symbol} update.")
+
+
+    # Connections
+    def start(self):
+        chunks = [self.symbols[i:i + MAX_STREAMS_PER_CONNECTION]
+                  for i in range(0, len(self.symbols), MAX_STREAMS_PER_CONNECTION)]
+
+        for chunk in chunks:
+            thread = threading.Thread(target=self._run, args=(chunk,), name="price-stream", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+
+    def stop(self):
+        self._stop_event.set()
+
+        for app in self._apps:
+            app.close()
+
+
+    def _set_connected(self,
+                       symbols:List[str],
+                       connected:bool):
+        with self._lock:
+            for symbol in symbols:
+                self._connected[symbol] = connected
+
+
+    def _run(self,
+             symbols:List[str]):
+        url = f"{self.base_url}/stream?streams=" + "/".join(self.stream_name(s) for s in symbols)
+        delay = self.reconnect_delay
+
+        while not self._stop_event.is_set():
+            opened = threading.Event()
+
+            def on_open(ws):
+                opened.set()
+                self._set_connected(symbols, True)
+
+            app = websocket.WebSocketApp(url,
+                                         on_open=on_open,
+                                         on_message=self._on_message)
+            self._apps.append(app)
+
+            try:
+                app.run_forever(ping_interval=60, ping_timeout=10)
+            except Exception:
+                pass
+
+            self._set_connected(symbols, False)
+            self._apps.remove(app)
+
+            if self._stop_event.is_set():
+                break
+
+            # Reset the backoff once a connection has been established
+            if opened.is_set():
+                delay = self.reconnect_delay
+
+            if self.logger:
+                self.logger.warning(f"Price stream disconnected. Reconnecting in {delay:.1f}s (REST fallback in use).")
+
+            self._stop_event.wait(delay)
+            delay = min(delay*2, self.max_reconnect_delay)
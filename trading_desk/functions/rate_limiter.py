@@ -0,0 +1,212 @@
+import threading
+import time
+from typing import List, Optional
+
+# Request weight of the endpoints used by the desk ('/fapi/v1/klines', '/fapi/v1/premiumIndex'
+# and '/fapi/v1/ticker/price' depend on the parameters, see `request_weight`)
+ENDPOINT_WEIGHTS = {
+    "/fapi/v1/time": 1,
+    "/fapi/v1/exchangeInfo": 1,
+    "/fapi/v1/leverage": 1,
+    "/fapi/v1/listenKey": 1,
+    "/fapi/v2/balance": 5,
+    "/fapi/v3/positionRisk": 5,
+}
+
+# Endpoints counted by the order-count limits (X-MBX-ORDER-COUNT-10S / -1M) when placing orders
+ORDER_ENDPOINTS = ["/fapi/v1/order"]
+
+
+def request_weight(endpoint:str,
+                   method:str,
+                   params:Optional[dict]=None):
+    """
+    IP request weight (X-MBX-USED-WEIGHT-1M) of one request. Unknown endpoints count as 1.
+    """
+    params = params or {}
+
+    if endpoint == "/fapi/v1/klines":
+        limit = int(params.get("limit", 500))
+        if limit < 100:
+            return 1
+        elif limit < 500:
+            return 2
+        elif limit <= 1000:
+            return 5
+        else:
+            return 10
+
+    elif endpoint == "/fapi/v1/premiumIndex":
+        return 1 if "symbol" in params else 10
+
+    elif endpoint == "/fapi/v1/ticker/price":
+        return 1 if "symbol" in params else 2
+
+    elif endpoint in ORDER_ENDPOINTS:
+        return 0 if method.upper() == "POST" else 1 # New orders only count towards the order limits
+
+    return ENDPOINT_WEIGHTS.get(endpoint, 1)
+
+
+def is_order_request(endpoint:str,
+                     method:str):
+    return endpoint in ORDER_ENDPOINTS and method.upper() == "POST"
+
+
+class _Window:
+    """
+    Usage counter over fixed windows of `size` seconds, reset at each window boundary like the exchange's counters.
+    """
+    def __init__(self,
+                 size:float,
+                 limit:int):
+        self.size = size
+        self.limit = limit
+        self.used = 0
+        self.index = None
+
+
+    def roll(self,
+             now:float):
+        index = int(now // self.size)
+        if index != self.index:
+            self.index = index
+            self.used = 0
+
+
+    def wait_time(self,
+                  cost:int,
+                  cap:float,
+                  now:float):
+        """
+        Seconds until `cost` fits under `cap` (0 if it fits now).
+        """
+        if cost == 0 or self.used + cost <= cap:
+            return 0.0
+        return (self.index + 1)*self.size - now
+
+
+class RateLimiter:
+    """
+    Client-side mirror of the Binance futures rate limits, shared by every request of an `APIHandler`
+    (and by several handlers if they are on the same IP).
+
+    - Request weight: a bucket of `weight_limit` per minute, refilled at each minute boundary.
+      Market-data requests may only use `1 - order_reserve` of it, so orders always find headroom.
+    - Order count: 10-second and 1-minute buckets for new orders.
+    - The buckets are corrected from the X-MBX-USED-WEIGHT-1M / X-MBX-ORDER-COUNT-* response headers,
+      which also account for other processes on the same IP.
+    - A 429/418 response blocks every request until its Retry-After.
+
+    `acquire` blocks until a request fits. `reserve` never blocks: it consumes the budget and returns 0,
+    or returns the number of seconds to wait before trying again (for event-loop callers).
+    """
+    def __init__(self,
+                 weight_limit:int=2400,
+                 order_limit_10s:int=300,
+                 order_limit_1m:int=1200,
+                 order_reserve:float=0.1):
+        self.order_reserve = order_reserve
+
+        self.weight = _Window(size=60, limit=weight_limit)
+        self.orders_10s = _Window(size=10, limit=order_limit_10s)
+        self.orders_1m = _Window(size=60, limit=order_limit_1m)
+
+        self.blocked_until = 0.0
+
+        self._lock = threading.Lock()
+
+
+    def update_limits(self,
+                      rate_limits:List[dict]):
+        """
+        Apply the 'rateLimits' of '/fapi/v1/exchangeInfo'. Limits are only ever lowered.
+        """
+        for rate_limit in rate_limits:
+            kind = rate_limit.get("rateLimitType")
+            seconds = {"SECOND": 1, "MINUTE": 60}.get(rate_limit.get("interval"), 0) * rate_limit.get("intervalNum", 1)
+
+            if kind == "REQUEST_WEIGHT" and seconds == 60:
+                window = self.weight
+            elif kind == "ORDERS" and seconds == 10:
+                window = self.orders_10s
+            elif kind == "ORDERS" and seconds == 60:
+                window = self.orders_1m
+            else:
+                continue
+
+            with self._lock:
+                window.limit = min(window.limit, int(rate_limit["limit"]))
+
+
+    def reserve(self,
+                endpoint:str,
+                method:str,
+                params:Optional[dict]=None):
+        weight = request_weight(endpoint=endpoint, method=method, params=params)
+        is_order = is_order_request(endpoint=endpoint, method=method)
+
+        with self._lock:
+            now = time.time()
+            for window in (self.weight, self.orders_10s, self.orders_1m):
+                window.roll(now)
+
+            weight_cap = self.weight.limit if is_order else self.weight.limit*(1 - self.order_reserve)
+
+            wait = max(self.blocked_until - now,
+                       self.weight.wait_time(weight, weight_cap, now))
+            if is_order:
+                wait = max(wait,
+                           self.orders_10s.wait_time(1, self.orders_10s.limit, now),
+                           self.orders_1m.wait_time(1, self.orders_1m.limit, now))
+
+            if wait > 0:
+                return wait
+
+            self.weight.used += weight
+            if is_order:
+                self.orders_10s.used += 1
+                self.orders_1m.used += 1
+
+            return 0.0
+
+
+    def acquire(self,
+                endpoint:str,
+                method:str,
+                params:Optional[dict]=None):
+        """
+        Block until the request fits in the budget, then consume it. Returns the total time waited.
+        """
+        waited = 0.0
+        while True:
+            wait = self.reserve(endpoint=endpoint, method=method, params=params)
+            if wait <= 0:
+                return waited
+
+            time.sleep(wait)
+            waited += wait
+
+
+    def update(self,
+               headers,
+               status_code:int):
+        """
+        Correct the buckets from a response. `headers` is any case-insensitive mapping (requests / aiohttp).
+        """
+        with self._lock:
+            now = time.time()
+
+            for window, header in [(self.weight, "X-MBX-USED-WEIGHT-1M"),
+                                   (self.orders_10s, "X-MBX-ORDER-COUNT-10S"),
+                                   (self.orders_1m, "X-MBX-ORDER-COUNT-1M")]:
+                value = headers.get(header)
+                if value is not None:
+                    window.roll(now)
+                    window.used = max(window.used, int(value))
+
+            # 429: limit exceeded, 418: IP banned after repeated 429s
+            if status_code in (418, 429):
+                retry_after = headers.get("Retry-After")
+                retry_after = float(retry_after) if retry_after is not None else 60.0
+                self.blocked_until = max(self.blocked_until, now + retry_after)
@@ -0,0 +1,358 @@
+import json
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional
+
+import websocket
+
+# Order statuses after which an order no longer changes
+FINAL_ORDER_STATUSES = ["FILLED", "CANCELED", "EXPIRED", "REJECTED", "EXPIRED_IN_MATCH"]
+
+
+class AccountBook:
+    """
+    In-memory book of orders, balances and positions maintained from user data stream events.
+
+    - ORDER_TRADE_UPDATE: order status, cumulative filled quantity and average price, keyed by client order id,
+      and one fill per trade
+    - ACCOUNT_UPDATE: wallet balances and positions
+
+    Readers can block on `wait_for_order` / `wait_for_positions` instead of polling REST endpoints.
+    """
+    def __init__(self,
+                 max_orders:int=1000,
+                 max_fills:int=10000):
+        self.max_orders = max_orders
+
+        self.orders: Dict[str, dict] = OrderedDict() # clientOrderId -> latest order state (oldest first)
+        self.fills = deque(maxlen=max_fills)         # Trades, oldest first
+        self.balances: Dict[str, dict] = {}          # asset -> {"wallet_balance", "cross_wallet_balance"}
+        self.positions: Dict[str, dict] = {}         # symbol -> {"amount", "entry_price", "mark_price", "unrealized_pnl"}
+        self.last_event_time: Optional[int] = None   # Event time (E) in milliseconds
+
+        self._condition = threading.Condition()
+
+
+    def seed(self,
+             balances:List[dict],
+             positions:List[dict]):
+        """
+        Replace balances and positions with REST snapshots ('/fapi/v2/balance', '/fapi/v3/positionRisk').
+        """
+        with self._condition:
+            self.balances = {}
+            self.positions = {} # positionRisk omits flat symbols
+            for balance in balances:
+                self.balances[balance["asset"]] = {
+                    "wallet_balance": float(balance["balance"]),
+                    "cross_wallet_balance": float(balance["crossWalletBalance"]),
+                }
+            for position in positions:
+                self.positions[position["symbol"]] = {
+                    "amount": float(position["positionAmt"]),
+                    "entry_price": float(position["entryPrice"]),
+                    "mark_price": float(position.get("markPrice", position["entryPrice"])),
+                    "unrealized_pnl": float(position.get("unRealizedProfit", 0.0)),
+                }
+            self._condition.notify_all()
+
+
+    def on_event(self,
+                 data:dict):
+        event_type = data.get("e")
+
+        with self._condition:
+            if event_type == "ORDER_TRADE_UPDATE":
+                o = data["o"]
+                executed_qty = float(o["z"])
+                avg_price = float(o["ap"])
+
+                self.orders[o["c"]] = {
+                    "symbol": o["s"],
+                    "clientOrderId": o["c"],
+                    "orderId": o["i"],
+                    "side": o["S"],
+                    "status": o["X"],
+                    "executedQty": executed_qty,
+                    "avgPrice": avg_price,
+                    "cumQuote": executed_qty*avg_price,
+                }
+                self.orders.move_to_end(o["c"])
+                while len(self.orders) > self.max_orders:
+                    self.orders.popitem(last=False)
+
+                if o.get("x") == "TRADE":
+                    self.fills.append({
+                        "symbol": o["s"],
+                        "clientOrderId": o["c"],
+                        "side": o["S"],
+                        "quantity": float(o["l"]),
+                        "price": float(o["L"]),
+                        "commission": float(o.get("n", 0.0)),
+                        "commissionAsset": o.get("N"),
+                        "time": o.get("T", data.get("T")),
+                    })
+
+            elif event_type == "ACCOUNT_UPDATE":
+                for balance in data["a"].get("B", []):
+                    self.balances[balance["a"]] = {
+                        "wallet_balance": float(balance["wb"]),
+                        "cross_wallet_balance": float(balance["cw"]),
+                    }
+                for position in data["a"].get("P", []):
+                    amount = float(position["pa"])
+                    entry_price = float(position["ep"])
+                    unrealized_pnl = float(position["up"])
+                    self.positions[position["s"]] = {
+                        "amount": amount,
+                        "entry_price": entry_price,
+                        # Not sent: the mark price the unrealized PnL was computed at
+                        "mark_price": entry_price + unrealized_pnl/amount if amount else entry_price,
+                        "unrealized_pnl": unrealized_pnl,
+                    }
+            else:
+                return
+
+            self.last_event_time = data.get("E", self.last_event_time)
+            self._condition.notify_all()
+
+
+    def get_order(self,
+                  client_order_id:str):
+        with self._condition:
+            order = self.orders.get(client_order_id)
+            return dict(order) if order is not None else None
+
+
+    def wait_for_order(self,
+                       client_order_id:str,
+                       timeout:float):
+        """
+        Block until the order reaches a final status. Returns the order, or None on timeout.
+        """
+        def final():
+            order = self.orders.get(client_order_id)
+            return order is not None and order["status"] in FINAL_ORDER_STATUSES
+
+        with self._condition:
+            if not self._condition.wait_for(final, timeout=timeout):
+                return None
+            return dict(self.orders[client_order_id])
+
+
+    def wait_for_positions(self,
+                           expected:Dict[str, float],
+                           timeout:float,
+                           tolerance:float=1e-9):
+        """
+        Block until every symbol in `expected` ({symbol: signed position amount}) is reflected in the book.
+        """
+        def reflected():
+            return all(abs(self.positions.get(symbol, {}).get("amount", 0.0) - amount) <= tolerance
+                       for symbol, amount in expected.items())
+
+        with self._condition:
+            return self._condition.wait_for(reflected, timeout=timeout)
+
+
+    def available_balance(self,
+                          asset:str="USDT",
+                          leverage:int=1,
+                          marks:Optional[Dict[str, float]]=None):
+        """
+        Estimate of the available balance: cross wallet balance minus the initial margin of open positions
+        and unrealized losses, both at the mark price like Binance. None until the asset's balance is known.
+
+        `marks` ({symbol: mark price}) gives current mark prices. Symbols missing from it use the mark price
+        of their last update.
+        """
+        marks = marks or {}
+
+        with self._condition:
+            balance = self.balances.get(asset)
+            if balance is None:
+                return None
+
+            margin = 0.0
+            unrealized_loss = 0.0
+            for symbol, p in self.positions.items():
+                mark = marks.get(symbol)
+                if mark is None:
+                    mark, unrealized_pnl = p["mark_price"], p["unrealized_pnl"]
+                else:
+                    unrealized_pnl = p["amount"]*(mark - p["entry_price"])
+
+                margin += abs(p["amount"])*mark / leverage
+                unrealized_loss += min(unrealized_pnl, 0.0)
+
+            return balance["cross_wallet_balance"] - margin + unrealized_loss
+
+
+class UserDataStream:
+    """
+    Binance futures user data stream feeding an `AccountBook`.
+
+    A listenKey is created through REST, kept alive every `keepalive_interval` seconds
+    (keys expire after 60 minutes without a keep-alive), and replaced on 'listenKeyExpired'.
+    The book is seeded from REST once each connection is open, so no event is missed in between.
+    The connection reconnects with exponential backoff, like `PriceStream`.
+
+    Binance has one listenKey per API key: streams of the process sharing a key (e.g. orchestrated sessions)
+    share it, and it is only closed when the last of them stops.
+    """
+    _key_users: Dict[tuple, int] = {} # (REST base URL, API key) -> running streams
+    _key_users_lock = threading.Lock()
+
+    def __init__(self,
+                 api_handler,
+                 account_book:Optional[AccountBook]=None,
+                 base_url:str="wss://fstream.binance.com",
+                 keepalive_interval:float=30*60,
+                 reconnect_delay:float=1.0,
+                 max_reconnect_delay:float=30.0,
+                 logger=None):
+        self.api_handler = api_handler
+        self.account_book = account_book if account_book is not None else AccountBook()
+        self.base_url = base_url
+        self.keepalive_interval = keepalive_interval
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.logger = logger
+
+        self.listen_key: Optional[str] = None
+
+        self._connected = threading.Event()
+        self._stop_event = threading.Event()
+        self._app = None
+        self._thread = None
+        self._keepalive_thread = None
+        self._started = False
+
+
+    @property
+    def connected(self):
+        return self._connected.is_set()
+
+
+    def _on_open(self,
+                 ws):
+        # Connected only once seeded: an unseeded book would miss whatever changed before the connection
+        try:
+            self.account_book.seed(balances=self.api_handler.get_balances(),
+                                   positions=self.api_handler.fetch_positions())
+        except Exception:
+            if self.logger:
+                self.logger.exception("Failed to seed the account book from REST. Reconnecting.")
+            ws.close()
+            return
+
+        self._connected.set()
+
+
+    def _on_message(self,
+                    ws,
+                    message:str):
+        data = json.loads(message)
+
+        if data.get("e") == "listenKeyExpired":
+            if self.logger:
+                self.logger.warning("listenKey expired. Reconnecting with a new key.")
+            ws.close()
+            return
+
+        self.account_book.on_event(data)
+
+
+    @property
+    def _key(self):
+        return (self.api_handler.base_url, self.api_handler.binance_api_key)
+
+
+    def start(self):
+        with UserDataStream._key_users_lock:
+            if not self._started:
+                UserDataStream._key_users[self._key] = UserDataStream._key_users.get(self._key, 0) + 1
+                self._started = True
+
+        self._stop_event.clear()
+
+        self._thread = threading.Thread(target=self._run, name="user-data-stream", daemon=True)
+        self._thread.start()
+
+        self._keepalive_thread = threading.Thread(target=self._keepalive, name="user-data-stream-keepalive", daemon=True)
+        self._keepalive_thread.start()
+
+
+    def stop(self):
+        self._stop_event.set()
+
+        if self._app is not None:
+            self._app.close()
+
+        # Other streams of the same API key keep using the listenKey: only the last one closes it
+        with UserDataStream._key_users_lock:
+            if not self._started:
+                return
+            self._started = False
+
+            users = UserDataStream._key_users.get(self._key, 1) - 1
+            if users > 0:
+                UserDataStream._key_users[self._key] = users
+                return
+            UserDataStream._key_users.pop(self._key, None)
+
+        if self.listen_key is not None:
+            try:
+                self.api_handler.close_listen_key()
+            except Exception:
+                pass
+
+
+    def _keepalive(self):
+        while not self._stop_event.wait(self.keepalive_interval):
+            if self.listen_key is None:
+                continue
+
+            try:
+                self.api_handler.keepalive_listen_key()
+            except Exception:
+                if self.logger:
+                    self.logger.exception("listenKey keep-alive failed.")
+
+
+    def _run(self):
+        delay = self.reconnect_delay
+
+        while not self._stop_event.is_set():
+            opened = threading.Event()
+
+            try:
+                self.listen_key = self.api_handler.create_listen_key()
+
+                def on_open(ws):
+                    opened.set()
+                    self._on_open(ws)
+
+                self._app = websocket.WebSocketApp(f"{self.base_url}/ws/{self.listen_key}",
+                                                   on_open=on_open,
+                                                   on_message=self._on_message)
+                self._app.run_forever(ping_interval=60, ping_timeout=10)
+
+            except Exception:
+                if self.logger:
+                    self.logger.exception("User data stream failed.")
+
+            self._connected.clear()
+
+            if self._stop_event.is_set():
+                break
+
+            # Reset the backoff once a connection has been established
+            if opened.is_set():
+                delay = self.reconnect_delay
+
+            if self.logger:
+                self.logger.warning(f"User data stream disconnected. Reconnecting in {delay:.1f}s (REST fallback in use).")
+
+            self._stop_event.wait(delay)
+            delay = min(delay*2, self.max_reconnect_delay)
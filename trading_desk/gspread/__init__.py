@@ -1,8 +1,11 @@
 from .setup_gspread import init_gspread, setup_worksheet_format
-from .update_gspread import add_transaction_log
+from .update_gspread import add_transaction_log, build_transaction_row
+from .sheet_writer import SheetWriter
 from .utils import get_cell_value
 
 __all__ = ["init_gspread",
            "setup_worksheet_format",
            "add_transaction_log",
+           "build_transaction_row",
+           "SheetWriter",
            "get_cell_value"]
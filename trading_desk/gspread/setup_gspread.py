@@ -1,12 +1,17 @@
 import datetime
 import os
 import string
+from typing import List
 
 ## gspread
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 
-def init_gspread(session_name:str):
+def init_gspread(session_name:str,
+                 reuse:bool=False):
+    """
+    Create the session worksheet. With `reuse`, an existing worksheet of the same name is returned (warm restart).
+    """
     scope = [
     'https://spreadsheets.google.com/feeds',
     'https://www.googleapis.com/auth/drive',
@@ -27,7 +32,7 @@ def init_gspread(session_name:str):
         doc.add_worksheet(title=session_name,
                           rows=100, 
                           cols=20)
-    else:
+    elif not reuse:
         raise ValueError("Worksheet with the same name is existing")
 
     ws = doc.worksheet(session_name)
@@ -46,18 +51,25 @@ def setup_worksheet_format(worksheet,
                            init_capital:float,
                            traded_assets:List[str],
                            tmux_session_name:str):
+    """
+    Write the session info and the transaction history header with a single `batch_update`.
+    Returns the first row of the transaction history (right below the header).
+    """
     # Alias
     CELL_CAPITAL = "C2"      
 
     # Session info
-    worksheet.update([["strategy", strategy_name]], "B2:C2")
-    worksheet.update([["init_capital", init_capital]], "B3:C3")
-    worksheet.update([["current_capital", init_capital]], "B4:C4")
-    worksheet.update([["collateral_long", 0]], "B5:C5")
-    worksheet.update([["collateral_short", 0]], "B6:C6")
-    worksheet.update([["tmux_session_name", tmux_session_name]], "B7:C7")
-    worksheet.update([["sheet_created(UTC+0)", datetime.datetime.now().strftime("%Y_%m_%d_%H_%M_%S")]], "B8:C8")
-    worksheet.update([["is_running", 1]], "B9:C9")
+    session_info = [
+        ["strategy", strategy_name],
+        ["init_capital", init_capital],
+        ["current_capital", init_capital],
+        ["collateral_long", 0],
+        ["collateral_short", 0],
+        ["tmux_session_name", tmux_session_name],
+        ["sheet_created(UTC+0)", datetime.datetime.now().strftime("%Y_%m_%d_%H_%M_%S")],
+        ["is_running", 1],
+    ]
+    session_info_range = f"B2:C{2 + len(session_info) - 1}" # B2:C9
 
     # Transaction history
     header_list = []
@@ -77,11 +89,16 @@ def setup_worksheet_format(worksheet,
     ])
 
     start_col = 2
-    row_idx = len(worksheet.col_values(start_col)) + 2
+    row_idx = 2 + len(session_info) + 1 # One blank row below the session info
     end_col = start_col + len(header_list) - 1
     update_range = (
         f"{num_to_col(start_col)}{row_idx}:"
         f"{num_to_col(end_col)}{row_idx}"
     )
 
-    worksheet.update([header_list], update_range)
+    worksheet.batch_update([
+        {"range": session_info_range, "values": session_info},
+        {"range": update_range, "values": [header_list]},
+    ])
+
+    return row_idx + 1
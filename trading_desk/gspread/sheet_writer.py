@@ -0,0 +1,156 @@
+import queue
+import threading
+from typing import Callable, List, Optional
+
+from .update_gspread import num_to_col, retry_gspread
+from ..functions.metrics import NULL_METRICS
+
+
+class SheetWriter:
+    """
+    Background sink for worksheet writes.
+
+    Rows are assigned to the next free row locally when they are queued (no `col_values` read per row),
+    so `next_row` always counts every queued row, written or not, and can be saved for a warm restart.
+    A background thread drains the queue and writes everything pending with one `batch_update`
+    per flush, so Google API latency, 503 backoff and outages never block the caller.
+    A batch that still fails after retries is kept and written with the next flush.
+
+    If `worksheet` is None, `open_worksheet` (a no-argument callable returning (worksheet, next_row))
+    is called from the background thread before the first write, e.g. to reopen a worksheet on restart.
+    """
+    def __init__(self,
+                 worksheet=None,
+                 start_col:int=2,
+                 next_row:Optional[int]=None,
+                 open_worksheet:Optional[Callable]=None,
+                 flush_interval:float=1.0,
+                 max_retries:int=5,
+                 logger=None,
+                 metrics=None):
+        self.worksheet = worksheet
+        self.start_col = start_col
+        self.next_row = next_row # First free row. None -> read once from the worksheet before the first row is written.
+        self.open_worksheet = open_worksheet
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.logger = logger
+        self.metrics = metrics if metrics is not None else NULL_METRICS # 'sheets.flush' span per batch write
+
+        self._queue = queue.Queue()
+        self._pending = [] # Drained but not yet written (kept across failed flushes)
+        self._flush_lock = threading.Lock()
+        self._row_lock = threading.Lock() # Guards `next_row`
+        self._stop = threading.Event()
+        self._thread = None
+
+
+    def write_range(self,
+                    cell_range:str,
+                    values:List[List]):
+        self._queue.put({"range": cell_range, "values": values})
+
+
+    def append_row(self,
+                   row:List):
+        """
+        Queue `row` for the next free row, starting from `start_col`.
+        """
+        with self._row_lock:
+            if self.next_row is None:
+                self._queue.put({"row": row}) # Assigned by the background thread once the first free row is known
+            else:
+                self._queue.put(self._assign(row))
+
+
+    def _assign(self,
+                row:List):
+        # Caller holds `_row_lock`
+        row_idx = self.next_row
+        self.next_row += 1
+
+        end_col = self.start_col + len(row) - 1
+        return {"range": f"{num_to_col(self.start_col)}{row_idx}:{num_to_col(end_col)}{row_idx}",
+                "values": [row]}
+
+
+    def _resolve(self,
+                 item:dict):
+        # Assign the next free row to a row queued before it was known
+        if "row" not in item:
+            return item
+
+        if self.next_row is None:
+            col_values = retry_gspread(lambda: self.worksheet.col_values(self.start_col),
+                                       logger=self.logger,
+                                       max_retries=self.max_retries)
+            with self._row_lock:
+                if self.next_row is None:
+                    self.next_row = len(col_values) + 1
+
+        with self._row_lock:
+            return self._assign(item["row"])
+
+
+    def flush(self):
+        """
+        Write everything queued so far with a single `batch_update`. Returns False if the write failed.
+        """
+        with self._flush_lock:
+            while True:
+                try:
+                    self._pending.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                if self.worksheet is None:
+                    self.worksheet, next_row = self.open_worksheet()
+                    with self._row_lock:
+                        if self.next_row is None:
+                            self.next_row = next_row
+
+                if not self._pending:
+                    return True
+
+                for i, item in enumerate(self._pending):
+                    self._pending[i] = self._resolve(item) # Resolved in place: rows keep their index across retries
+
+                batch = self._pending
+                with self.metrics.span("sheets.flush"):
+                    retry_gspread(lambda: self.worksheet.batch_update(batch),
+                                  logger=self.logger,
+                                  max_retries=self.max_retries)
+            except Exception:
+                if self.logger:
+                    self.logger.exception(f"Failed to write {len(self._pending)} items to the worksheet. Retrying with the next flush.")
+                return False
+
+            self._pending = []
+            return True
+
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+
+    def stop(self,
+             timeout:Optional[float]=None):
+        """
+        Stop the background thread after a final flush.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+        self.flush()
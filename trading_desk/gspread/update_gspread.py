@@ -29,20 +29,17 @@ def retry_gspread(func, logger=None, max_retries=5):
                 raise  # re-raise non-503 errors
     raise Exception(f"{func.__name__} failed after {max_retries} retries")
 
-def add_transaction_log(
-    worksheet,
+def build_transaction_row(
     positions_to_record,
     open_close: str,
     collateral_long: float,
     collateral_short: float,
-    capital: float,
-    logger=None
+    capital: float
 ):
     """
-    Add a transaction log row to the worksheet, with retry logic for gspread API calls.
+    Compose a transaction log row (timestamp, per-asset fields, account info).
     """
 
-    # Compose transaction row
     row_element_list = []
 
     # Add timestamp
@@ -62,6 +59,27 @@ def add_transaction_log(
     # Add account info
     row_element_list.extend([open_close, collateral_long, collateral_short, capital])
 
+    return row_element_list
+
+def add_transaction_log(
+    worksheet,
+    positions_to_record,
+    open_close: str,
+    collateral_long: float,
+    collateral_short: float,
+    capital: float,
+    logger=None
+):
+    """
+    Add a transaction log row to the worksheet, with retry logic for gspread API calls.
+    Synchronous: the desk queues rows through `SheetWriter` instead.
+    """
+    row_element_list = build_transaction_row(positions_to_record=positions_to_record,
+                                             open_close=open_close,
+                                             collateral_long=collateral_long,
+                                             collateral_short=collateral_short,
+                                             capital=capital)
+
     # Determine row index safely
     start_col = 2
     col_values = retry_gspread(lambda: worksheet.col_values(start_col), logger=logger, max_retries=5)
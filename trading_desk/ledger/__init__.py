@@ -0,0 +1,27 @@
+from .base import Ledger, FILL_COLUMNS, SNAPSHOT_COLUMNS
+from .sqlite_ledger import SQLiteLedger
+from .parquet_ledger import ParquetLedger
+
+
+def open_ledger(backend:str,
+                path:str,
+                session_name:str,
+                is_mock:bool=True):
+    """
+    Open the "sqlite" (database file at `path`) or "parquet" (directory at `path`) ledger of a session.
+    `is_mock` selects how equity is computed from the recorded capital (see `Ledger`).
+    """
+    if backend == "sqlite":
+        return SQLiteLedger(path=path, session_name=session_name, is_mock=is_mock)
+    elif backend == "parquet":
+        return ParquetLedger(root=path, session_name=session_name, is_mock=is_mock)
+    else:
+        raise ValueError(f"Unknown ledger backend '{backend}'.")
+
+
+__all__ = ["Ledger",
+           "SQLiteLedger",
+           "ParquetLedger",
+           "open_ledger",
+           "FILL_COLUMNS",
+           "SNAPSHOT_COLUMNS"]
@@ -0,0 +1,164 @@
+import time
+from typing import List, Optional
+
+from ..strategy.position_model import Position
+
+FILL_COLUMNS = ["time_ms", "session", "symbol", "open_close", "position",
+                "fetched_price", "entry_price", "quantity", "amount", "notional"]
+SNAPSHOT_COLUMNS = ["time_ms", "session", "open_close", "collateral_long", "collateral_short",
+                    "capital", "equity", "cum_turnover"]
+
+
+class Ledger:
+    """
+    Transaction ledger of a trading session.
+
+    Every `record` call stores one row per `Position` fill and one snapshot of collateral and capital.
+    Snapshots carry the running turnover (`cum_turnover`) and the book equity (positions at cost),
+    so PnL and turnover over any time range are two indexed lookups instead of a scan over fills.
+
+    Equity depends on what `capital` means:
+    - mock (`is_mock=True`): cash, which a short opening credits with its proceeds -> capital + long - short
+    - live: 'availableBalance', which already has the margin of both sides deducted -> capital + long + short
+
+    Backends implement `_write`, `_last_snapshot`, `_first_snapshot`, `symbol_turnover`, `fills` and `close`.
+    """
+    def __init__(self,
+                 session_name:str,
+                 is_mock:bool=True):
+        self.session_name = session_name
+        self.is_mock = is_mock
+        self.cum_turnover = 0.0 # Backends resume it from the last stored snapshot
+
+
+    def record(self,
+               positions:List[Position],
+               open_close:str,
+               collateral_long:float,
+               collateral_short:float,
+               capital:float,
+               time_ms:Optional[int]=None):
+        """
+        Store the fills in `positions` (flat placeholders are skipped) and a capital snapshot.
+        `open_close` tags the event, e.g. "open", "close" or "exit".
+        """
+        if time_ms is None:
+            time_ms = int(time.time() * 1000)
+
+        fills = []
+        for position in positions:
+            if position.quantity == 0:
+                continue
+
+            notional = abs(position.quantity)*position.entry_price
+            fills.append({
+                "time_ms": time_ms,
+                "session": self.session_name,
+                "symbol": position.symbol,
+                "open_close": open_close,
+                "position": position.position,
+                "fetched_price": position.fetched_price,
+                "entry_price": position.entry_price,
+                "quantity": position.quantity,
+                "amount": position.amount,
+                "notional": notional,
+            })
+            self.cum_turnover += notional
+
+        snapshot = {
+            "time_ms": time_ms,
+            "session": self.session_name,
+            "open_close": open_close,
+            "collateral_long": collateral_long,
+            "collateral_short": collateral_short,
+            "capital": capital,
+            "equity": self.equity(capital, collateral_long, collateral_short),
+            "cum_turnover": self.cum_turnover,
+        }
+
+        self._write(fills, snapshot)
+
+
+    def equity(self,
+               capital:float,
+               collateral_long:float,
+               collateral_short:float):
+        if self.is_mock:
+            return capital + collateral_long - collateral_short
+        return capital + collateral_long + collateral_short
+
+
+    def pnl(self,
+            start_time:Optional[int]=None,
+            end_time:Optional[int]=None):
+        """
+        Change of book equity over [start_time, end_time] (milliseconds). Fees are included.
+        """
+        end = self._last_snapshot(end_time)
+        begin = self._last_snapshot(start_time - 1) if start_time is not None else None
+        if begin is None:
+            begin = self._first_snapshot(start_time)
+
+        if begin is None or end is None:
+            return 0.0
+
+        return end["equity"] - begin["equity"]
+
+
+    def turnover(self,
+                 start_time:Optional[int]=None,
+                 end_time:Optional[int]=None,
+                 symbol:Optional[str]=None):
+        """
+        Traded notional over [start_time, end_time] (milliseconds), for one symbol or the whole session.
+        """
+        if symbol is not None:
+            return self.symbol_turnover(symbol=symbol, start_time=start_time, end_time=end_time)
+
+        end = self._last_snapshot(end_time)
+        begin = self._last_snapshot(start_time - 1) if start_time is not None else None
+
+        if end is None:
+            return 0.0
+
+        return end["cum_turnover"] - (begin["cum_turnover"] if begin is not None else 0.0)
+
+
+    def _write(self,
+               fills:List[dict],
+               snapshot:dict):
+        raise NotImplementedError
+
+
+    def _last_snapshot(self,
+                       time_ms:Optional[int]):
+        """
+        Latest snapshot with time <= `time_ms` (any time if None), or None.
+        """
+        raise NotImplementedError
+
+
+    def _first_snapshot(self,
+                        time_ms:Optional[int]):
+        """
+        Earliest snapshot with time >= `time_ms` (any time if None), or None.
+        """
+        raise NotImplementedError
+
+
+    def symbol_turnover(self,
+                        symbol:str,
+                        start_time:Optional[int]=None,
+                        end_time:Optional[int]=None):
+        raise NotImplementedError
+
+
+    def fills(self,
+              start_time:Optional[int]=None,
+              end_time:Optional[int]=None,
+              symbol:Optional[str]=None):
+        raise NotImplementedError
+
+
+    def close(self):
+        pass
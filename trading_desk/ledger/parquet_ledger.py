@@ -0,0 +1,226 @@
+import bisect
+import json
+import os
+import threading
+import time
+from typing import List, Optional
+from urllib.parse import quote
+
+from .base import Ledger, FILL_COLUMNS, SNAPSHOT_COLUMNS
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError: # Optional dependency: only needed for the Parquet backend
+    pa = None
+
+
+class ParquetLedger(Ledger):
+    """
+    Append-only Parquet ledger: immutable part files under `{root}/fills/session-{session}/` and
+    `{root}/snapshots/session-{session}/` (session name URL-quoted), so a session only ever lists,
+    compacts and deletes its own parts. Reads scan the whole directory and filter on the `session` column.
+
+    By default every `record` is written at once as its own small part file (one per rebalance), so a crash
+    loses nothing. Once a session has `compact_every` part files (and on `close`), `compact` merges them
+    into one. Snapshots of the session are also kept in memory (one per event) for PnL/turnover lookups
+    with `bisect`. Fills are queried with pyarrow dataset filters, plus the unflushed buffer.
+    """
+    def __init__(self,
+                 root:str,
+                 session_name:str,
+                 is_mock:bool=True,
+                 flush_every:int=1,
+                 compact_every:int=200):
+        if pa is None:
+            raise ImportError("ParquetLedger requires pyarrow. Install it or use the SQLite ledger.")
+
+        super().__init__(session_name=session_name, is_mock=is_mock)
+        self.root = root
+        self.flush_every = flush_every
+        self.compact_every = compact_every
+
+        self.fills_dir = os.path.join(root, "fills")
+        self.snapshots_dir = os.path.join(root, "snapshots")
+
+        # This session's part files
+        session_dir = f"session-{quote(session_name, safe='')}"
+        self.session_fills_dir = os.path.join(self.fills_dir, session_dir)
+        self.session_snapshots_dir = os.path.join(self.snapshots_dir, session_dir)
+        os.makedirs(self.session_fills_dir, exist_ok=True)
+        os.makedirs(self.session_snapshots_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._fill_buffer: List[dict] = []
+        self._snapshot_buffer: List[dict] = []
+        self._n_parts = 0
+
+        self._finish_compaction()
+
+        # Session snapshots, ascending by time
+        self._snapshots = self._read(self.snapshots_dir)
+        self._snapshots.sort(key=lambda s: s["time_ms"])
+        self._snapshot_times = [s["time_ms"] for s in self._snapshots]
+
+        if self._snapshots:
+            self.cum_turnover = self._snapshots[-1]["cum_turnover"]
+
+
+    def _read(self,
+              directory:str,
+              filter=None):
+        if not any(name.endswith(".parquet") for _, _, names in os.walk(directory) for name in names):
+            return []
+
+        session_filter = ds.field("session") == self.session_name
+        if filter is not None:
+            session_filter = session_filter & filter
+
+        return ds.dataset(directory, format="parquet").to_table(filter=session_filter).to_pylist()
+
+
+    def _write(self,
+               fills:List[dict],
+               snapshot:dict):
+        with self._lock:
+            self._fill_buffer.extend(fills)
+            self._snapshot_buffer.append(snapshot)
+
+            self._snapshots.append(snapshot)
+            self._snapshot_times.append(snapshot["time_ms"])
+
+            if len(self._snapshot_buffer) >= self.flush_every:
+                self._flush()
+
+
+    def _part_name(self,
+                   suffix:str=""):
+        self._n_parts += 1
+        return f"part-{int(time.time() * 1000)}-{self._n_parts}{suffix}.parquet"
+
+
+    @staticmethod
+    def _session_parts(directory:str):
+        return sorted(name for name in os.listdir(directory) if name.startswith("part-") and name.endswith(".parquet"))
+
+
+    @staticmethod
+    def _write_part(directory:str,
+                    name:str,
+                    table):
+        # Written under a hidden temporary name first (ignored by dataset scans), so readers never see a partial file
+        tmp_path = os.path.join(directory, f".{name}.tmp")
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, os.path.join(directory, name))
+
+
+    def _flush(self):
+        name = self._part_name()
+
+        for directory, rows, columns in [(self.session_fills_dir, self._fill_buffer, FILL_COLUMNS),
+                                         (self.session_snapshots_dir, self._snapshot_buffer, SNAPSHOT_COLUMNS)]:
+            if not rows:
+                continue
+
+            self._write_part(directory, name, pa.Table.from_pylist([{c: row[c] for c in columns} for row in rows]))
+
+        self._fill_buffer = []
+        self._snapshot_buffer = []
+
+        if len(self._session_parts(self.session_snapshots_dir)) >= self.compact_every:
+            self._compact()
+
+
+    def _compact(self):
+        """
+        Merge the session's part files of each directory into one.
+
+        The merged part lists the parts it replaces in its schema metadata, and those are deleted after it is
+        in place. A crash in between leaves duplicates that `_finish_compaction` removes on the next open.
+        """
+        for directory in [self.session_fills_dir, self.session_snapshots_dir]:
+            parts = self._session_parts(directory)
+            if len(parts) < 2:
+                continue
+
+            table = pa.concat_tables([pq.read_table(os.path.join(directory, part)) for part in parts])
+            table = table.replace_schema_metadata({b"replaces": json.dumps(parts).encode("utf-8")})
+            self._write_part(directory, self._part_name(suffix="-compact"), table)
+
+            for part in parts:
+                os.remove(os.path.join(directory, part))
+
+
+    def _finish_compaction(self):
+        # Delete the parts a merged part replaced, if a crash left them behind
+        for directory in [self.session_fills_dir, self.session_snapshots_dir]:
+            for part in self._session_parts(directory):
+                if not part.endswith("-compact.parquet"):
+                    continue
+
+                metadata = pq.read_schema(os.path.join(directory, part)).metadata or {}
+                for replaced in json.loads(metadata.get(b"replaces", b"[]")):
+                    if os.path.exists(os.path.join(directory, replaced)):
+                        os.remove(os.path.join(directory, replaced))
+
+
+    def compact(self):
+        with self._lock:
+            self._flush()
+            self._compact()
+
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+
+    def _last_snapshot(self,
+                       time_ms:Optional[int]):
+        with self._lock:
+            if time_ms is None:
+                idx = len(self._snapshots) - 1
+            else:
+                idx = bisect.bisect_right(self._snapshot_times, time_ms) - 1
+            return self._snapshots[idx] if idx >= 0 else None
+
+
+    def _first_snapshot(self,
+                        time_ms:Optional[int]):
+        with self._lock:
+            idx = 0 if time_ms is None else bisect.bisect_left(self._snapshot_times, time_ms)
+            return self._snapshots[idx] if idx < len(self._snapshots) else None
+
+
+    def fills(self,
+              start_time:Optional[int]=None,
+              end_time:Optional[int]=None,
+              symbol:Optional[str]=None):
+        """
+        Fill rows over [start_time, end_time] as a list of dicts, oldest first.
+        """
+        start_time = start_time if start_time is not None else -2**63
+        end_time = end_time if end_time is not None else 2**63 - 1
+
+        condition = (ds.field("time_ms") >= start_time) & (ds.field("time_ms") <= end_time)
+        if symbol is not None:
+            condition = condition & (ds.field("symbol") == symbol)
+
+        with self._lock:
+            rows = self._read(self.fills_dir, filter=condition)
+            rows += [f for f in self._fill_buffer
+                     if start_time <= f["time_ms"] <= end_time and (symbol is None or f["symbol"] == symbol)]
+
+        return sorted(rows, key=lambda f: f["time_ms"])
+
+
+    def symbol_turnover(self,
+                        symbol:str,
+                        start_time:Optional[int]=None,
+                        end_time:Optional[int]=None):
+        return sum(f["notional"] for f in self.fills(start_time=start_time, end_time=end_time, symbol=symbol))
+
+
+    def close(self):
+        self.compact()
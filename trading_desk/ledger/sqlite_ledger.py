@@ -0,0 +1,141 @@
+import os
+import sqlite3
+import threading
+from typing import List, Optional
+
+from .base import Ledger, FILL_COLUMNS, SNAPSHOT_COLUMNS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fills (
+    time_ms INTEGER NOT NULL,
+    session TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    open_close TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    fetched_price REAL,
+    entry_price REAL,
+    quantity REAL,
+    amount REAL,
+    notional REAL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    time_ms INTEGER NOT NULL,
+    session TEXT NOT NULL,
+    open_close TEXT NOT NULL,
+    collateral_long REAL,
+    collateral_short REAL,
+    capital REAL,
+    equity REAL,
+    cum_turnover REAL
+);
+CREATE INDEX IF NOT EXISTS fills_session_time ON fills (session, time_ms);
+CREATE INDEX IF NOT EXISTS fills_session_symbol_time ON fills (session, symbol, time_ms, notional);
+CREATE INDEX IF NOT EXISTS snapshots_session_time ON snapshots (session, time_ms);
+"""
+
+
+class SQLiteLedger(Ledger):
+    """
+    Ledger in a local SQLite database (WAL journal, one transaction per `record`).
+    Several sessions may share one database file: every row is keyed by session name.
+    """
+    def __init__(self,
+                 path:str,
+                 session_name:str,
+                 is_mock:bool=True):
+        super().__init__(session_name=session_name, is_mock=is_mock)
+        self.path = path
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Written from the scheduler thread and the exit worker
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+        last = self._last_snapshot(None)
+        if last is not None:
+            self.cum_turnover = last["cum_turnover"]
+
+
+    def _write(self,
+               fills:List[dict],
+               snapshot:dict):
+        with self._lock, self.connection:
+            self.connection.executemany(
+                f"INSERT INTO fills ({', '.join(FILL_COLUMNS)}) VALUES ({', '.join('?'*len(FILL_COLUMNS))})",
+                [tuple(fill[c] for c in FILL_COLUMNS) for fill in fills]
+            )
+            self.connection.execute(
+                f"INSERT INTO snapshots ({', '.join(SNAPSHOT_COLUMNS)}) VALUES ({', '.join('?'*len(SNAPSHOT_COLUMNS))})",
+                tuple(snapshot[c] for c in SNAPSHOT_COLUMNS)
+            )
+
+
+    def _query_one(self,
+                   sql:str,
+                   params:tuple):
+        with self._lock:
+            row = self.connection.execute(sql, params).fetchone()
+        return dict(row) if row is not None else None
+
+
+    def _last_snapshot(self,
+                       time_ms:Optional[int]):
+        if time_ms is None:
+            return self._query_one("SELECT * FROM snapshots WHERE session = ? ORDER BY time_ms DESC, rowid DESC LIMIT 1",
+                                   (self.session_name,))
+        return self._query_one("SELECT * FROM snapshots WHERE session = ? AND time_ms <= ? ORDER BY time_ms DESC, rowid DESC LIMIT 1",
+                               (self.session_name, time_ms))
+
+
+    def _first_snapshot(self,
+                        time_ms:Optional[int]):
+        if time_ms is None:
+            return self._query_one("SELECT * FROM snapshots WHERE session = ? ORDER BY time_ms, rowid LIMIT 1",
+                                   (self.session_name,))
+        return self._query_one("SELECT * FROM snapshots WHERE session = ? AND time_ms >= ? ORDER BY time_ms, rowid LIMIT 1",
+                               (self.session_name, time_ms))
+
+
+    def symbol_turnover(self,
+                        symbol:str,
+                        start_time:Optional[int]=None,
+                        end_time:Optional[int]=None):
+        # Covered by the (session, symbol, time_ms, notional) index
+        row = self._query_one("SELECT COALESCE(SUM(notional), 0.0) AS turnover FROM fills "
+                              "WHERE session = ? AND symbol = ? AND time_ms >= ? AND time_ms <= ?",
+                              (self.session_name,
+                               symbol,
+                               start_time if start_time is not None else -2**63,
+                               end_time if end_time is not None else 2**63 - 1))
+        return row["turnover"]
+
+
+    def fills(self,
+              start_time:Optional[int]=None,
+              end_time:Optional[int]=None,
+              symbol:Optional[str]=None):
+        """
+        Fill rows over [start_time, end_time] as a list of dicts, oldest first.
+        """
+        sql = "SELECT * FROM fills WHERE session = ? AND time_ms >= ? AND time_ms <= ?"
+        params = [self.session_name,
+                  start_time if start_time is not None else -2**63,
+                  end_time if end_time is not None else 2**63 - 1]
+        if symbol is not None:
+            sql += " AND symbol = ?"
+            params.append(symbol)
+
+        with self._lock:
+            rows = self.connection.execute(sql + " ORDER BY time_ms, rowid", params).fetchall()
+        return [dict(row) for row in rows]
+
+
+    def close(self):
+        with self._lock:
+            self.connection.close()
@@ -0,0 +1,144 @@
+import threading
+from typing import Dict, List, Optional
+
+from .functions import APIHandler, ExchangeMetadataCache, KlineStore, KlineArchive, PriceStream, decode_klines
+
+
+class MarketData:
+    """
+    Market data shared by the trading sessions of one process.
+
+    Sessions `subscribe` their symbols and kline interval before `start`. The hub then holds
+    - one exchangeInfo snapshot (`metadata_cache`) for the union of the symbols,
+    - one `KlineStore` per interval over the union of the symbols, filled once per bar by `refresh`,
+    - one `PriceStream` whose listeners are every session's exit engine.
+
+    All requests go through `api_handler`, whose `rate_limiter` should also be given to the
+    sessions' own (trading) APIHandlers so every request of the process shares one IP budget.
+    Adding a session that trades already-subscribed symbols on a subscribed interval adds no market data request.
+    """
+    def __init__(self,
+                 api_handler:APIHandler,
+                 kline_archive_dir:Optional[str]=None,
+                 stream:str="markPrice",
+                 stream_base_url:str="wss://fstream.binance.com"):
+        self.api_handler = api_handler
+        self.kline_archive = KlineArchive(root=kline_archive_dir) if kline_archive_dir is not None else None
+        self.stream = stream
+        self.stream_base_url = stream_base_url
+
+        self.symbols: List[str] = []
+        self.intervals: List[tuple] = [] # (every, unit)
+        self.metadata_cache = ExchangeMetadataCache(api_handler=self.api_handler,
+                                                    ttl=3600)
+        self.kline_stores: Dict[tuple, KlineStore] = {} # (every, unit) -> KlineStore
+        self.price_stream = None
+
+        self._lock = threading.Lock()
+        self._refresh_locks: Dict[tuple, threading.Lock] = {}
+        self._started = False
+
+
+    def subscribe(self,
+                  symbols:List[str],
+                  every:int,
+                  unit:str):
+        """
+        Register a session's symbols and kline interval. No-op if they are already covered.
+        """
+        with self._lock:
+            new_symbols = [symbol for symbol in symbols if symbol not in self.symbols]
+            new_interval = (every, unit) not in self.intervals
+
+            if not new_symbols and not new_interval:
+                return
+
+            if self._started:
+                raise RuntimeError(f"Cannot subscribe {new_symbols} on {every}{unit} after MarketData has started.")
+
+            self.symbols.extend(new_symbols)
+
+            if new_interval:
+                self.intervals.append((every, unit))
+
+
+    def start(self,
+              logger=None):
+        """
+        Load exchange metadata, warm-start the kline stores from the archive and start the price stream.
+        Only the first call does anything.
+        """
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+
+        self.metadata_cache.load(symbols=self.symbols) # Single exchangeInfo download for every session
+
+        for every, unit in self.intervals:
+            store = KlineStore(symbols=self.symbols,
+                               every=every,
+                               unit=unit)
+
+            if self.kline_archive is not None:
+                # Warm-start the rolling window from klines archived by previous runs
+                _, end_time = self.api_handler.kline_window(every=every, unit=unit, timesteps=0)
+                store.warm_start(archive=self.kline_archive, end_time=end_time)
+
+            self.kline_stores[(every, unit)] = store
+            self._refresh_locks[(every, unit)] = threading.Lock()
+
+        self.price_stream = PriceStream(symbols=self.symbols,
+                                        stream=self.stream,
+                                        base_url=self.stream_base_url,
+                                        logger=logger)
+        self.price_stream.start()
+
+
+    def kline_store(self,
+                    every:int,
+                    unit:str):
+        return self.kline_stores[(every, unit)]
+
+
+    def refresh(self,
+                every:int,
+                unit:str,
+                end_time:int,
+                lookback:int):
+        """
+        Fetch the klines every subscribed symbol lacks for the window ending at `end_time`, for all sessions at once.
+
+        Sessions on the same interval call this on the same bar: the first call fetches, the others find
+        the window complete and return without a request.
+
+        Returns {symbol: error message} for the symbols that failed in this call.
+        """
+        store = self.kline_stores[(every, unit)]
+
+        with self._refresh_locks[(every, unit)]:
+            windows = store.missing_windows(end_time=end_time,
+                                            lookback=lookback)
+            if not windows:
+                return {}
+
+            klines, errors = self.api_handler.fetch_klines_many(symbols=list(windows),
+                                                                every=every,
+                                                                unit=unit,
+                                                                windows=windows)
+
+            for symbol, k in klines.items():
+                # Decoded once for the store and the archive. The incomplete kline is dropped.
+                open_time, ohlcv = decode_klines(k, end_time=end_time)
+
+                store.update_arrays(symbol=symbol,
+                                    open_time=open_time,
+                                    close=ohlcv[:, 3])
+
+                if self.kline_archive is not None:
+                    self.kline_archive.append_arrays(symbol=symbol,
+                                                     interval=f"{every}{unit}",
+                                                     open_time=open_time,
+                                                     ohlcv=ohlcv)
+
+        return errors
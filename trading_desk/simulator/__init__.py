@@ -0,0 +1,20 @@
+from .market import SymbolSpec, MarketModel, default_specs
+from .order_book import OrderBook
+from .account import Account, SimPosition
+from .faults import FaultInjector, INJECTED_ERRORS
+from .exchange import Exchange, ExchangeError
+from .user_stream import UserStreamHub
+from .server import ExchangeSimulator
+
+__all__ = ["SymbolSpec",
+           "MarketModel",
+           "default_specs",
+           "OrderBook",
+           "Account",
+           "SimPosition",
+           "FaultInjector",
+           "INJECTED_ERRORS",
+           "Exchange",
+           "ExchangeError",
+           "UserStreamHub",
+           "ExchangeSimulator"]
@@ -0,0 +1,57 @@
+# Import packages
+import argparse
+
+# Import functions, classes
+from .faults import FaultInjector
+from .server import ExchangeSimulator
+
+
+# Main code
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Binance USDⓈ-M futures exchange simulator (REST, user data stream and mark price streams).")
+    parser.add_argument("--symbols", nargs="+", default=None, help="Listed symbols (default: SYM000USDT... of --n-symbols)")
+    parser.add_argument("--n-symbols", type=int, default=200)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--balance", type=float, default=10000.0, help="Initial USDT wallet balance")
+    parser.add_argument("--taker-fee", type=float, default=0.0005)
+    parser.add_argument("--volatility", type=float, default=0.01)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds slept before every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform +/- seconds around --latency")
+    parser.add_argument("--error-1007", type=float, default=0.0, help="Rate of -1007 timeouts on new orders")
+    parser.add_argument("--error-1021", type=float, default=0.0, help="Rate of -1021 rejections on signed requests")
+    parser.add_argument("--error-503", type=float, default=0.0, help="Rate of 503 responses on any request")
+    parser.add_argument("--timeout-execution-rate", type=float, default=0.5, help="Share of -1007 orders executed anyway")
+    parser.add_argument("--clock-offset-ms", type=int, default=0, help="Server clock minus local clock")
+    parser.add_argument("--api-secret", default=None, help="Verify signatures with this secret (default: not verified)")
+    parser.add_argument("--no-limits", action="store_true", help="Do not reject requests over the weight / order limits")
+    parser.add_argument("--mark-price-interval", type=float, default=None, help="Seconds between mark price stream updates (default: 1 s for '@markPrice@1s', 3 s for '@markPrice')")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    faults = FaultInjector(latency=args.latency,
+                           jitter=args.jitter,
+                           error_rates={"-1007": args.error_1007,
+                                        "-1021": args.error_1021,
+                                        "503": args.error_503},
+                           timeout_execution_rate=args.timeout_execution_rate,
+                           seed=args.seed)
+
+    simulator = ExchangeSimulator(symbols=args.symbols or [f"SYM{i:03d}USDT" for i in range(args.n_symbols)],
+                                  balance=args.balance,
+                                  taker_fee=args.taker_fee,
+                                  volatility=args.volatility,
+                                  faults=faults,
+                                  clock_offset_ms=args.clock_offset_ms,
+                                  api_secret=args.api_secret,
+                                  enforce_limits=not args.no_limits,
+                                  mark_price_interval=args.mark_price_interval,
+                                  seed=args.seed,
+                                  host=args.host,
+                                  port=args.port)
+
+    print(f"Serving {len(simulator.exchange.specs)} symbols at {simulator.base_url} (Ctrl+C to stop)")
+    try:
+        simulator.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,132 @@
+from dataclasses import dataclass
+from typing import Dict
+
+
+@dataclass
+class SimPosition:
+    """
+    One-way (BOTH) position of a symbol. `amount` > 0 is long, < 0 short.
+    """
+    amount: float = 0.0
+    entry_price: float = 0.0
+    leverage: int = 20 # Binance default
+    update_time: int = 0
+
+
+class Account:
+    """
+    USDⓈ-M cross-margin account of the simulator.
+
+    - Fills re-average the entry price when a position grows and realize PnL into the wallet when it shrinks.
+    - Every fill pays the taker fee on its quote value (market orders only take).
+    - Margin: initial margin is |amount|*mark/leverage, available balance = wallet + unrealized PnL - initial margin.
+    """
+    def __init__(self,
+                 balance:float=10000.0,
+                 taker_fee:float=0.0005,
+                 asset:str="USDT"):
+        self.asset = asset
+        self.taker_fee = taker_fee
+
+        self.wallet_balance = balance
+        self.positions: Dict[str, SimPosition] = {}
+        self.realized_pnl = 0.0
+        self.fees_paid = 0.0
+
+
+    def position(self,
+                 symbol:str):
+        position = self.positions.get(symbol)
+        if position is None:
+            position = self.positions[symbol] = SimPosition()
+        return position
+
+
+    def set_leverage(self,
+                     symbol:str,
+                     leverage:int):
+        self.position(symbol).leverage = leverage
+
+
+    def apply_fill(self,
+                   symbol:str,
+                   side:str,
+                   quantity:float,
+                   price:float,
+                   time_ms:int):
+        """
+        Book one fill. Returns (realized PnL, commission) of the fill.
+        """
+        position = self.position(symbol)
+        signed = quantity if side == "BUY" else -quantity
+        amount, entry = position.amount, position.entry_price
+        new_amount = round(amount + signed, 10)
+
+        realized = 0.0
+        if amount != 0 and amount*signed < 0:
+            # Reducing (and possibly flipping): PnL on the closed part, entry kept unless flipped
+            closed = min(abs(signed), abs(amount))
+            realized = closed*(price - entry)*(1 if amount > 0 else -1)
+            entry = entry if abs(signed) < abs(amount) else (price if new_amount else 0.0)
+        else:
+            entry = (abs(amount)*entry + quantity*price) / abs(new_amount)
+
+        commission = quantity*price*self.taker_fee
+
+        self.wallet_balance += realized - commission
+        self.realized_pnl += realized
+        self.fees_paid += commission
+
+        position.amount = new_amount
+        position.entry_price = entry
+        position.update_time = time_ms
+
+        return realized, commission
+
+
+    def unrealized_pnl(self,
+                       symbol:str,
+                       mark_price:float):
+        position = self.positions.get(symbol)
+        if position is None or position.amount == 0:
+            return 0.0
+        return position.amount*(mark_price - position.entry_price)
+
+
+    def initial_margin(self,
+                       symbol:str,
+                       mark_price:float):
+        position = self.positions.get(symbol)
+        if position is None or position.amount == 0:
+            return 0.0
+        return abs(position.amount)*mark_price / position.leverage
+
+
+    def available_balance(self,
+                          marks:Dict[str, float]):
+        """
+        Wallet + unrealized PnL - initial margin over every open position, at the `marks` prices.
+        """
+        available = self.wallet_balance
+        for symbol, position in self.positions.items():
+            if position.amount != 0:
+                available += self.unrealized_pnl(symbol, marks[symbol]) - self.initial_margin(symbol, marks[symbol])
+        return available
+
+
+    def required_margin(self,
+                        symbol:str,
+                        side:str,
+                        quantity:float,
+                        price:float):
+        """
+        Additional initial margin an order needs: only the part that opens or grows a position, plus its fee.
+        """
+        position = self.position(symbol)
+        signed = quantity if side == "BUY" else -quantity
+
+        opening = quantity
+        if position.amount*signed < 0:
+            opening = max(0.0, quantity - abs(position.amount))
+
+        return opening*price / position.leverage + quantity*price*self.taker_fee
@@ -0,0 +1,629 @@
+import hashlib
+import hmac
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl
+
+from ..functions.api_handler import interval_ms
+from ..functions.rate_limiter import request_weight, ORDER_ENDPOINTS
+from .account import Account
+from .market import SymbolSpec, MarketModel
+from .order_book import OrderBook
+
+# Endpoints that require `timestamp` + `signature`
+SIGNED_ENDPOINTS = ["/fapi/v2/balance", "/fapi/v3/balance", "/fapi/v1/leverage",
+                    "/fapi/v2/positionRisk", "/fapi/v3/positionRisk", "/fapi/v1/order"]
+
+# Exchange limits served by exchangeInfo and enforced per window
+WEIGHT_LIMIT_1M = 2400
+ORDER_LIMIT_10S = 300
+ORDER_LIMIT_1M = 1200
+
+
+class ExchangeError(Exception):
+    """
+    Rejection of a request: HTTP status + Binance error code and message.
+    """
+    def __init__(self,
+                 status:int,
+                 code:int,
+                 msg:str):
+        super().__init__(f"{code}: {msg}")
+        self.status = status
+        self.code = code
+        self.msg = msg
+
+
+class Exchange:
+    """
+    Matching engine and REST semantics of the simulator, independent of the HTTP transport.
+
+    `handle` takes one request (method, path, raw query string, headers) and returns (status, body, headers),
+    including the X-MBX-USED-WEIGHT-1M / X-MBX-ORDER-COUNT-* headers and 429 rejections the real API sends.
+
+    Signed requests are checked against the server clock (`recvWindow`, default 5000 ms).
+    `clock_offset_ms` shifts the server clock to exercise clock-sync; the HMAC signature is only verified
+    when `api_secret` is given.
+
+    Order and account changes are passed to `user_event_handler(listen_key, event)` as user data stream
+    events (ORDER_TRADE_UPDATE, ACCOUNT_UPDATE) while a listenKey is open.
+    """
+    def __init__(self,
+                 specs:List[SymbolSpec],
+                 market:Optional[MarketModel]=None,
+                 account:Optional[Account]=None,
+                 book_params:Optional[dict]=None,
+                 clock_offset_ms:int=0,
+                 api_key:Optional[str]=None,
+                 api_secret:Optional[str]=None,
+                 enforce_limits:bool=True):
+        self.specs: Dict[str, SymbolSpec] = {spec.symbol: spec for spec in specs}
+        self.market = market or MarketModel(specs=specs)
+        self.account = account or Account()
+        self.book_params = book_params or {}
+        self.clock_offset_ms = clock_offset_ms
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.enforce_limits = enforce_limits
+
+        self.books: Dict[str, OrderBook] = {}
+        self.orders: Dict[int, dict] = {} # orderId -> order
+        self.client_orders: Dict[tuple, int] = {} # (symbol, clientOrderId) -> orderId
+
+        self.requests = Counter() # (method, endpoint) -> count
+        self.weight = 0 # Since the last `reset_stats`
+        self.fills = 0
+
+        self.listen_key: Optional[str] = None
+        self.user_event_handler = None # Callable(listen_key, event)
+
+        self._windows = {"weight": (0, 0), "orders_10s": (0, 0), "orders_1m": (0, 0)} # name -> (window start, used)
+        self._order_id = 0
+        self._trade_id = 0
+        self._n_listen_keys = 0
+        self._lock = threading.RLock()
+
+
+    def now_ms(self):
+        return int(time.time()*1000) + self.clock_offset_ms
+
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests.clear()
+            self.weight = 0
+            self.fills = 0
+
+
+    def stats(self):
+        """
+        (request count, request weight, fills) since the last `reset_stats`.
+        """
+        with self._lock:
+            return sum(self.requests.values()), self.weight, self.fills
+
+
+    # Transport entry point
+    def handle(self,
+               method:str,
+               endpoint:str,
+               query:str,
+               headers:dict):
+        params = dict(parse_qsl(query, keep_blank_values=True))
+        response_headers = {}
+
+        with self._lock:
+            now = self.now_ms()
+            self.requests[(method, endpoint)] += 1
+            self.weight += request_weight(endpoint, method, params)
+
+            try:
+                self._count_limits(method=method, endpoint=endpoint, params=params, now=now, response_headers=response_headers)
+
+                if endpoint in SIGNED_ENDPOINTS:
+                    self._authenticate(query=query, params=params, headers=headers, now=now)
+
+                body = self.route(method=method, endpoint=endpoint, params=params, now=now)
+                return 200, body, response_headers
+
+            except ExchangeError as e:
+                return e.status, {"code": e.code, "msg": e.msg}, response_headers
+
+
+    def _count_limits(self,
+                      method:str,
+                      endpoint:str,
+                      params:dict,
+                      now:int,
+                      response_headers:dict):
+        counted = [("weight", 60000, request_weight(endpoint, method, params), WEIGHT_LIMIT_1M, "X-MBX-USED-WEIGHT-1M")]
+        if endpoint in ORDER_ENDPOINTS and method == "POST":
+            counted += [("orders_10s", 10000, 1, ORDER_LIMIT_10S, "X-MBX-ORDER-COUNT-10S"),
+                        ("orders_1m", 60000, 1, ORDER_LIMIT_1M, "X-MBX-ORDER-COUNT-1M")]
+
+        exceeded = None
+        for name, length, cost, limit, header in counted:
+            # Fixed windows aligned on the clock, like Binance's counters
+            start, used = self._windows[name]
+            if now - start >= length:
+                start, used = now - now % length, 0
+
+            used += cost
+            self._windows[name] = (start, used)
+            response_headers[header] = str(used)
+
+            if self.enforce_limits and used > limit and exceeded is None:
+                exceeded = (name, start + length - now)
+
+        if exceeded is not None:
+            name, wait_ms = exceeded
+            response_headers["Retry-After"] = str(max(1, -(-wait_ms // 1000)))
+            if name == "weight":
+                raise ExchangeError(429, -1003, f"Too many requests; current limit of IP is {WEIGHT_LIMIT_1M} requests per minute.")
+            raise ExchangeError(429, -1015, "Too many new orders.")
+
+
+    def _authenticate(self,
+                      query:str,
+                      params:dict,
+                      headers:dict,
+                      now:int):
+        if self.api_key is not None and headers.get("X-MBX-APIKEY") != self.api_key:
+            raise ExchangeError(401, -2015, "Invalid API-key, IP, or permissions for action.")
+
+        if "timestamp" not in params:
+            raise ExchangeError(400, -1102, "Mandatory parameter 'timestamp' was not sent, was empty/null, or malformed.")
+
+        # Same acceptance rule as Binance: not more than 1 s ahead, not older than recvWindow
+        timestamp = int(params["timestamp"])
+        recv_window = int(params.get("recvWindow", 5000))
+        if timestamp >= now + 1000 or now - timestamp > recv_window:
+            raise ExchangeError(400, -1021, "Timestamp for this request is outside of the recvWindow.")
+
+        if self.api_secret is not None:
+            payload, _, signature = query.rpartition("&signature=")
+            expected = hmac.new(self.api_secret.encode("utf-8"), payload.encode("utf-8"), hashlib.sha256).hexdigest()
+            if not hmac.compare_digest(signature, expected):
+                raise ExchangeError(400, -1022, "Signature for this request is not valid.")
+
+
+    def route(self,
+              method:str,
+              endpoint:str,
+              params:dict,
+              now:int):
+        if endpoint == "/fapi/v1/ping":
+            return {}
+        if endpoint == "/fapi/v1/time":
+            return {"serverTime": now}
+        if endpoint == "/fapi/v1/exchangeInfo":
+            return self.exchange_info(now)
+        if endpoint == "/fapi/v1/klines":
+            spec = self._spec(params)
+            limit = int(params.get("limit", 500))
+            if not 1 <= limit <= 1500:
+                raise ExchangeError(400, -1130, "Data sent for paramter 'limit' is not valid.")
+            end_time = int(params.get("endTime", now))
+            if "startTime" in params:
+                start_time = int(params["startTime"])
+            else:
+                # Without startTime, Binance serves the `limit` latest klines up to endTime
+                step = interval_ms(every=int(params["interval"][:-1]), unit=params["interval"][-1])
+                start_time = end_time - end_time % step - (limit - 1)*step
+            return self.market.klines(symbol=spec.symbol,
+                                      interval=params["interval"],
+                                      start_time=start_time,
+                                      end_time=end_time,
+                                      limit=limit,
+                                      now_ms=now)
+        if endpoint == "/fapi/v1/ticker/price":
+            return self._per_symbol(params, lambda s: {"symbol": s, "price": f"{self.mark_price(s, now)}", "time": now})
+        if endpoint == "/fapi/v1/premiumIndex":
+            return self._per_symbol(params, lambda s: self.premium_index(s, now))
+        if endpoint in ["/fapi/v2/balance", "/fapi/v3/balance"]:
+            return self.balance(now)
+        if endpoint == "/fapi/v1/leverage" and method == "POST":
+            return self.set_leverage(params)
+        if endpoint in ["/fapi/v2/positionRisk", "/fapi/v3/positionRisk"]:
+            return self.position_risk(symbol=params.get("symbol"),
+                                      include_flat=endpoint == "/fapi/v2/positionRisk",
+                                      now=now)
+        if endpoint == "/fapi/v1/order" and method == "POST":
+            return self.new_order(params, now)
+        if endpoint == "/fapi/v1/order" and method == "GET":
+            return self.query_order(params)
+        if endpoint == "/fapi/v1/listenKey":
+            return self.listen_key_request(method)
+
+        raise ExchangeError(404, -5000, f"{method} {endpoint} is not simulated.")
+
+
+    # Market
+    def _spec(self,
+              params:dict):
+        symbol = params.get("symbol")
+        if symbol not in self.specs:
+            raise ExchangeError(400, -1121, "Invalid symbol.")
+        return self.specs[symbol]
+
+
+    def _per_symbol(self,
+                    params:dict,
+                    build):
+        if "symbol" in params:
+            return build(self._spec(params).symbol)
+        return [build(symbol) for symbol in self.specs]
+
+
+    def mark_price(self,
+                   symbol:str,
+                   now:int):
+        return self.market.price(symbol, now)
+
+
+    def premium_index(self,
+                      symbol:str,
+                      now:int):
+        mark = self.mark_price(symbol, now)
+        return {"symbol": symbol,
+                "markPrice": f"{mark}",
+                "indexPrice": f"{mark}",
+                "estimatedSettlePrice": f"{mark}",
+                "lastFundingRate": "0.00010000",
+                "interestRate": "0.00010000",
+                "nextFundingTime": now - now % 28800000 + 28800000,
+                "time": now}
+
+
+    def book(self,
+             symbol:str,
+             now:int):
+        """
+        Order book of `symbol`, re-centred on the current mark price.
+        """
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = OrderBook(tick_size=self.specs[symbol].tick_size, **self.book_params)
+        book.refresh(self.mark_price(symbol, now))
+        return book
+
+
+    def exchange_info(self,
+                      now:int):
+        return {
+            "timezone": "UTC",
+            "serverTime": now,
+            "rateLimits": [
+                {"rateLimitType": "REQUEST_WEIGHT", "interval": "MINUTE", "intervalNum": 1, "limit": WEIGHT_LIMIT_1M},
+                {"rateLimitType": "ORDERS", "interval": "SECOND", "intervalNum": 10, "limit": ORDER_LIMIT_10S},
+                {"rateLimitType": "ORDERS", "interval": "MINUTE", "intervalNum": 1, "limit": ORDER_LIMIT_1M},
+            ],
+            "assets": [{"asset": self.account.asset, "marginAvailable": True}],
+            "symbols": [
+                {"symbol": spec.symbol,
+                 "pair": spec.symbol,
+                 "contractType": "PERPETUAL",
+                 "status": "TRADING",
+                 "baseAsset": spec.symbol[:-len(self.account.asset)],
+                 "quoteAsset": self.account.asset,
+                 "marginAsset": self.account.asset,
+                 "pricePrecision": spec.price_precision,
+                 "quantityPrecision": spec.quantity_precision,
+                 "orderTypes": ["MARKET"],
+                 "filters": [{"filterType": "PRICE_FILTER", "tickSize": f"{spec.tick_size:.{spec.price_precision}f}",
+                              "minPrice": f"{spec.tick_size:.{spec.price_precision}f}", "maxPrice": "1000000"},
+                             {"filterType": "LOT_SIZE", "stepSize": self._qty(spec, spec.step_size),
+                              "minQty": self._qty(spec, spec.step_size), "maxQty": self._qty(spec, spec.max_qty)},
+                             {"filterType": "MARKET_LOT_SIZE", "stepSize": self._qty(spec, spec.step_size),
+                              "minQty": self._qty(spec, spec.step_size), "maxQty": self._qty(spec, spec.max_qty)},
+                             {"filterType": "MIN_NOTIONAL", "notional": f"{spec.min_notional:g}"}]}
+                for spec in self.specs.values()
+            ],
+        }
+
+
+    # Account
+    def _marks(self,
+               now:int):
+        return {symbol: self.mark_price(symbol, now) for symbol, position in self.account.positions.items() if position.amount != 0}
+
+
+    def balance(self,
+                now:int):
+        marks = self._marks(now)
+        unrealized = sum(self.account.unrealized_pnl(symbol, mark) for symbol, mark in marks.items())
+        available = self.account.available_balance(marks)
+        wallet = self.account.wallet_balance
+
+        return [{"accountAlias": "simulator",
+                 "asset": self.account.asset,
+                 "balance": f"{wallet:.8f}",
+                 "crossWalletBalance": f"{wallet:.8f}",
+                 "crossUnPnl": f"{unrealized:.8f}",
+                 "availableBalance": f"{available:.8f}",
+                 "maxWithdrawAmount": f"{max(0.0, min(wallet, available)):.8f}",
+                 "marginAvailable": True,
+                 "updateTime": now}]
+
+
+    def set_leverage(self,
+                     params:dict):
+        spec = self._spec(params)
+        leverage = int(params["leverage"])
+        if not 1 <= leverage <= 125:
+            raise ExchangeError(400, -4028, f"Leverage {leverage} is not valid")
+
+        self.account.set_leverage(spec.symbol, leverage)
+        return {"symbol": spec.symbol, "leverage": leverage, "maxNotionalValue": "1000000"}
+
+
+    def position_risk(self,
+                      symbol:Optional[str],
+                      include_flat:bool,
+                      now:int):
+        """
+        v3 lists open positions only; v2 also lists flat symbols.
+        """
+        if symbol is not None:
+            self._spec({"symbol": symbol})
+        symbols = [symbol] if symbol is not None else list(self.specs)
+
+        rows = []
+        for s in symbols:
+            position = self.account.positions.get(s)
+            if (position is None or position.amount == 0) and not include_flat:
+                continue
+
+            spec = self.specs[s]
+            mark = self.mark_price(s, now)
+            amount = position.amount if position is not None else 0.0
+            rows.append({"symbol": s,
+                         "positionSide": "BOTH",
+                         "positionAmt": self._qty(spec, amount),
+                         "entryPrice": f"{position.entry_price if position is not None else 0.0:.8f}",
+                         "breakEvenPrice": "0.0",
+                         "markPrice": f"{mark}",
+                         "unRealizedProfit": f"{self.account.unrealized_pnl(s, mark):.8f}",
+                         "notional": f"{amount*mark:.8f}",
+                         "initialMargin": f"{self.account.initial_margin(s, mark):.8f}",
+                         "leverage": str(position.leverage if position is not None else 20),
+                         "marginType": "cross",
+                         "updateTime": position.update_time if position is not None else 0})
+        return rows
+
+
+    # User data stream
+    def listen_key_request(self,
+                           method:str):
+        """
+        POST returns the open listenKey (a new one if none is open), PUT keeps it alive, DELETE closes it.
+        """
+        if method == "POST":
+            if self.listen_key is None:
+                self._n_listen_keys += 1
+                self.listen_key = f"simulator-listen-key-{self._n_listen_keys}"
+            return {"listenKey": self.listen_key}
+
+        if method == "PUT":
+            if self.listen_key is None:
+                raise ExchangeError(400, -1125, "This listenKey does not exist.")
+            return {"listenKey": self.listen_key}
+
+        self.listen_key = None
+        return {}
+
+
+    def expire_listen_key(self):
+        """
+        Expire the open listenKey, as if it had not been kept alive. Returns the expired key (None if none was open).
+        """
+        with self._lock:
+            listen_key, self.listen_key = self.listen_key, None
+            return listen_key
+
+
+    def _publish(self,
+                 event:dict):
+        if self.user_event_handler is not None and self.listen_key is not None:
+            self.user_event_handler(self.listen_key, event)
+
+
+    def _order_update(self,
+                      order:dict,
+                      spec:SymbolSpec,
+                      execution_type:str,
+                      status:str,
+                      executed:float,
+                      cum_quote:float,
+                      now:int,
+                      fill:Optional[tuple]=None):
+        """
+        ORDER_TRADE_UPDATE event of `order`. `fill` is the (price, quantity, commission, realized PnL) of a TRADE.
+        """
+        price, quantity, commission, realized = fill if fill is not None else (0.0, 0.0, 0.0, 0.0)
+        if fill is not None:
+            self._trade_id += 1
+
+        return {"e": "ORDER_TRADE_UPDATE",
+                "E": now,
+                "T": now,
+                "o": {"s": spec.symbol,
+                      "c": order["clientOrderId"],
+                      "S": order["side"],
+                      "o": "MARKET",
+                      "f": "GTC",
+                      "q": order["origQty"],
+                      "p": "0",
+                      "ap": f"{cum_quote / executed if executed else 0.0:.{spec.price_precision + 2}f}",
+                      "sp": "0",
+                      "x": execution_type,
+                      "X": status,
+                      "i": order["orderId"],
+                      "l": self._qty(spec, quantity),
+                      "z": self._qty(spec, executed),
+                      "L": f"{price}",
+                      "N": self.account.asset,
+                      "n": f"{commission:.8f}",
+                      "T": now,
+                      "t": self._trade_id if fill is not None else 0,
+                      "R": order["reduceOnly"],
+                      "ps": "BOTH",
+                      "rp": f"{realized:.8f}"}}
+
+
+    def _account_update(self,
+                        symbol:str,
+                        now:int):
+        position = self.account.position(symbol)
+        mark = self.mark_price(symbol, now)
+        wallet = self.account.wallet_balance
+
+        return {"e": "ACCOUNT_UPDATE",
+                "E": now,
+                "T": now,
+                "a": {"m": "ORDER",
+                      "B": [{"a": self.account.asset, "wb": f"{wallet:.8f}", "cw": f"{wallet:.8f}", "bc": "0"}],
+                      "P": [{"s": symbol,
+                             "pa": self._qty(self.specs[symbol], position.amount),
+                             "ep": f"{position.entry_price:.8f}",
+                             "bep": "0",
+                             "cr": f"{self.account.realized_pnl:.8f}",
+                             "up": f"{self.account.unrealized_pnl(symbol, mark):.8f}",
+                             "mt": "cross",
+                             "iw": "0",
+                             "ps": "BOTH"}]}}
+
+
+    # Orders
+    @staticmethod
+    def _qty(spec:SymbolSpec,
+             quantity:float):
+        return f"{quantity:.{spec.quantity_precision}f}"
+
+
+    def new_order(self,
+                  params:dict,
+                  now:int):
+        """
+        Validate and match a MARKET order against the book.
+
+        Rejections follow the exchange's filters: step size (-1111), minimum quantity (-4003/-1013),
+        minimum notional (-4164, unless reduce-only), duplicated client order id (-4116) and margin (-2019).
+        Liquidity missing from the book leaves the order EXPIRED with a partial fill.
+        """
+        spec = self._spec(params)
+        side = params.get("side")
+        if side not in ["BUY", "SELL"]:
+            raise ExchangeError(400, -1117, "Invalid side.")
+        if params.get("type") != "MARKET":
+            raise ExchangeError(400, -1116, "Invalid orderType.")
+
+        quantity = float(params.get("quantity", 0))
+        if quantity <= 0:
+            raise ExchangeError(400, -4003, "Quantity less than or equal to zero.")
+
+        steps = quantity / spec.step_size
+        if abs(steps - round(steps)) > 1e-6:
+            raise ExchangeError(400, -1111, "Precision is over the maximum defined for this asset.")
+        quantity = round(round(steps)*spec.step_size, spec.quantity_precision)
+
+        if quantity < spec.step_size:
+            raise ExchangeError(400, -1013, "Filter failure: MARKET_LOT_SIZE")
+        if quantity > spec.max_qty:
+            raise ExchangeError(400, -4005, "Quantity greater than max quantity.")
+
+        client_order_id = params.get("newClientOrderId") or f"sim-{self._order_id + 1}"
+        if (spec.symbol, client_order_id) in self.client_orders:
+            raise ExchangeError(400, -4116, "ClientOrderId is duplicated.")
+
+        position = self.account.position(spec.symbol)
+        reduce_only = params.get("reduceOnly", "false").lower() == "true"
+        if reduce_only:
+            signed = quantity if side == "BUY" else -quantity
+            if position.amount*signed >= 0:
+                raise ExchangeError(400, -2022, "ReduceOnly Order is rejected.")
+            quantity = min(quantity, abs(position.amount))
+
+        book = self.book(spec.symbol, now)
+        reference = book.best(side) or self.mark_price(spec.symbol, now)
+
+        if not reduce_only and quantity*reference < spec.min_notional:
+            raise ExchangeError(400, -4164, f"Order's notional must be no smaller than {spec.min_notional:g} (unless you choose reduce only).")
+
+        required = self.account.required_margin(spec.symbol, side, quantity, reference)
+        if required > self.account.available_balance(self._marks(now)) + 1e-9:
+            raise ExchangeError(400, -2019, "Margin is insufficient.")
+
+        self._order_id += 1
+        order = {"orderId": self._order_id,
+                 "symbol": spec.symbol,
+                 "status": "NEW",
+                 "clientOrderId": client_order_id,
+                 "price": "0",
+                 "avgPrice": "0.00",
+                 "origQty": self._qty(spec, quantity),
+                 "executedQty": self._qty(spec, 0),
+                 "cumQty": self._qty(spec, 0),
+                 "cumQuote": "0",
+                 "timeInForce": "GTC",
+                 "type": "MARKET",
+                 "origType": "MARKET",
+                 "reduceOnly": reduce_only,
+                 "closePosition": False,
+                 "side": side,
+                 "positionSide": "BOTH",
+                 "stopPrice": "0",
+                 "workingType": "CONTRACT_PRICE",
+                 "priceProtect": False,
+                 "time": now,
+                 "updateTime": now}
+        self._publish(self._order_update(order, spec, "NEW", "NEW", 0.0, 0.0, now))
+
+        # Match, then book every level filled as one fill
+        fills, remaining = book.match_market(side=side, quantity=quantity)
+        executed = 0.0
+        cum_quote = 0.0
+        for i, (price, filled) in enumerate(fills):
+            realized, commission = self.account.apply_fill(symbol=spec.symbol, side=side, quantity=filled, price=price, time_ms=now)
+            executed += filled
+            cum_quote += price*filled
+
+            status = "FILLED" if i == len(fills) - 1 and remaining <= 1e-12 else "PARTIALLY_FILLED"
+            self._publish(self._order_update(order, spec, "TRADE", status, executed, cum_quote, now,
+                                             fill=(price, filled, commission, realized)))
+        self.fills += len(fills)
+
+        executed = quantity - remaining
+        order.update({"status": "FILLED" if remaining <= 1e-12 else "EXPIRED", # Market orders never rest: the unfilled part expires
+                      "avgPrice": f"{cum_quote / executed if executed else 0.0:.{spec.price_precision + 2}f}",
+                      "executedQty": self._qty(spec, executed),
+                      "cumQty": self._qty(spec, executed),
+                      "cumQuote": f"{cum_quote:.8f}"})
+
+        if order["status"] == "EXPIRED":
+            self._publish(self._order_update(order, spec, "EXPIRED", "EXPIRED", executed, cum_quote, now))
+        if fills:
+            self._publish(self._account_update(spec.symbol, now))
+
+        self.orders[order["orderId"]] = order
+        self.client_orders[(spec.symbol, client_order_id)] = order["orderId"]
+
+        if params.get("newOrderRespType", "ACK") == "ACK":
+            return {**order, "status": "NEW", "avgPrice": "0.00", "executedQty": self._qty(spec, 0), "cumQty": self._qty(spec, 0), "cumQuote": "0"}
+        return order
+
+
+    def query_order(self,
+                    params:dict):
+        spec = self._spec(params)
+
+        order_id = params.get("orderId")
+        if order_id is None and "origClientOrderId" in params:
+            order_id = self.client_orders.get((spec.symbol, params["origClientOrderId"]))
+
+        order = self.orders.get(int(order_id)) if order_id is not None else None
+        if order is None or order["symbol"] != spec.symbol:
+            raise ExchangeError(400, -2013, "Order does not exist.")
+        return order
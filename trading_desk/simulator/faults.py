@@ -0,0 +1,85 @@
+import random
+import threading
+from typing import Optional
+
+from ..functions.rate_limiter import ORDER_ENDPOINTS
+
+# Injected error -> (HTTP status, body)
+INJECTED_ERRORS = {
+    "-1007": (503, {"code": -1007, "msg": "Timeout waiting for response from backend server. Send status unknown; execution status unknown."}),
+    "-1021": (400, {"code": -1021, "msg": "Timestamp for this request is outside of the recvWindow."}),
+    "503": (503, {"code": -1001, "msg": "Internal error; unable to process your request. Please try again."}),
+}
+
+
+class FaultInjector:
+    """
+    Latency and error injection of the simulator.
+
+    - Every request sleeps `latency` ± `jitter` seconds (uniform) before it is handled.
+    - "-1007" (orders only): the order reaches the matching engine with probability `timeout_execution_rate`,
+      but the client gets the timeout, so the execution status is unknown to it.
+    - "-1021" (signed requests only): the request is rejected as if the timestamp were outside the recvWindow.
+    - "503": any request is rejected before reaching the engine.
+
+    Rates are per-request probabilities. Pass `seed` for a reproducible fault sequence.
+    """
+    def __init__(self,
+                 latency:float=0.0,
+                 jitter:float=0.0,
+                 error_rates:Optional[dict]=None,
+                 timeout_execution_rate:float=0.5,
+                 seed:Optional[int]=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rates = {code: rate for code, rate in (error_rates or {}).items() if rate}
+        self.timeout_execution_rate = timeout_execution_rate
+
+        unknown = set(self.error_rates) - set(INJECTED_ERRORS)
+        if unknown:
+            raise ValueError(f"Unknown injected errors {sorted(unknown)}. Supported: {list(INJECTED_ERRORS)}.")
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+
+    def delay(self):
+        """
+        Seconds to sleep before handling the next request.
+        """
+        if not self.jitter:
+            return self.latency
+
+        with self._lock:
+            return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+
+    def pick(self,
+             endpoint:str,
+             method:str,
+             signed:bool):
+        """
+        Error to inject into this request ("-1007", "-1021", "503"), or None.
+        """
+        if not self.error_rates:
+            return None
+
+        is_order = endpoint in ORDER_ENDPOINTS and method == "POST"
+
+        with self._lock:
+            for code, rate in self.error_rates.items():
+                if code == "-1007" and not is_order:
+                    continue
+                if code == "-1021" and not signed:
+                    continue
+                if self._random.random() < rate:
+                    return code
+        return None
+
+
+    def executes_on_timeout(self):
+        """
+        Whether an order answered with -1007 is executed anyway.
+        """
+        with self._lock:
+            return self._random.random() < self.timeout_execution_rate
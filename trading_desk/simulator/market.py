@@ -0,0 +1,112 @@
+import math
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List
+
+from ..functions.api_handler import interval_ms
+
+
+@dataclass
+class SymbolSpec:
+    """
+    Trading rules of one simulated perpetual contract (served by '/fapi/v1/exchangeInfo').
+    """
+    symbol: str
+    base_price: float
+    tick_size: float
+    step_size: float
+    min_notional: float = 5.0
+    max_qty: float = 1e7
+
+    @property
+    def price_precision(self):
+        return max(0, -math.floor(math.log10(self.tick_size) + 1e-9))
+
+    @property
+    def quantity_precision(self):
+        return max(0, -math.floor(math.log10(self.step_size) + 1e-9))
+
+
+def default_specs(symbols:List[str]):
+    """
+    Deterministic specs for arbitrary symbol names: a base price between 0.01 and ~50000 from the
+    symbol hash, and Binance-like precisions (expensive contracts trade in finer quantity steps).
+    """
+    specs = []
+    for symbol in symbols:
+        k = zlib.crc32(symbol.encode())
+        base_price = 10**(k % 7 - 2) * (1 + (k >> 8) % 400 / 100)
+        magnitude = math.floor(math.log10(base_price))
+
+        specs.append(SymbolSpec(symbol=symbol,
+                                base_price=round(base_price, 6),
+                                tick_size=10.0**min(-1, magnitude - 4),
+                                step_size=10.0**-min(3, max(0, magnitude))))
+    return specs
+
+
+class MarketModel:
+    """
+    Deterministic mark price of every symbol as a function of time (second granularity),
+    so klines can be served for any window and the order book mid moves between requests.
+
+    log(price) = log(base) + slow and fast waves with per-symbol phases + per-second noise.
+    `volatility` scales every term (0.01 ~ a few percent intraday range).
+    """
+    def __init__(self,
+                 specs:List[SymbolSpec],
+                 volatility:float=0.01,
+                 seed:int=0):
+        self.specs: Dict[str, SymbolSpec] = {spec.symbol: spec for spec in specs}
+        self.volatility = volatility
+        self.seed = seed
+
+        self._phases = {spec.symbol: [zlib.crc32(f"{seed}:{spec.symbol}:{i}".encode()) % 6283 / 1000 for i in range(3)]
+                        for spec in specs}
+
+
+    def price(self,
+              symbol:str,
+              time_ms:int):
+        second = time_ms // 1000
+        spec = self.specs[symbol]
+        p0, p1, p2 = self._phases[symbol]
+
+        noise = zlib.crc32(f"{self.seed}:{symbol}:{second}".encode()) / 2**32 - 0.5
+        log_move = self.volatility*(2.0*math.sin(second/8640 + p0) # ~15 h cycle
+                                    + 0.5*math.sin(second/523 + p1) # ~1 h cycle
+                                    + 0.1*math.sin(second/31 + p2) # ~3 min cycle
+                                    + 0.02*noise)
+
+        price = spec.base_price*math.exp(log_move)
+        return round(round(price / spec.tick_size)*spec.tick_size, spec.price_precision)
+
+
+    def klines(self,
+               symbol:str,
+               interval:str,
+               start_time:int,
+               end_time:int,
+               limit:int,
+               now_ms:int):
+        """
+        '/fapi/v1/klines' rows opened in [start_time, end_time], up to the (incomplete) kline open at `now_ms`.
+        OHLC are sampled from the price path every 1/4 of the interval.
+        """
+        step = interval_ms(every=int(interval[:-1]), unit=interval[-1])
+        first = -(-start_time // step)*step
+        last = min(end_time, now_ms)
+
+        rows = []
+        open_time = first
+        while open_time <= last and len(rows) < limit:
+            close_time = open_time + step - 1
+            samples = [self.price(symbol, min(open_time + i*step // 4, close_time, now_ms)) for i in range(5)]
+            o, c = samples[0], samples[-1]
+            volume = 1000.0*(1 + abs(c - o) / o*100)
+
+            rows.append([open_time, f"{o}", f"{max(samples)}", f"{min(samples)}", f"{c}", f"{volume:.3f}",
+                         close_time, f"{volume*c:.4f}", 100, f"{volume/2:.3f}", f"{volume*c/2:.4f}", "0"])
+            open_time += step
+
+        return rows
@@ -0,0 +1,71 @@
+import threading
+from typing import Dict, Optional
+from urllib.parse import parse_qs
+
+from .user_stream import StreamConnection
+
+# Stream name suffix -> update interval of Binance (seconds)
+MARK_PRICE_STREAMS = {"@markPrice@1s": 1.0,
+                      "@markPrice": 3.0}
+
+
+def parse_mark_price_streams(query:str,
+                             symbols):
+    """
+    {stream name: symbol} of a combined stream query ('streams=btcusdt@markPrice@1s/...'),
+    or None if it names a stream other than the mark price of a listed symbol.
+    """
+    names = parse_qs(query).get("streams", [""])[0].split("/")
+
+    streams = {}
+    for name in names:
+        symbol, _, suffix = name.partition("@")
+        if "@" + suffix not in MARK_PRICE_STREAMS or symbol.upper() not in symbols:
+            return None
+        streams[name] = symbol.upper()
+
+    return streams
+
+
+class MarkPriceConnection(StreamConnection):
+    """
+    One combined mark price stream client: 'markPriceUpdate' of each of its symbols every `interval` seconds,
+    wrapped as {"stream": name, "data": event} like Binance's '/stream' endpoint.
+    The first updates are sent on connect, so clients get a price without waiting a full interval.
+    """
+    def __init__(self,
+                 exchange,
+                 streams:Dict[str, str],
+                 rfile,
+                 wfile,
+                 interval:Optional[float]=None):
+        super().__init__(rfile=rfile, wfile=wfile)
+        self.exchange = exchange
+        self.streams = streams
+        self.interval = interval
+
+
+    def _publish(self):
+        # Streams of one connection share the shortest interval requested
+        interval = self.interval or min(MARK_PRICE_STREAMS["@" + name.partition("@")[2]] for name in self.streams)
+
+        while not self.closed.is_set():
+            now = self.exchange.now_ms()
+            for name, symbol in self.streams.items():
+                index = self.exchange.premium_index(symbol, now)
+                self.send({"stream": name,
+                           "data": {"e": "markPriceUpdate",
+                                    "E": now,
+                                    "s": symbol,
+                                    "p": index["markPrice"],
+                                    "i": index["indexPrice"],
+                                    "P": index["estimatedSettlePrice"],
+                                    "r": index["lastFundingRate"],
+                                    "T": index["nextFundingTime"]}})
+
+            self.closed.wait(interval)
+
+
+    def serve(self):
+        threading.Thread(target=self._publish, name="mark-price-publisher", daemon=True).start()
+        super().serve()
@@ -0,0 +1,92 @@
+import math
+from typing import List, Tuple
+
+
+class OrderBook:
+    """
+    Synthetic L2 book of one symbol, rebuilt around the market model's mid price.
+
+    - `levels` price levels per side, `level_spacing` apart (relative), the best quotes
+      `spread_ticks` ticks apart.
+    - Level i holds `level_notional*(1 + depth_growth*i)` of quote value, so large orders walk the book
+      and pay slippage.
+    - Liquidity taken by market orders is only replenished when the mid moves (`refresh`).
+    """
+    def __init__(self,
+                 tick_size:float,
+                 levels:int=20,
+                 level_spacing:float=0.0002,
+                 spread_ticks:int=1,
+                 level_notional:float=50000.0,
+                 depth_growth:float=0.5):
+        self.tick_size = tick_size
+        self.levels = levels
+        self.level_spacing = level_spacing
+        self.spread_ticks = spread_ticks
+        self.level_notional = level_notional
+        self.depth_growth = depth_growth
+
+        self.mid = None
+        self.bids: List[List[float]] = [] # [price, quantity], best first
+        self.asks: List[List[float]] = []
+
+
+    def refresh(self,
+                mid:float):
+        """
+        Rebuild both sides around `mid`. No-op if the mid did not move.
+        """
+        if mid == self.mid:
+            return
+        self.mid = mid
+
+        tick = self.tick_size
+        best_bid = math.floor((mid - self.spread_ticks*tick/2) / tick + 1e-9)*tick
+        best_ask = best_bid + self.spread_ticks*tick
+
+        self.bids, self.asks = [], []
+        for i in range(self.levels):
+            offset = max(i*tick, round(mid*self.level_spacing*i / tick)*tick)
+            quantity = self.level_notional*(1 + self.depth_growth*i) / mid
+
+            if best_bid - offset > 0:
+                self.bids.append([best_bid - offset, quantity])
+            self.asks.append([best_ask + offset, quantity])
+
+
+    def best(self,
+             side:str):
+        """
+        Best quote a market order of `side` would hit (best ask for a BUY), or None if that side is empty.
+        """
+        book = self.asks if side == "BUY" else self.bids
+        return book[0][0] if book else None
+
+
+    def match_market(self,
+                     side:str,
+                     quantity:float) -> Tuple[List[Tuple[float, float]], float]:
+        """
+        Fill a market order against the opposite side, best level first.
+
+        Returns
+        ---
+        - fills: [(price, quantity), ...]
+        - remaining: quantity left unfilled because the side ran out of liquidity
+        """
+        book = self.asks if side == "BUY" else self.bids
+
+        fills = []
+        remaining = quantity
+        while remaining > 1e-12 and book:
+            price, available = book[0]
+            take = min(available, remaining)
+            fills.append((price, take))
+
+            remaining -= take
+            if take >= available - 1e-12:
+                book.pop(0)
+            else:
+                book[0][1] = available - take
+
+        return fills, max(remaining, 0.0)
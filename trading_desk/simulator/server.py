@@ -0,0 +1,247 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+from .account import Account
+from .exchange import Exchange, SIGNED_ENDPOINTS
+from .faults import FaultInjector, INJECTED_ERRORS
+from .market import SymbolSpec, MarketModel, default_specs
+from .market_stream import MarkPriceConnection, parse_mark_price_streams
+from .user_stream import UserStreamConnection, UserStreamHub, websocket_accept
+
+
+class ExchangeSimulator:
+    """
+    Local Binance USDⓈ-M futures REST API: an `Exchange` (market model, order books, account) served over
+    HTTP/1.1 keep-alive, with the latency and errors of a `FaultInjector` in front of it.
+
+    Point the desk at it with `rest_base_url=simulator.base_url` and `ws_base_url=simulator.ws_base_url`.
+    The user data stream is served at `/ws/{listenKey}` (ORDER_TRADE_UPDATE, ACCOUNT_UPDATE, and
+    listenKeyExpired through `expire_listen_key`). Mark price streams are served at
+    `/stream?streams=<symbol>@markPrice@1s/...`, every `mark_price_interval` seconds (default: the stream's
+    own 1 s / 3 s); other market streams are refused.
+
+    Example
+    ---
+    simulator = ExchangeSimulator(symbols=["BTCUSDT", "ETHUSDT"],
+                                  faults=FaultInjector(latency=0.02, error_rates={"-1007": 0.01})).start()
+    ...
+    simulator.stop()
+    """
+    def __init__(self,
+                 symbols:Optional[List[str]]=None,
+                 specs:Optional[List[SymbolSpec]]=None,
+                 balance:float=10000.0,
+                 taker_fee:float=0.0005,
+                 volatility:float=0.01,
+                 book_params:Optional[dict]=None,
+                 faults:Optional[FaultInjector]=None,
+                 clock_offset_ms:int=0,
+                 api_key:Optional[str]=None,
+                 api_secret:Optional[str]=None,
+                 enforce_limits:bool=True,
+                 mark_price_interval:Optional[float]=None,
+                 seed:int=0,
+                 host:str="127.0.0.1",
+                 port:int=0):
+        if specs is None:
+            if not symbols:
+                raise ValueError("Give either `symbols` or `specs`.")
+            specs = default_specs(symbols)
+
+        self.exchange = Exchange(specs=specs,
+                                 market=MarketModel(specs=specs, volatility=volatility, seed=seed),
+                                 account=Account(balance=balance, taker_fee=taker_fee),
+                                 book_params=book_params,
+                                 clock_offset_ms=clock_offset_ms,
+                                 api_key=api_key,
+                                 api_secret=api_secret,
+                                 enforce_limits=enforce_limits)
+        self.faults = faults or FaultInjector()
+        self.mark_price_interval = mark_price_interval
+
+        self.injected = {code: 0 for code in INJECTED_ERRORS} # Injected error -> count
+        self._injected_lock = threading.Lock() # Requests are handled on concurrent threads
+
+        self.user_streams = UserStreamHub()
+        self.exchange.user_event_handler = self.user_streams.publish
+
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+
+    @property
+    def ws_base_url(self):
+        host, port = self._server.server_address
+        return f"ws://{host}:{port}"
+
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="exchange-simulator", daemon=True)
+        self._thread.start()
+        return self
+
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+
+    def reset_stats(self):
+        self.exchange.reset_stats()
+
+
+    def expire_listen_key(self):
+        """
+        Expire the open listenKey: its streams get 'listenKeyExpired' and are closed.
+        """
+        listen_key = self.exchange.expire_listen_key()
+        if listen_key is not None:
+            self.user_streams.expire(listen_key, event_time=self.exchange.now_ms())
+        return listen_key
+
+
+    def stats(self):
+        """
+        (request count, request weight) since the last `reset_stats`.
+        """
+        requests, weight, _ = self.exchange.stats()
+        return requests, weight
+
+
+    def respond(self,
+                method:str,
+                endpoint:str,
+                query:str,
+                headers:dict):
+        """
+        One request through the fault injector and the exchange. Returns (status, body, headers).
+        """
+        delay = self.faults.delay()
+        if delay:
+            time.sleep(delay)
+
+        error = self.faults.pick(endpoint=endpoint,
+                                 method=method,
+                                 signed=endpoint in SIGNED_ENDPOINTS)
+        if error is None:
+            return self.exchange.handle(method=method, endpoint=endpoint, query=query, headers=headers)
+
+        with self._injected_lock:
+            self.injected[error] += 1
+
+        # -1007: the order may still reach the engine; its outcome is discarded
+        if error == "-1007" and self.faults.executes_on_timeout():
+            self.exchange.handle(method=method, endpoint=endpoint, query=query, headers=headers)
+
+        status, body = INJECTED_ERRORS[error]
+        return status, body, {}
+
+
+    def _handler(self):
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # Keep-alive, like the real API
+
+            def _serve(self):
+                if self.headers.get("Upgrade"):
+                    self._stream()
+                    return
+
+                # Signed POST/PUT/DELETE parameters may come in the body
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length).decode("utf-8") if length else ""
+
+                url = urlsplit(self.path)
+                query = "&".join(part for part in [url.query, body] if part)
+
+                status, response, headers = simulator.respond(method=self.command,
+                                                              endpoint=url.path,
+                                                              query=query,
+                                                              headers=dict(self.headers))
+                self._send(status, response, headers)
+
+            def _stream(self):
+                url = urlsplit(self.path)
+                if url.path == "/stream":
+                    self._mark_price_stream(url.query)
+                    return
+
+                listen_key = url.path[len("/ws/"):] if url.path.startswith("/ws/") else None
+
+                if listen_key is None or listen_key != simulator.exchange.listen_key:
+                    self._send(400, {"code": -1, "msg": "Only the user data stream of the open listenKey and mark price streams are simulated."}, {})
+                    return
+
+                # Registered before the handshake: events published meanwhile are queued, not lost
+                connection = UserStreamConnection(listen_key=listen_key, rfile=self.rfile, wfile=self.wfile)
+                simulator.user_streams.add(connection)
+
+                self._accept()
+                try:
+                    connection.serve()
+                finally:
+                    simulator.user_streams.remove(connection)
+                    self.close_connection = True
+
+            def _mark_price_stream(self,
+                                   query:str):
+                streams = parse_mark_price_streams(query, simulator.exchange.specs)
+                if not streams:
+                    self._send(400, {"code": -1, "msg": "Only '<symbol>@markPrice[@1s]' streams of listed symbols are simulated."}, {})
+                    return
+
+                connection = MarkPriceConnection(exchange=simulator.exchange,
+                                                 streams=streams,
+                                                 rfile=self.rfile,
+                                                 wfile=self.wfile,
+                                                 interval=simulator.mark_price_interval)
+
+                self._accept()
+                try:
+                    connection.serve()
+                finally:
+                    self.close_connection = True
+
+            def _accept(self):
+                self.send_response(101)
+                self.send_header("Upgrade", "websocket")
+                self.send_header("Connection", "Upgrade")
+                self.send_header("Sec-WebSocket-Accept", websocket_accept(self.headers.get("Sec-WebSocket-Key", "")))
+                self.end_headers()
+                self.wfile.flush()
+
+            def _send(self,
+                      status:int,
+                      body,
+                      headers:dict):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _serve
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
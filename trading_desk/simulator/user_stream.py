@@ -0,0 +1,185 @@
+import base64
+import hashlib
+import json
+import queue
+import struct
+import threading
+from typing import Dict, List
+
+# RFC 6455 handshake GUID
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+# Opcodes
+OP_TEXT = 0x1
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+
+def websocket_accept(key:str):
+    """
+    Sec-WebSocket-Accept value for the client's Sec-WebSocket-Key.
+    """
+    return base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode("utf-8")).digest()).decode("ascii")
+
+
+def encode_frame(payload:bytes,
+                 opcode:int=OP_TEXT):
+    """
+    One final, unmasked (server-to-client) frame.
+    """
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 2**16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+
+def read_frame(rfile):
+    """
+    (opcode, payload) of the next client frame (masked, as RFC 6455 requires), or None once the socket is closed.
+    """
+    header = rfile.read(2)
+    if len(header) < 2:
+        return None
+
+    opcode = header[0] & 0x0F
+    masked = header[1] & 0x80
+    length = header[1] & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", rfile.read(2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", rfile.read(8))[0]
+
+    mask = rfile.read(4) if masked else b"\x00"*4
+    payload = rfile.read(length)
+    return opcode, bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+
+class StreamConnection:
+    """
+    One WebSocket stream client. Frames are queued by publishers and written by the connection's own thread,
+    so a slow client never blocks the matching engine.
+    """
+    def __init__(self,
+                 rfile,
+                 wfile):
+        self.rfile = rfile
+        self.wfile = wfile
+
+        self._frames = queue.Queue()
+        self._closed = threading.Event()
+
+
+    @property
+    def closed(self):
+        """
+        Event set once the connection has stopped writing frames.
+        """
+        return self._closed
+
+
+    def send(self,
+             event:dict):
+        self._frames.put(encode_frame(json.dumps(event).encode("utf-8")))
+
+
+    def close(self):
+        self._frames.put(encode_frame(b"", opcode=OP_CLOSE))
+
+
+    def _read(self):
+        # Answer pings and close frames until the client goes away
+        while not self._closed.is_set():
+            try:
+                frame = read_frame(self.rfile)
+            except (OSError, ValueError, struct.error):
+                frame = None
+
+            if frame is None or frame[0] == OP_CLOSE:
+                self.close()
+                return
+            if frame[0] == OP_PING:
+                self._frames.put(encode_frame(frame[1], opcode=OP_PONG))
+
+
+    def serve(self):
+        """
+        Write queued frames until a close frame is sent. Runs on the HTTP handler thread of the connection.
+        """
+        threading.Thread(target=self._read, name="stream-reader", daemon=True).start()
+
+        while True:
+            frame = self._frames.get()
+            try:
+                self.wfile.write(frame)
+                self.wfile.flush()
+            except OSError:
+                break
+
+            if frame[0] & 0x0F == OP_CLOSE:
+                break
+
+        self._closed.set()
+
+
+class UserStreamConnection(StreamConnection):
+    """
+    One user data stream client, on the connection of its listenKey.
+    """
+    def __init__(self,
+                 listen_key:str,
+                 rfile,
+                 wfile):
+        super().__init__(rfile=rfile, wfile=wfile)
+        self.listen_key = listen_key
+
+
+class UserStreamHub:
+    """
+    Connections of the simulator's user data streams, by listenKey.
+
+    `publish` fans an event out to every connection of the key. `expire` sends 'listenKeyExpired'
+    and closes them, as Binance does when a key is not kept alive.
+    """
+    def __init__(self):
+        self.connections: Dict[str, List[UserStreamConnection]] = {}
+        self._lock = threading.Lock()
+
+
+    def add(self,
+            connection:UserStreamConnection):
+        with self._lock:
+            self.connections.setdefault(connection.listen_key, []).append(connection)
+
+
+    def remove(self,
+               connection:UserStreamConnection):
+        with self._lock:
+            connections = self.connections.get(connection.listen_key, [])
+            if connection in connections:
+                connections.remove(connection)
+
+
+    def publish(self,
+                listen_key:str,
+                event:dict):
+        with self._lock:
+            connections = list(self.connections.get(listen_key, []))
+
+        for connection in connections:
+            connection.send(event)
+
+
+    def expire(self,
+               listen_key:str,
+               event_time:int):
+        with self._lock:
+            connections = self.connections.pop(listen_key, [])
+
+        for connection in connections:
+            connection.send({"e": "listenKeyExpired", "E": event_time, "listenKey": listen_key})
+            connection.close()
@@ -0,0 +1,50 @@
+import json
+import os
+from dataclasses import asdict
+
+from .data_models import DeskState
+from .strategy.position_model import Position
+
+
+class StateStore:
+    """
+    Crash-safe snapshot file of a `DeskState`.
+
+    Each `save` writes the full state to a temporary file, fsyncs it and renames it over the previous
+    snapshot with `os.replace`, so a crash leaves either the old or the new snapshot, never a partial one.
+    """
+    def __init__(self,
+                 path:str):
+        self.path = path
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+
+    def save(self,
+             state:DeskState):
+        tmp_path = self.path + ".tmp"
+
+        with open(tmp_path, "w") as f:
+            json.dump(asdict(state), f)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, self.path)
+
+
+    def load(self):
+        """
+        Return the saved DeskState, or None if there is no (readable) snapshot.
+        """
+        if not os.path.exists(self.path):
+            return None
+
+        try:
+            with open(self.path) as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        raw["positions"] = [Position(**p) for p in raw.get("positions", [])]
+        return DeskState(**raw)
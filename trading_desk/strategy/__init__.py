@@ -1,4 +1,15 @@
 from .calc_positions import PositionCalculator
 from .position_model import Position
+from .exit_engine import ExitEngine, ExitTrigger
+from .registry import Strategy, STRATEGY_REGISTRY, register_strategy, get_strategy, select_long_short
+from . import strat_momentum # Registers momentum1 ~ momentum4
 
-__all__ = ["PositionCalculator"]
+__all__ = ["PositionCalculator",
+           "ExitEngine",
+           "ExitTrigger",
+           "Strategy",
+           "STRATEGY_REGISTRY",
+           "register_strategy",
+           "get_strategy",
+           "select_long_short",
+           "strat_momentum"]
@@ -1,190 +1,58 @@
+from typing import List
+
+import numpy as np
 import pandas as pd
+from ..data_models import PriceWindow
 from .position_model import Position
-from .strat_momentum import strat_momentum1, strat_momentum2, strat_momentum3, strat_momentum4
+from .registry import STRATEGY_REGISTRY, get_strategy, select_long_short
 
 class PositionCalculator:
     def __init__(self, strategy_name):
-        self.supported_strategy_list = ["momentum1", "momentum2", "momentum3", "momentum4"]
-
-        if strategy_name not in self.supported_strategy_list:
-            raise Exception("Strategy name is not valid")
+        self.supported_strategy_list = list(STRATEGY_REGISTRY)
 
+        self.strategy = get_strategy(strategy_name)
         self.strategy_name = strategy_name
 
+        # Number of closed klines the strategy consumes
+        self.lookback = self.strategy.lookback
+
 
     def get_positions(self, 
                       data,
                       n_asset_buy,
                       n_asset_sell):
-        if not isinstance(data, pd.DataFrame):
+        if isinstance(data, PriceWindow):
+            close = data.close
+            symbols = data.symbols
+        elif isinstance(data, pd.DataFrame):
+            close = data.to_numpy(dtype=np.float64)
+            symbols = list(data.columns)
+        else:
             raise TypeError(
-                f"Expected pd.DataFrame, got {type(data).__name__}"
+                f"Expected PriceWindow or pd.DataFrame, got {type(data).__name__}"
             )
-        
-        if self.strategy_name == "momentum1":
-            if len(data) != 13:
-                err = ValueError(
-                    f"DataFrame must have exactly 13 rows, got {len(data)}"
-                )
-                err.wrong_dataframe = data
-
-                raise err
-
-            symbols_long, symbols_short = strat_momentum1(data=data,
-                                                          n_asset_buy=n_asset_buy,
-                                                          n_asset_sell=n_asset_sell)
-
-            positions: List[Position] = []
-
-            for symbol_top in symbols_long:
-                pos = Position(
-                                symbol=symbol_top,
-                                position=1,
-                                fetched_price=None,
-                                entry_price=None,
-                                quantity=None,
-                                amount=None
-                            )
-                positions.append(pos)
-            
-            for symbol_bottom in symbols_short:
-                pos = Position(
-                                symbol=symbol_bottom,
-                                position=-1,
-                                fetched_price=None,
-                                entry_price=None,
-                                quantity=None,
-                                amount=None
-                            )
-                positions.append(pos)
-
-            return positions
-
-
-        """
-        momentum2: Sign constraint is applied to signal computation.
-        """
-        if self.strategy_name == "momentum2":
-            if len(data) != 13:
-                err = ValueError(
-                    f"DataFrame must have exactly 13 rows, got {len(data)}"
-                )
-                err.wrong_dataframe = data
-
-                raise err
-
-            symbols_long, symbols_short = strat_momentum2(data=data,
-                                                          n_asset_buy=n_asset_buy,
-                                                          n_asset_sell=n_asset_sell)
-
-            positions: List[Position] = []
-
-            for symbol_top in symbols_long:
-                pos = Position(
-                                symbol=symbol_top,
-                                position=1,
-                                fetched_price=None,
-                                entry_price=None,
-                                quantity=None,
-                                amount=None
-                            )
-                positions.append(pos)
-            
-            for symbol_bottom in symbols_short:
-                pos = Position(
-                                symbol=symbol_bottom,
-                                position=-1,
-                                fetched_price=None,
-                                entry_price=None,
-                                quantity=None,
-                                amount=None
-                            )
-                positions.append(pos)
 
-            return positions
-
-
-        """
-        momentum3: Mean reversion is mixed.
-        """
-        if self.strategy_name == "momentum3":
-            if len(data) != 21:
-                err = ValueError(
-                    f"DataFrame must have exactly 21 rows, got {len(data)}"
-                )
-                err.wrong_dataframe = data
-
-                raise err
-
-            symbols_long, symbols_short = strat_momentum3(data=data,
-                                                          n_asset_buy=n_asset_buy,
-                                                          n_asset_sell=n_asset_sell)
-
-            positions: List[Position] = []
-
-            for symbol_top in symbols_long:
-                pos = Position(
-                                symbol=symbol_top,
-                                position=1,
-                                fetched_price=None,
-                                entry_price=None,
-                                quantity=None,
-                                amount=None
-                            )
-                positions.append(pos)
-            
-            for symbol_bottom in symbols_short:
-                pos = Position(
-                                symbol=symbol_bottom,
-                                position=-1,
-                                fetched_price=None,
-                                entry_price=None,
-                                quantity=None,
-                                amount=None
-                            )
-                positions.append(pos)
-
-            return positions
-
-        
-        """
-        momentum4: Do not trade highly volatile asset. Removed regime.
-        """
-        if self.strategy_name == "momentum4":
-            if len(data) != 21:
-                err = ValueError(
-                    f"DataFrame must have exactly 21 rows, got {len(data)}"
-                )
-                err.wrong_dataframe = data
-
-                raise err
-
-            symbols_long, symbols_short = strat_momentum4(data=data,
-                                                          n_asset_buy=n_asset_buy,
-                                                          n_asset_sell=n_asset_sell)
-
-            positions: List[Position] = []
-
-            for symbol_top in symbols_long:
-                pos = Position(
-                                symbol=symbol_top,
-                                position=1,
-                                fetched_price=None,
-                                entry_price=None,
-                                quantity=None,
-                                amount=None
-                            )
-                positions.append(pos)
-            
-            for symbol_bottom in symbols_short:
-                pos = Position(
-                                symbol=symbol_bottom,
-                                position=-1,
-                                fetched_price=None,
-                                entry_price=None,
-                                quantity=None,
-                                amount=None
-                            )
-                positions.append(pos)
-
-            return positions
+        if len(close) != self.lookback:
+            err = ValueError(
+                f"DataFrame must have exactly {self.lookback} rows, got {len(close)}"
+            )
+            err.wrong_dataframe = data.to_frame() if isinstance(data, PriceWindow) else data
+
+            raise err
+
+        signal = self.strategy.signal_func(close)
+        long_mask, short_mask = select_long_short(signal=signal,
+                                                  n_asset_buy=n_asset_buy,
+                                                  n_asset_sell=n_asset_sell,
+                                                  sign_constraint=self.strategy.sign_constraint)
+
+        symbols = np.asarray(symbols)
+        positions: List[Position] = [
+            Position(symbol=symbol, position=1, fetched_price=None, entry_price=None, quantity=None, amount=None)
+            for symbol in symbols[long_mask].tolist()
+        ] + [
+            Position(symbol=symbol, position=-1, fetched_price=None, entry_price=None, quantity=None, amount=None)
+            for symbol in symbols[short_mask].tolist()
+        ]
+
+        return positions
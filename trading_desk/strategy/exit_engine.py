@@ -0,0 +1,130 @@
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from ..data_models import ExitConfig
+from .position_model import Position
+
+
+@dataclass
+class ExitTrigger:
+    """
+    Precomputed exit prices of one held position.
+    `side` is +1 for long and -1 for short, so every check is a single comparison `side*price >= side*level`.
+    """
+    symbol: str
+    side: int
+    take_profit_price: Optional[float]
+    stop_price: Optional[float]
+    trailing_stop: Optional[float]
+    best_price: float
+    stop_reason: str = "stop_loss"
+    position: Optional[Position] = None # The armed position, handed to `on_exit`
+
+    def check(self,
+              price:float):
+        side = self.side
+
+        if self.trailing_stop is not None and side*price > side*self.best_price:
+            self.best_price = price
+            trailing_price = price*(1 - side*self.trailing_stop)
+
+            if self.stop_price is None or side*trailing_price > side*self.stop_price:
+                self.stop_price = trailing_price
+                self.stop_reason = "trailing_stop"
+
+        if self.take_profit_price is not None and side*price >= side*self.take_profit_price:
+            return "take_profit"
+
+        if self.stop_price is not None and side*price <= side*self.stop_price:
+            return self.stop_reason
+
+        return None
+
+
+class ExitEngine:
+    """
+    Evaluate take-profit, stop-loss and trailing-stop exits on every price update.
+
+    `arm` precomputes the trigger prices of a position from `ExitConfig`,
+    so `on_price` costs one dictionary lookup and a few comparisons per tick.
+    A fired trigger is removed and reported once through `on_exit(position, reason, price)`, with the armed
+    `Position` object so the handler can tell it apart from a position reopened later on the same symbol.
+    """
+    def __init__(self,
+                 exit_config:ExitConfig,
+                 on_exit:Callable):
+        self.exit_config = exit_config
+        self.on_exit = on_exit
+
+        self.triggers: Dict[str, ExitTrigger] = {}
+        self._lock = threading.Lock()
+
+
+    def thresholds(self,
+                   symbol:str):
+        thresholds = {
+            "take_profit": self.exit_config.take_profit,
+            "stop_loss": self.exit_config.stop_loss,
+            "trailing_stop": self.exit_config.trailing_stop,
+        }
+        thresholds.update(self.exit_config.symbol_overrides.get(symbol, {}))
+
+        return thresholds
+
+
+    def arm(self,
+            position:Position):
+        if position.quantity == 0 or position.position == 0:
+            return
+
+        side = position.position
+        entry_price = position.entry_price
+        thresholds = self.thresholds(position.symbol)
+
+        take_profit_price = None
+        if thresholds["take_profit"] is not None:
+            take_profit_price = entry_price*(1 + side*thresholds["take_profit"])
+
+        stop_price = None
+        if thresholds["stop_loss"] is not None:
+            stop_price = entry_price*(1 - side*thresholds["stop_loss"])
+
+        trigger = ExitTrigger(symbol=position.symbol,
+                              side=side,
+                              take_profit_price=take_profit_price,
+                              stop_price=stop_price,
+                              trailing_stop=thresholds["trailing_stop"],
+                              best_price=entry_price,
+                              position=position)
+
+        with self._lock:
+            self.triggers[position.symbol] = trigger
+
+
+    def disarm(self,
+               symbol:str):
+        with self._lock:
+            self.triggers.pop(symbol, None)
+
+
+    def disarm_all(self):
+        with self._lock:
+            self.triggers.clear()
+
+
+    def on_price(self,
+                 symbol:str,
+                 price:float):
+        with self._lock:
+            trigger = self.triggers.get(symbol)
+            if trigger is None:
+                return
+
+            reason = trigger.check(price)
+            if reason is None:
+                return
+
+            del self.triggers[symbol]
+
+        self.on_exit(trigger.position, reason, price)
@@ -0,0 +1,89 @@
+from dataclasses import dataclass
+from typing import Callable, Dict
+
+import numpy as np
+
+
+@dataclass
+class Strategy:
+    name: str
+    lookback: int             # Number of closed klines the signal consumes
+    signal_func: Callable     # (lookback, ..., N) closing prices -> (..., N) signal. NaN = not tradable.
+    sign_constraint: bool     # If True, longs need a positive signal and shorts a negative one
+
+
+STRATEGY_REGISTRY: Dict[str, Strategy] = {}
+
+
+def register_strategy(name:str,
+                      lookback:int,
+                      sign_constraint:bool=False):
+    """
+    Decorator registering a signal function under `name`.
+
+    ```python
+    @register_strategy("momentum1", lookback=13)
+    def strat_momentum1(close):
+        return close[-1]/close[0] - 1
+    ```
+    """
+    def decorator(signal_func):
+        if name in STRATEGY_REGISTRY:
+            raise ValueError(f"Strategy '{name}' is already registered.")
+
+        STRATEGY_REGISTRY[name] = Strategy(name=name,
+                                           lookback=lookback,
+                                           signal_func=signal_func,
+                                           sign_constraint=sign_constraint)
+        return signal_func
+
+    return decorator
+
+
+def get_strategy(name:str):
+    if name not in STRATEGY_REGISTRY:
+        raise Exception("Strategy name is not valid")
+
+    return STRATEGY_REGISTRY[name]
+
+
+def select_long_short(signal:np.ndarray,
+                      n_asset_buy:int,
+                      n_asset_sell:int,
+                      sign_constraint:bool=False):
+    """
+    Select the `n_asset_buy` highest and `n_asset_sell` lowest signals along the last axis.
+
+    `signal` may be (N,) or (K, N) for K parameter sets / timestamps at once.
+    Selection uses `np.argpartition`, so it is O(N) per row without a full sort.
+    NaN signals are never selected, and an asset is never both long and short.
+
+    Returns (long_mask, short_mask), boolean arrays shaped like `signal`.
+    """
+    signal = np.asarray(signal, dtype=np.float64)
+    n_assets = signal.shape[-1]
+
+    long_mask = np.zeros(signal.shape, dtype=bool)
+    short_mask = np.zeros(signal.shape, dtype=bool)
+
+    # Long side: top-n, NaN ranks last
+    n_buy = min(n_asset_buy, n_assets)
+    if n_buy > 0:
+        ranked = np.where(np.isnan(signal), -np.inf, signal)
+        top = np.argpartition(-ranked, n_buy - 1, axis=-1)[..., :n_buy]
+        np.put_along_axis(long_mask, top, True, axis=-1)
+
+        eligible = ~np.isnan(signal) & (signal > 0 if sign_constraint else True)
+        long_mask &= eligible
+
+    # Short side: bottom-n among the assets not bought, NaN ranks last
+    n_sell = min(n_asset_sell, n_assets)
+    if n_sell > 0:
+        ranked = np.where(np.isnan(signal) | long_mask, np.inf, signal)
+        bottom = np.argpartition(ranked, n_sell - 1, axis=-1)[..., :n_sell]
+        np.put_along_axis(short_mask, bottom, True, axis=-1)
+
+        eligible = ~np.isnan(signal) & ~long_mask & (signal < 0 if sign_constraint else True)
+        short_mask &= eligible
+
+    return long_mask, short_mask
@@ -0,0 +1,62 @@
+"""
+Momentum signals. Each function maps a (lookback, N) closing-price matrix to an (N,) signal.
+Assets with a missing kline in the window get a NaN signal and are never traded.
+
+Time is axis 0 and assets are the last axis, so a stack of windows shaped (lookback, K, N)
+yields (K, N) signals in one call (used by the backtester).
+"""
+import numpy as np
+
+from .registry import register_strategy
+
+
+def window_return(close:np.ndarray):
+    return close[-1]/close[0] - 1
+
+
+@register_strategy("momentum1", lookback=13)
+def strat_momentum1(close:np.ndarray):
+    """
+    momentum1: Return over the window.
+    """
+    return window_return(close)
+
+
+@register_strategy("momentum2", lookback=13, sign_constraint=True)
+def strat_momentum2(close:np.ndarray):
+    """
+    momentum2: Sign constraint is applied to signal computation.
+    Only assets with a positive return are bought, and only assets with a negative return are sold.
+    """
+    return window_return(close)
+
+
+@register_strategy("momentum3", lookback=21)
+def strat_momentum3(close:np.ndarray):
+    """
+    momentum3: Mean reversion is mixed.
+    Window return minus the return of the last kline (short-term reversal).
+    """
+    return window_return(close) - (close[-1]/close[-2] - 1)
+
+
+@register_strategy("momentum4", lookback=21)
+def strat_momentum4(close:np.ndarray):
+    """
+    momentum4: Do not trade highly volatile asset. Removed regime.
+    Window return, excluding assets whose volatility is in the top 20% of the universe.
+    """
+    log_returns = np.diff(np.log(close), axis=0)
+    volatility = log_returns.std(axis=0)
+
+    signal = window_return(close)
+
+    # 80th percentile of the valid volatilities per row (np.nanquantile without its per-row Python loop)
+    sorted_volatility = np.sort(volatility, axis=-1) # NaN sorts last
+    n_valid = np.sum(~np.isnan(volatility), axis=-1, keepdims=True)
+    rank = np.maximum(0.8*(n_valid - 1), 0)
+    lower = np.take_along_axis(sorted_volatility, np.floor(rank).astype(np.int64), axis=-1)
+    upper = np.take_along_axis(sorted_volatility, np.ceil(rank).astype(np.int64), axis=-1)
+    threshold = lower + (upper - lower)*(rank - np.floor(rank))
+
+    return np.where(volatility > threshold, np.nan, signal)
@@ -1,18 +1,28 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
 import time
-import math
-from .data_models import MainConfig
+from typing import List, Optional
+from .data_models import MainConfig, DeskState
 from .setup_logger import setup_logger, log_configs
-from .gspread import init_gspread, setup_worksheet_format, add_transaction_log, get_cell_value
-from .strategy import PositionCalculator
+from .gspread import init_gspread, setup_worksheet_format, build_transaction_row, get_cell_value, SheetWriter
+from .strategy import PositionCalculator, ExitEngine
 from .strategy.position_model import Position
-from .functions import APIHandler, build_closing_price_series, build_dataframe, get_quantity_precision, get_min_order_quantity
+from .functions import APIHandler, get_quantity_precision, get_min_order_quantity
+from .functions import is_filter_rejection, OrderExecutor, OrderLeg
+from .functions import KillSwitch, file_source, PositionReconciler, LegResult, UserDataStream, AccountBook
+from .functions import calc_order_quantity, mock_fill_amount
+from .functions import Metrics, NULL_METRICS, MetricsServer
 from .errors import TradingTermination
+from .ledger import open_ledger
+from .state_store import StateStore
+from .market_data import MarketData
 
 __all__ = ["TradingDesk"]
 
 
 class TradingDesk:
-    def __init__(self, config:MainConfig, binance_api_key:str, binance_secret_key:str):
+    def __init__(self, config:MainConfig, binance_api_key:str, binance_secret_key:str, market_data:Optional[MarketData]=None):
         # Hyperparameters
         self.is_mock = config.is_mock
 
@@ -44,11 +54,39 @@ class TradingDesk:
 
         # Exchange hyperparameters
         self.transaction_cost = 0.0005
+        self.kline_close_delay = 10 # Seconds waited after the bar boundary, so the closed kline is served
 
         # Objects
-        self.api_handler = APIHandler(binance_api_key=self.binance_api_key,
-                                      binance_secret_key=self.binance_secret_key)
+        if market_data is None:
+            # Standalone session: the desk owns its market data
+            self.api_handler = APIHandler(binance_api_key=self.binance_api_key,
+                                          binance_secret_key=self.binance_secret_key,
+                                          base_url=config.rest_base_url)
+            market_data = MarketData(api_handler=self.api_handler,
+                                     kline_archive_dir=config.kline_archive_dir,
+                                     stream_base_url=config.ws_base_url)
+        else:
+            # Orchestrated session: orders and account requests share the process-wide request budget
+            self.api_handler = APIHandler(binance_api_key=self.binance_api_key,
+                                          binance_secret_key=self.binance_secret_key,
+                                          base_url=market_data.api_handler.base_url,
+                                          rate_limiter=market_data.api_handler.rate_limiter)
+        self.market_data = market_data
+        self.market_data.subscribe(symbols=self.traded_assets,
+                                   every=self.every,
+                                   unit=self.unit)
         self.position_calculator = PositionCalculator(strategy_name=self.strategy_name)
+        self.order_executor = OrderExecutor(api_handler=self.api_handler)
+        self.position_reconciler = PositionReconciler(api_handler=self.api_handler)
+        self.exit_engine = ExitEngine(exit_config=config.exitconfig,
+                                      on_exit=self.on_exit_triggered)
+        self.exit_worker = ThreadPoolExecutor(max_workers=1) # Runs triggered exits off the price stream thread
+        self.exit_retry_delays = {} # symbol -> seconds before a failed exit is re-armed (doubles per failure)
+        self.exit_retry_min_delay = 5
+        self.exit_retry_max_delay = 300
+        self.exit_poll_interval = config.exitconfig.rest_poll_interval
+        self.exit_poll_stop = threading.Event()
+        self.state_lock = threading.RLock() # Guards positions and balances shared by rebalances and exits
 
         # Attributes
         if self.is_mock:
@@ -61,6 +99,15 @@ class TradingDesk:
         self.collateral_short = 0
         self.positions_holding: List[Position] = []
 
+        # State snapshot of a previous run of this session (warm restart)
+        self.state_store = None
+        restored_state = None
+        if config.state_dir is not None:
+            self.state_store = StateStore(path=os.path.join(config.state_dir, f"{self.session_name}.json"))
+            restored_state = self.state_store.load()
+
+        self.leverage_set = set(restored_state.leverage_set) if restored_state is not None else set()
+
         # Initialization
         ## Logger
         self.logger = setup_logger(session_name=self.session_name, 
@@ -73,24 +120,224 @@ class TradingDesk:
         self.logger.info(f"Binance SECRET key = {self.binance_secret_key}")
         log_configs(logger=self.logger, config=config)
 
-        ## Gspread initialization
-        self.g_worksheets_mock = init_gspread(session_name=self.session_name)
-
-        setup_worksheet_format(worksheet=self.g_worksheets_mock,
-                               strategy_name=self.strategy_name, 
-                               init_capital=self.capital,
-                               traded_assets=self.traded_assets,
-                               tmux_session_name=self.tmux_session_name)
+        ## Metrics (step spans, per-endpoint request latency, decision-to-fill latency). No-ops if disabled.
+        self.metrics = NULL_METRICS
+        self.metrics_dir = config.metrics_dir
+        self.metrics_server = None
+        if config.metrics_port is not None or config.metrics_dir is not None:
+            self.metrics = Metrics(labels={"session": self.session_name})
+            self.api_handler.metrics = self.metrics
+
+        if config.metrics_port is not None:
+            self.metrics_server = MetricsServer(metrics=self.metrics,
+                                                port=config.metrics_port)
+            self.metrics_server.start()
+            self.logger.info(f"Metrics are served at http://{self.metrics_server.host}:{self.metrics_server.port}/metrics")
+
+        ## Ledger (local record of every fill and capital snapshot)
+        self.ledger = None
+        if config.ledger_backend is not None:
+            self.ledger = open_ledger(backend=config.ledger_backend,
+                                      path=config.ledger_path,
+                                      session_name=self.session_name,
+                                      is_mock=self.is_mock)
+
+        ## Gspread initialization (optional mirror of the transaction logs)
+        self.g_worksheets_mock = None
+        self.sheet_writer = None
+
+        if config.gspread_mirror and restored_state is not None:
+            # Warm restart: the existing worksheet is reopened by the writer thread, off the startup path
+            def open_worksheet():
+                self.g_worksheets_mock = init_gspread(session_name=self.session_name, reuse=True)
+                return self.g_worksheets_mock, restored_state.sheet_next_row
+
+            self.sheet_writer = SheetWriter(open_worksheet=open_worksheet,
+                                            logger=self.logger,
+                                            metrics=self.metrics)
+            self.sheet_writer.start()
+
+        elif config.gspread_mirror:
+            self.g_worksheets_mock = init_gspread(session_name=self.session_name)
+
+            next_row = setup_worksheet_format(worksheet=self.g_worksheets_mock,
+                                              strategy_name=self.strategy_name, 
+                                              init_capital=self.capital,
+                                              traded_assets=self.traded_assets,
+                                              tmux_session_name=self.tmux_session_name)
+
+            # Transaction logs are written from a background thread, off the trading path
+            self.sheet_writer = SheetWriter(worksheet=self.g_worksheets_mock,
+                                            next_row=next_row,
+                                            logger=self.logger,
+                                            metrics=self.metrics)
+            self.sheet_writer.start()
+
+        ## Kill switch ('is_running' cell, or a local file), polled off the trading path
+        kill_switch_options = {} # Sheets reads: KillSwitch defaults (one per minute)
+        if config.kill_switch_file is not None:
+            kill_switch_source = file_source(config.kill_switch_file)
+            kill_switch_options = {"poll_interval": 5.0, "max_age": 60.0} # Local reads are free
+        elif config.gspread_mirror:
+            kill_switch_source = self.check_is_running
+        else:
+            kill_switch_source = lambda: 1 # No control source: always running
+        self.kill_switch = KillSwitch(source=kill_switch_source,
+                                      logger=self.logger,
+                                      **kill_switch_options)
+        self.kill_switch.start()
         
-        ## Set leverage
+        ## Market data (exchangeInfo snapshot, kline store and price stream; shared when orchestrated)
+        self.market_data.start(logger=self.logger) # No-op if already started by the orchestrator
+        self.metadata_cache = self.market_data.metadata_cache
+        self.kline_store = self.market_data.kline_store(every=self.every, unit=self.unit)
+
+        ## Price stream (latest-price table for price lookups, REST fallback in `get_price`)
+        self.price_stream = self.market_data.price_stream
+        self.price_stream.add_listener(self.exit_engine.on_price) # Exits are evaluated on every price update
+
+        ## REST prices for exits while the price stream is down
+        if self.exit_poll_interval is not None:
+            threading.Thread(target=self.poll_exit_prices, name="exit-poll", daemon=True).start()
+
+        ## User data stream (order fills, balances and positions pushed by the exchange; live trading only)
+        self.account_book = AccountBook()
+        self.user_stream = None
+        if not self.is_mock:
+            self.user_stream = UserDataStream(api_handler=self.api_handler,
+                                              account_book=self.account_book,
+                                              base_url=config.ws_base_url,
+                                              logger=self.logger)
+            self.api_handler.account_book = self.account_book # -1007 timeouts are resolved from the book first
+            self.user_stream.start()
+
+        ## Restore positions and balances
+        if restored_state is not None:
+            self.restore_state(restored_state)
+
+        ## Set leverage (skipped for symbols already set by a previous run)
         if not self.is_mock:
-            for symbol in self.traded_assets:
-                res = self.api_handler.set_leverage(symbol=symbol,
-                                                    leverage=1)
-                self.logger.info(f"Leverage for {symbol} set to {res["leverage"]}")
+            symbols = [symbol for symbol in self.traded_assets if symbol not in self.leverage_set]
+            results = self.order_executor.run({
+                symbol: (lambda symbol=symbol: self.api_handler.set_leverage(symbol=symbol, leverage=1))
+                for symbol in symbols
+            })
+
+            for symbol, result in results.items():
+                if not result.ok:
+                    raise RuntimeError(f"Failed to set leverage for {symbol}: {result.error}")
+
+                self.leverage_set.add(symbol)
+                self.logger.info(f"Leverage for {symbol} set to {result.response["leverage"]}")
+
+        self.save_state()
+
+
+    def get_price(self,
+                  symbol:str):
+        """
+        Latest price from the price stream, or from '/fapi/v1/ticker/price' if the stream is stale or disconnected.
+        """
+        price = self.price_stream.get_price(symbol=symbol)
+
+        if price is None:
+            price = self.api_handler.get_current_price(symbol=symbol)
+
+        return price
+
+
+    def get_available_balance(self,
+                              expected_positions:dict=None):
+        """
+        Available USDT balance from the user data stream's account book.
+        Falls back to '/fapi/v2/balance' if the stream is disconnected
+        or has not reflected `expected_positions` ({symbol: signed amount}) yet.
+        """
+        if self.user_stream is not None and self.user_stream.connected:
+            if expected_positions is None or self.account_book.wait_for_positions(expected=expected_positions, timeout=2.0):
+                # Margin at current mark prices when the price stream carries them
+                marks = {}
+                if self.price_stream.is_mark_price:
+                    marks = {symbol: self.price_stream.get_price(symbol=symbol) for symbol in self.traded_assets}
+                balance = self.account_book.available_balance(asset="USDT",
+                                                              marks={s: p for s, p in marks.items() if p is not None})
+                if balance is not None:
+                    return balance
+
+        balance_info = self.api_handler.get_balance(symbol="USDT")
+        return float(balance_info["availableBalance"])
+
+
+    def restore_state(self,
+                      state:DeskState):
+        """
+        Resume from a saved DeskState. In live trading, positions are reconciled with the exchange
+        (one '/fapi/v3/positionRisk' call for every symbol), and the capital comes from the balance.
+        """
+        positions = {p.symbol: p for p in state.positions if p.quantity != 0}
+
+        if self.is_mock:
+            self.capital = state.capital
+        else:
+            exchange_positions = self.position_reconciler.fetch()
+            diffs = self.position_reconciler.diff(positions=list(positions.values()),
+                                                  symbols=self.traded_assets,
+                                                  exchange_positions=exchange_positions)
+
+            for symbol, diff in diffs.items():
+                if diff.matches:
+                    continue
+
+                self.logger.warning(f"Saved position of {symbol} ({diff.expected}) differs from the exchange ({diff.actual}). Using the exchange.")
+                positions.pop(symbol, None)
+
+                if diff.actual != 0:
+                    side = 1 if diff.actual > 0 else -1
+                    price = float(exchange_positions[symbol]["entryPrice"])
+                    positions[symbol] = Position(symbol=symbol,
+                                                 position=side,
+                                                 fetched_price=price,
+                                                 entry_price=price,
+                                                 quantity=abs(diff.actual),
+                                                 amount=-side*abs(diff.actual)*price)
+
+        self.positions_holding = [positions[symbol] for symbol in self.traded_assets if symbol in positions]
+
+        # Collateral follows the restored positions
+        self.collateral_long = sum(abs(p.amount) for p in self.positions_holding if p.position == 1)
+        self.collateral_short = sum(abs(p.amount) for p in self.positions_holding if p.position == -1)
+
+        for position in self.positions_holding:
+            self.exit_engine.arm(position)
+
+        self.logger.info(f"State restored from {state.saved_at} (ms): {len(self.positions_holding)} open positions, capital {self.capital}.")
+
+
+    def save_state(self):
+        """
+        Atomically snapshot positions and balances (called after every change of state).
+        """
+        if self.state_store is None:
+            return
+
+        state = DeskState(session_name=self.session_name,
+                          saved_at=int(time.time() * 1000),
+                          capital=self.capital,
+                          collateral_long=self.collateral_long,
+                          collateral_short=self.collateral_short,
+                          positions=list(self.positions_holding),
+                          leverage_set=sorted(self.leverage_set),
+                          sheet_next_row=self.sheet_writer.next_row if self.sheet_writer is not None else None)
+        try:
+            self.state_store.save(state)
+        except Exception:
+            self.logger.exception("Failed to save the desk state.")
 
 
     def check_is_running(self):
+        if self.g_worksheets_mock is None:
+            raise RuntimeError("Worksheet is not open yet.")
+
         res = get_cell_value(worksheet=self.g_worksheets_mock,
                              cell="C9",
                              logger=self.logger)
@@ -98,37 +345,165 @@ class TradingDesk:
         return res
 
 
+    def record_transaction(self,
+                           positions_to_record:List[Position],
+                           open_close:str,
+                           mirror:bool=True):
+        """
+        Store fills and balances in the ledger, and queue the row for the worksheet mirror if `mirror`.
+        Neither write may interrupt trading.
+        """
+        if self.ledger is not None:
+            try:
+                with self.metrics.span("ledger.record"):
+                    self.ledger.record(positions=positions_to_record,
+                                       open_close=open_close,
+                                       collateral_long=self.collateral_long,
+                                       collateral_short=self.collateral_short,
+                                       capital=self.capital)
+            except Exception:
+                self.logger.exception("Failed to write the ledger.")
+
+        if mirror and self.sheet_writer is not None:
+            self.sheet_writer.append_row(build_transaction_row(positions_to_record=positions_to_record,
+                                                               open_close=open_close,
+                                                               collateral_long=self.collateral_long,
+                                                               collateral_short=self.collateral_short,
+                                                               capital=self.capital))
+
+
+    def close_positions(self,
+                        symbols:List[str],
+                        max_retries:int = 5,
+                        delay:float = 0.5,
+                        order_retries:int = 2):
+        """
+        Flatten `symbols` at their exchange quantities: one positionRisk call, then every order at once.
+
+        Failed legs are checked against the exchange positions (one positionRisk call) up to `order_retries` times:
+        a leg still open at its full size is placed again, a leg found flat (executed despite the error) is booked
+        at the last price, and a partially changed one is left failed.
+
+        Returns {symbol: LegResult}. A symbol without an open position on the exchange is reported as failed.
+        """
+        decision_ms = self.api_handler.clock_sync.now_ms()
+
+        legs, missing = self.position_reconciler.flatten_legs(symbols=symbols,
+                                                              max_retries=max_retries,
+                                                              delay=delay)
+
+        results = self.order_executor.place_market_orders(legs)
+        self.record_fill_latency(legs=legs,
+                                 results=results,
+                                 decision_ms=decision_ms)
+
+        for _ in range(order_retries):
+            failed_legs = [leg for leg in legs if not results[leg.symbol].ok]
+            if not failed_legs:
+                break
+
+            try:
+                exchange_positions = self.position_reconciler.fetch()
+            except Exception:
+                self.logger.exception(f"Cannot check the failed closes of {[leg.symbol for leg in failed_legs]} with the exchange.")
+                continue
+
+            retry_legs = []
+            for leg in failed_legs:
+                error = results[leg.symbol].error
+                actual = float(exchange_positions[leg.symbol]["positionAmt"]) if leg.symbol in exchange_positions else 0.0
+
+                if abs(actual - leg.position_amount) < 1e-12:
+                    self.logger.warning(f"Close of {leg.symbol} failed ({error}). Retrying.")
+                    retry_legs.append(leg)
+
+                elif actual == 0:
+                    try:
+                        price = self.get_price(symbol=leg.symbol)
+                    except Exception:
+                        continue
+
+                    self.logger.warning(f"Close of {leg.symbol} was executed despite '{error}'. Booked at the last price {price}.")
+                    results[leg.symbol] = LegResult(symbol=leg.symbol,
+                                                    response={"status": "FILLED",
+                                                              "avgPrice": str(price),
+                                                              "executedQty": str(leg.quantity),
+                                                              "cumQuote": str(leg.quantity*price)})
+
+            if retry_legs:
+                retried = self.order_executor.place_market_orders(retry_legs)
+                self.record_fill_latency(legs=retry_legs,
+                                         results=retried,
+                                         decision_ms=decision_ms)
+                results.update(retried)
+
+        for symbol in missing:
+            results[symbol] = LegResult(symbol=symbol,
+                                        error=ValueError(f"No open position of {symbol} on the exchange after {max_retries} fetches."))
+
+        return {symbol: results[symbol] for symbol in symbols}
+
+
+    def record_fill_latency(self,
+                            legs:List[OrderLeg],
+                            results:dict,
+                            decision_ms:int):
+        """
+        Decision-to-fill latency of every filled leg: the order's exchange 'updateTime' minus `decision_ms`
+        (server-clock corrected milliseconds taken when the orders were decided).
+        """
+        if not self.metrics.enabled:
+            return
+
+        for leg in legs:
+            result = results.get(leg.symbol)
+            if result is None or not result.ok or "updateTime" not in result.response:
+                continue
+
+            self.metrics.record_fill(symbol=leg.symbol,
+                                     side=leg.side,
+                                     latency=(int(result.response["updateTime"]) - decision_ms) / 1000)
+
+
     def close_position(self, 
                        symbol:str,
                        max_retries:int = 5,
                        delay:float = 0.5):
-        open_position = []
+        result = self.close_positions(symbols=[symbol],
+                                      max_retries=max_retries,
+                                      delay=delay)[symbol]
 
-        # Retry logic when API returns empty list
-        for attempt in range(max_retries):
-            open_position = self.api_handler.fetch_position(symbol=symbol)
+        if not result.ok:
+            raise result.error
 
-            if open_position:  # non-empty list → success
-                break
+        return result.response
 
-            if attempt < max_retries - 1:
-                time.sleep(delay)
-            else:
-                raise ValueError(f"Failed to fetch position for {symbol} after {max_retries} retries.") 
-            
-        quantity = float(open_position[0]["positionAmt"])
-        quantity_to_clear = abs(quantity)
 
-        if quantity > 0: # Position is open on the long side
-            side="SELL"
-        if quantity < 0: # Position is open on the short side
-            side="BUY"
+    def prepare_order(self,
+                      position:Position):
+        """
+        Fetch the current price of `position.symbol` and calculate its order quantity.
+        Returns (quantity_rounded_down, min_order_quantity).
+        """
+        fetched_price = self.get_price(symbol=position.symbol)
+        position.fetched_price = fetched_price
 
-        res = self.api_handler.place_market_order(symbol=symbol,
-                                                  side=side, 
-                                                  quantity=quantity_to_clear)
+        quantity_precision = get_quantity_precision(api_handler=self.api_handler,
+                                                    symbol=position.symbol,
+                                                    metadata_cache=self.metadata_cache)
+        
+        # Order quantity is calculated using the mark price of the price stream ('/fapi/v1/ticker/price' if it is stale or down).
+        quantity_rounded_down = calc_order_quantity(amount=position.amount,
+                                                    price=fetched_price,
+                                                    quantity_precision=quantity_precision)
 
-        return res
+        mark_price = self.price_stream.get_price(symbol=position.symbol) if self.price_stream.is_mark_price else None
+        min_order_quantity = get_min_order_quantity(api_handler=self.api_handler,
+                                                    symbol=position.symbol,
+                                                    metadata_cache=self.metadata_cache,
+                                                    mark_price=mark_price)
+
+        return quantity_rounded_down, min_order_quantity
 
 
     def strategy_func(self):
@@ -141,21 +516,30 @@ class TradingDesk:
         self.logger.info("")
         self.logger.info("========================= strategy_func starts to execute =========================")
         self.logger.info("Step 1 starts.")
+        self.metrics.start_span("step1")
+
+        self.exit_engine.disarm_all() # Positions are cleared below. No exit should fire meanwhile.
 
         if self.positions_holding: # If positions_holding is not empty
             cleared_positions = [] # Also includes assets that were not held
+            failed_symbols = []
+
+            # Close every held position at once
+            if not self.is_mock:
+                close_results = self.close_positions(symbols=[position.symbol for position in self.positions_holding
+                                                              if position.quantity != 0])
 
             for position in self.positions_holding[:]: # Iterate over a shallow copy
                 if position.quantity != 0: # If currently holding this asset
                     position_for_clearing = -1*position.position
-                    fetched_price = self.api_handler.get_current_price(symbol=position.symbol)
 
                     if self.is_mock:
-                        
-                        quantity_holding = position.quantity
-                        amount_to_be_cleared = -1*position_for_clearing*fetched_price * quantity_holding
+                        fetched_price = self.get_price(symbol=position.symbol)
 
-                        amount_clearing_after_fee = amount_to_be_cleared*(1 + position_for_clearing*self.transaction_cost)
+                        amount_clearing_after_fee = mock_fill_amount(position=position_for_clearing,
+                                                                     quantity=position.quantity,
+                                                                     price=fetched_price,
+                                                                     transaction_cost=self.transaction_cost)
 
                         cleared_position = Position(
                                             symbol=position.symbol,
@@ -168,7 +552,23 @@ class TradingDesk:
 
                         
                     else:
-                        res = self.close_position(symbol=position.symbol)
+                        result = close_results[position.symbol]
+
+                        # Keep the position on failure. It is retried by the error path in `run_strategy`.
+                        if not result.ok:
+                            self.logger.error(f"Failed to clear position of {position.symbol}: {result.error}")
+                            self.metrics.record_failure(symbol=position.symbol, stage="close", error=result.error)
+                            failed_symbols.append(position.symbol)
+                            continue
+
+                        res = result.response
+
+                        # The last price is only recorded: the fill price stands in if it cannot be fetched
+                        try:
+                            fetched_price = self.get_price(symbol=position.symbol)
+                        except Exception as e:
+                            self.logger.warning(f"Price of {position.symbol} is not available ({e}). Recording the fill price.")
+                            fetched_price = float(res["avgPrice"])
 
                         # Logging
                         price_entry = position.entry_price
@@ -208,15 +608,13 @@ class TradingDesk:
                 self.positions_holding.remove(position)
      
             # After 
-            """
-            add_transaction_log(worksheet=self.g_worksheets_mock,
-                                positions_to_record=cleared_positions,
-                                open_close="close",
-                                collateral_long=self.collateral_long,
-                                collateral_short=self.collateral_short,
-                                capital=self.capital,
-                                logger=self.logger)
-            """
+            self.record_transaction(positions_to_record=cleared_positions,
+                                    open_close="close",
+                                    mirror=False) # Only opening rows are mirrored to the worksheet
+            self.save_state()
+
+            if failed_symbols:
+                raise RuntimeError(f"Failed to clear positions of {failed_symbols}.")
         
             if not self.positions_holding: # If self.positions_holding is empty
                 self.logger.info("All positions are cleared")
@@ -224,13 +622,17 @@ class TradingDesk:
         else:
             self.logger.info("No open position. Position clearing has been skipped.")
 
+        self.metrics.end_span("step1")
         self.logger.info("Step 1 is finished.")
         self.logger.info("")
 
-        is_active = bool(int(self.check_is_running()))
-
-        if not is_active:
+        # Cached kill switch: no spreadsheet round trip while the desk is flat
+        if self.kill_switch.is_stopped:
             raise TradingTermination(f"Termination is requested by user. Shutting down without additional order.")
+
+        if not self.kill_switch.is_active: # Stale: fail safe and stay flat until the next rebalance
+            self.logger.warning("Kill switch state is stale. No position is opened in this rebalance.")
+            return
         # if self.must_terminate:
         #     raise TradingTermination(f"Problem occurred. Shutting down...")
 
@@ -239,31 +641,45 @@ class TradingDesk:
         Step 2
         : Position calculation
         """
-        time.sleep(10) # delay to prevent fetching incomplete kline
+        with self.metrics.span("step2.wait"):
+            time.sleep(self.kline_close_delay) # delay to prevent fetching incomplete kline
         self.logger.info("Step 2 starts.")
-
-        # Fetch data and build DataFrame
-        close_prices = {}
-
-        for symbol in self.traded_assets:
-            klines = self.api_handler.fetch_klines(symbol=symbol,
-                                                   every=self.every,
-                                                   unit=self.unit,
-                                                   timesteps=21)
-            close_prices[symbol] = build_closing_price_series(klines)
-
-        df = build_dataframe(close_prices)
-        df = df.iloc[:-1] # Exclude very last row which is incomplete kline
+        self.metrics.start_span("step2")
+
+        # Fetch only the klines closed since the previous rebalance, concurrently
+        lookback = self.position_calculator.lookback
+        _, end_time = self.api_handler.kline_window(every=self.every,
+                                                    unit=self.unit,
+                                                    timesteps=lookback) # end_time: open time of the incomplete kline
+
+        # Sessions sharing the market data fetch each bar once: later sessions find the window complete
+        with self.metrics.span("step2.klines"):
+            errors = self.market_data.refresh(every=self.every,
+                                              unit=self.unit,
+                                              end_time=end_time,
+                                              lookback=lookback)
+        errors = {symbol: error for symbol, error in errors.items() if symbol in self.traded_assets}
+        for symbol, error in errors.items():
+            self.logger.warning(f"Failed to fetch klines for {symbol}. It is excluded from this rebalance: {error}")
+
+        if len(errors) == len(self.traded_assets):
+            raise RuntimeError("Failed to fetch klines for every traded asset.")
+
+        price_window = self.kline_store.window(symbols=[s for s in self.traded_assets if s not in errors],
+                                               end_time=end_time,
+                                               lookback=lookback)
         
-        positions = self.position_calculator.get_positions(data=df,
-                                                           n_asset_buy=self.n_asset_buy,
-                                                           n_asset_sell=self.n_asset_sell)
+        with self.metrics.span("step2.positions"):
+            positions = self.position_calculator.get_positions(data=price_window,
+                                                               n_asset_buy=self.n_asset_buy,
+                                                               n_asset_sell=self.n_asset_sell)
+        decision_ms = self.api_handler.clock_sync.now_ms() # Decision time of the orders placed in step 3
 
-        symbols_to_trade = [p.symbol for p in positions]
         self.logger.info(f"Symbols to trade: {[f"{p.symbol}:{p.position}" for p in positions]}")
         
         n_active = sum([abs(p.position) for p in positions])
 
+        self.metrics.end_span("step2")
         self.logger.info("Step 2 is finished.")
         self.logger.info("")
 
@@ -273,13 +689,14 @@ class TradingDesk:
         : Open new positions
         """
         self.logger.info("Step 3 starts.")
+        self.metrics.start_span("step3")
 
         # Calculate budget allocation (amount) for each asset
         if self.is_mock:
             available_balance = self.capital
         else:
-            balance_info = self.api_handler.get_balance(symbol="USDT")
-            available_balance = float(balance_info["availableBalance"])
+            # Every traded asset was flattened in step 1
+            available_balance = self.get_available_balance(expected_positions={symbol: 0.0 for symbol in self.traded_assets})
 
         if self.asset_weight_type=="equal":
             amount = available_balance / n_active
@@ -291,100 +708,140 @@ class TradingDesk:
         else:
             raise NotImplementedError(f"Asset weight type '{self.asset_weight_type}' is not supported yet")
 
-        # Make (mock) order for each asset
-        for symbol in self.traded_assets:
-            position = next((p for p in positions if p.symbol == symbol), None)
+        # Calculate order quantity for each asset concurrently (price, precision, minimum order quantity)
+        prepared = self.order_executor.run({
+            position.symbol: (lambda position=position: self.prepare_order(position=position))
+            for position in positions
+        })
 
-            if symbol in symbols_to_trade:
-                fetched_price = self.api_handler.get_current_price(symbol=position.symbol)
-                position.fetched_price = fetched_price
+        order_legs = []
 
-                quantity_precision = get_quantity_precision(api_handler=self.api_handler,
-                                                            symbol=symbol)
-                
-                factor = 10**quantity_precision
-                quantity = position.amount/fetched_price # Order quantity is calculated using last-traded-price fetched from '/fapi/v1/ticker/price'.
-                quantity_rounded_down = math.floor((quantity*0.95)*factor)/factor # 1. decrease quantity by multiplying 0.95 as a safety buffer
-                                                                                  #    to avoid error {"code":-2019,"msg":"Margin is insufficient."}
-                                                                                  # 2. round down at quantity precision decimal points
-
-                min_order_quantity = get_min_order_quantity(api_handler=self.api_handler,
-                                                            symbol=symbol)
-
-                ## Do NOT place order if calculated quantity is less then minimum order quantity
-                if quantity_rounded_down < min_order_quantity:
-                    self.logger.info(f"Order for {symbol} is not executed because "
-                                     f"the calculated order quantity {quantity_rounded_down} is "
-                                     f"below the current minimum order quantity {min_order_quantity}.")
-                    
-                    position.quantity = 0
-                    position.entry_price = 0
-                    position.amount = 0
-                    self.positions_holding.append(position)
-                    continue
+        for position in positions:
+            result = prepared[position.symbol]
 
-                ## Order placement
-                if self.is_mock:
-                    """
-                    Fee deduction example: open short -> close with long
-                    
-                    Quantity |  Price  | Position | Executed |     Fee    | Fee deducted |  balance
-                    ---------------------------------------------------------------------------------
-                             |         |          |          |            |              |  6.742414
-                         3.1 |  2.1915 |       -1 |  6.7937  | 0.00339683 |       6.7903 | 13.532667
-                         3.1 |  2.1908 |        1 | -6.7915  | 0.00339574 |      -6.7949 |  6.737791
-                    """
-                    order_amount = -1*position.position*quantity_rounded_down*fetched_price              # `Executed`
-                    order_amount_after_fee = order_amount*(1 + position.position*self.transaction_cost)  # `Fee deducted`
-                    
-                    position.quantity = quantity_rounded_down
-                    position.entry_price = fetched_price
-                    position.amount = order_amount_after_fee
+            # Like a failed order leg: the asset stays flat, the other legs are kept
+            if not result.ok:
+                self.logger.error(f"Order for {position.symbol} is not placed: preparing it failed: {result.error}")
+                self.metrics.record_failure(symbol=position.symbol, stage="prepare", error=result.error)
 
-                    # Update balance status
-                    if position.position==1:
-                        self.collateral_long += abs(order_amount_after_fee)
-                    if position.position==-1:
-                        self.collateral_short += abs(order_amount_after_fee)
+                position.quantity = 0
+                position.entry_price = 0
+                position.amount = 0
+                continue
 
-                    self.capital += order_amount_after_fee
+            quantity_rounded_down, min_order_quantity = result.response
+
+            ## Do NOT place order if calculated quantity is less then minimum order quantity
+            if quantity_rounded_down < min_order_quantity:
+                self.logger.info(f"Order for {position.symbol} is not executed because "
+                                 f"the calculated order quantity {quantity_rounded_down} is "
+                                 f"below the current minimum order quantity {min_order_quantity}.")
+                
+                position.quantity = 0
+                position.entry_price = 0
+                position.amount = 0
+                continue
+
+            # Determine side
+            if position.position == 1:
+                side = "BUY"
+            elif position.position == -1:
+                side = "SELL"
+
+            order_legs.append(OrderLeg(symbol=position.symbol,
+                                       side=side,
+                                       quantity=quantity_rounded_down))
+
+        # Place every (mock) order at once
+        if not self.is_mock:
+            with self.metrics.span("step3.orders"):
+                fills = self.order_executor.place_market_orders(order_legs)
+            self.record_fill_latency(legs=order_legs,
+                                     results=fills,
+                                     decision_ms=decision_ms)
+
+            # A failed leg may still have executed (e.g. -1007 resolved as 'UNKNOWN_BUT_POSITION_CHANGED'):
+            # read the real positions of the failed legs with one positionRisk call
+            failed_symbols = [leg.symbol for leg in order_legs if not fills[leg.symbol].ok]
+            if failed_symbols:
+                try:
+                    exchange_positions = self.position_reconciler.fetch()
+                except Exception as e:
+                    raise RuntimeError(f"Cannot reconcile failed orders of {failed_symbols}.") from e
+
+        for leg in order_legs:
+            position = next(p for p in positions if p.symbol == leg.symbol)
+
+            if self.is_mock:
+                fetched_price = position.fetched_price
+
+                order_amount_after_fee = mock_fill_amount(position=position.position,
+                                                          quantity=leg.quantity,
+                                                          price=fetched_price,
+                                                          transaction_cost=self.transaction_cost)
+                
+                position.quantity = leg.quantity
+                position.entry_price = fetched_price
+                position.amount = order_amount_after_fee
+
+            else:
+                result = fills[leg.symbol]
+
+                if result.ok:
+                    res = result.response
 
-                else:
-                    # Determine side
-                    if position.position == 1:
-                        side = "BUY"
-                    elif position.position == -1:
-                        side = "SELL"
-
-                    # Place order
-                    res = self.api_handler.place_market_order(symbol=position.symbol,
-                                                              side=side, 
-                                                              quantity=quantity_rounded_down)
-                    
-                    if res["status"] != "FILLED":
-                        err = RuntimeError(
-                            f"Order not filled: status={res["status"]}"
-                        )
-
-                        raise err
-                    
                     # Update position information based on the response
                     position.quantity = float(res["executedQty"]) # negative if short position
                     position.entry_price = float(res["avgPrice"])
                     order_amount_after_fee = -1*position.position*float(res["cumQuote"])*(1 + position.position*self.transaction_cost)  # `Fee deducted`
                     position.amount = order_amount_after_fee
 
-                    # Update balance status
-                    if position.position==1:
-                        self.collateral_long += abs(order_amount_after_fee)
-                    if position.position==-1:
-                        self.collateral_short += abs(order_amount_after_fee)
+                else:
+                    self.logger.error(f"Order for {leg.symbol} failed: {result.error}")
+                    self.metrics.record_failure(symbol=leg.symbol, stage="order", error=result.error)
+
+                    actual = float(exchange_positions[leg.symbol]["positionAmt"]) if leg.symbol in exchange_positions else 0.0
+
+                    # Not executed: the asset stays flat. The other legs are kept.
+                    if actual == 0:
+                        position.quantity = 0
+                        position.entry_price = 0
+                        position.amount = 0
+                        continue
+
+                    if actual*position.position < 0:
+                        raise RuntimeError(f"{leg.symbol} holds {actual} on the exchange after a failed {leg.side} order.")
+
+                    # Executed: book the exchange position
+                    self.logger.warning(f"Order for {leg.symbol} was executed: booking the exchange position {actual}.")
+                    position.quantity = abs(actual)
+                    position.entry_price = float(exchange_positions[leg.symbol]["entryPrice"])
+                    order_amount_after_fee = -1*position.position*position.quantity*position.entry_price*(1 + position.position*self.transaction_cost)  # `Fee deducted`
+                    position.amount = order_amount_after_fee
 
-                    balance_info = self.api_handler.get_balance(symbol="USDT")
-                    self.capital = float(balance_info["availableBalance"])
-                    
+            # Update balance status
+            if position.position==1:
+                self.collateral_long += abs(order_amount_after_fee)
+            if position.position==-1:
+                self.collateral_short += abs(order_amount_after_fee)
 
-            else:
+            if self.is_mock:
+                self.capital += order_amount_after_fee
+
+        if not self.is_mock:
+            # Symbol filters may have changed since the last exchangeInfo snapshot
+            if any(not fills[leg.symbol].ok and is_filter_rejection(fills[leg.symbol].error) for leg in order_legs):
+                self.logger.warning("Order was rejected by symbol filters. Refreshing exchange metadata.")
+                self.metadata_cache.refresh()
+
+            # Read the balance once after every leg is filled
+            self.capital = self.get_available_balance(expected_positions={p.symbol: p.position*abs(p.quantity)
+                                                                          for p in positions if p.quantity != 0})
+
+        for symbol in self.traded_assets:
+            position = next((p for p in positions if p.symbol == symbol), None)
+
+            if position is None:
                 position = Position(
                                symbol=symbol,
                                position=0,
@@ -394,29 +851,33 @@ class TradingDesk:
                                amount=0
                            )
 
-
             self.positions_holding.append(position)
+            self.exit_engine.arm(position) # Flat positions are ignored
 
         self.logger.info("All positions are successfully opened.")
 
-        add_transaction_log(worksheet=self.g_worksheets_mock,
-                            positions_to_record=self.positions_holding,
-                            open_close="open",
-                            collateral_long=self.collateral_long, 
-                            collateral_short=self.collateral_short,
-                            capital=self.capital,
-                            logger=self.logger)
+        self.record_transaction(positions_to_record=self.positions_holding,
+                                open_close="open")
+        self.save_state()
         
         # self.logger.info(f"positions_holding = {self.positions_holding}")
         
+        self.metrics.end_span("step3")
         self.logger.info("Step 3 is finished.")
         self.logger.info("")
 
     def run_strategy(self,
-                     scheduler):
+                     scheduler,
+                     job_id:Optional[str]=None):
+        """
+        `job_id`: this session's job in a scheduler shared by several sessions.
+        On failure only that job is removed, instead of shutting the scheduler down.
+        """
+        self.metrics.begin_run()
 
         try:
-            self.strategy_func()
+            with self.state_lock:
+                self.strategy_func()
 
         except Exception as e:
             self.logger.exception("Error occurred")
@@ -428,40 +889,191 @@ class TradingDesk:
             # Clear remaining positions before shutting eveyything down, if it is not mock trading session
             if self.positions_holding: # If positions_holding is not empty
                 if not self.is_mock:
-                    for position in self.positions_holding[:]: # Iterate over a shallow copy
-                        res = self.close_position(symbol=position.symbol)
+                    close_results = self.close_positions(symbols=[position.symbol for position in self.positions_holding
+                                                                  if position.quantity != 0])
+
+                    for symbol, result in close_results.items():
+                        if not result.ok:
+                            self.logger.error(f"Failed to clear position of {symbol}: {result.error}")
             else:
                 self.logger.info("No open position. Session terminates immediately.")
 
-            scheduler.shutdown(wait=False)
+            self.kill_switch.stop()
+            self.exit_poll_stop.set()
+            if self.user_stream is not None:
+                self.user_stream.stop()
+            if self.sheet_writer is not None:
+                self.sheet_writer.stop(timeout=30) # Final flush of queued logs
+            if self.ledger is not None:
+                self.ledger.close()
+            if self.metrics_server is not None:
+                self.metrics_server.stop()
+            if job_id is not None:
+                scheduler.remove_job(job_id)
+                if not scheduler.get_jobs(): # Last session of the process
+                    scheduler.shutdown(wait=False)
+            else:
+                scheduler.shutdown(wait=False)
+
+        finally:
+            summary = self.metrics.end_run()
+            if summary is not None and self.metrics_dir is not None:
+                try:
+                    self.metrics.write_summary(path=os.path.join(self.metrics_dir, f"{self.session_name}.jsonl"),
+                                               summary=summary)
+                except Exception:
+                    self.logger.exception("Failed to write the run summary.")
 
     def observe_and_clear(self,
                           scheduler):
-
+        """
+        Feed REST prices to the exit engine.
+        Not scheduled by default: the price stream drives the exit engine on every update,
+        and `poll_exit_prices` covers the symbols whose stream is down.
+        """
         for position in self.positions_holding[:]: # Iterate over a shallow copy
             if position.quantity != 0: # If currently holding this asset
+                self.exit_engine.on_price(position.symbol, self.get_price(symbol=position.symbol))
+
+
+    def poll_exit_prices(self):
+        """
+        Every `exit_poll_interval` seconds, feed REST prices to the exits of held symbols whose price stream is disconnected.
+        """
+        while not self.exit_poll_stop.wait(self.exit_poll_interval):
+            for position in self.positions_holding[:]: # Iterate over a shallow copy
+                if position.quantity == 0 or self.price_stream.is_connected(position.symbol):
+                    continue
 
-                price_entry = position.entry_price
-                fetched_price = self.api_handler.get_current_price(symbol=position.symbol)
+                try:
+                    price = self.api_handler.get_current_price(symbol=position.symbol)
+                except Exception as e:
+                    self.logger.warning(f"REST price of {position.symbol} for exits failed: {e}")
+                    continue
 
+                self.exit_engine.on_price(position.symbol, price)
 
-                if position.position*((fetched_price/price_entry)-1) > 0.015: 
-                    position_for_clearing = -1*position.position
+
+    def on_exit_triggered(self,
+                          position:Position,
+                          reason:str,
+                          price:float):
+        # Called from the price stream thread: hand the order over to the exit worker
+        self.exit_worker.submit(self.early_clear, position=position, reason=reason, trigger_price=price)
+
+
+    def is_holding(self,
+                   position:Position):
+        """
+        Whether `position` (this exact object, not only its symbol) is still held.
+        """
+        return position.quantity != 0 and any(p is position for p in self.positions_holding)
+
+
+    def rearm_exit(self,
+                   position:Position):
+        with self.state_lock:
+            if self.is_holding(position): # Not replaced by a rebalance meanwhile
+                self.exit_engine.arm(position)
+
+
+    def retry_exit_later(self,
+                         position:Position):
+        """
+        Re-arm the exit of `position` after a per-symbol delay that doubles on every failure.
+        """
+        delay = self.exit_retry_delays.get(position.symbol, self.exit_retry_min_delay)
+        self.exit_retry_delays[position.symbol] = min(2*delay, self.exit_retry_max_delay)
+        self.logger.info(f"Exit of {position.symbol} is re-armed in {delay}s.")
+
+        timer = threading.Timer(delay, self.rearm_exit, kwargs={"position": position})
+        timer.daemon = True
+        timer.start()
+
+
+    def drop_position(self,
+                      position:Position):
+        """
+        Forget a position the exchange reports flat (closed outside the desk, e.g. liquidated or manually).
+        """
+        self.positions_holding.remove(position)
+
+        if position.position==1:
+            self.collateral_long -= abs(position.amount)
+        if position.position==-1:
+            self.collateral_short -= abs(position.amount)
+
+        self.capital = self.get_available_balance()
+        self.save_state()
+
+
+    def early_clear(self,
+                    position:Position,
+                    reason:str,
+                    trigger_price:float):
+        symbol = position.symbol
+
+        with self.state_lock:
+            # The exit fired for this exact object. A rebalance may have closed it and reopened the symbol
+            # while the exit waited for the lock: the new position must not be flattened.
+            if not self.is_holding(position):
+                self.logger.info(f"Skipped {reason} exit of {symbol}: the position was closed by a rebalance.")
+                return
+
+            price_entry = position.entry_price
+            position_for_clearing = -1*position.position
+
+            try:
+                if self.is_mock:
+                    price_clear = trigger_price
+                    amount_clearing_after_fee = mock_fill_amount(position=position_for_clearing,
+                                                                 quantity=position.quantity,
+                                                                 price=price_clear,
+                                                                 transaction_cost=self.transaction_cost)
+                else:
                     res = self.close_position(symbol=position.symbol)
 
                     price_clear = float(res["avgPrice"])
-                    side = "BUY" if position.position==1 else "SELL"
-                    self.logger.info(f"Early-cleared {side} position of {position.symbol}. Return: {(price_clear/price_entry-1)*100:.3f}%.")
+                    amount_clearing_after_fee = float(res["cumQuote"])*(1 + position_for_clearing*self.transaction_cost)  # `Fee deducted`
 
-                    self.positions_holding.remove(position)
+            except Exception:
+                self.logger.exception(f"Failed to early-clear position of {symbol} ({reason}).")
 
-                    # Update balance status
-                    if position.position==1:
-                        self.collateral_long -= abs(position.amount)
-                    if position.position==-1:
-                        self.collateral_short -= abs(position.amount)
+                is_flat = False
+                if not self.is_mock:
+                    try:
+                        is_flat = symbol not in self.position_reconciler.fetch()
+                    except Exception:
+                        pass
+
+                if is_flat:
+                    self.logger.warning(f"{symbol} is flat on the exchange. The position is dropped.")
+                    self.drop_position(position)
+                else:
+                    self.retry_exit_later(position) # Keep watching the position, without retriggering on every tick
+                return
 
-                    position_for_clearing = -1*position.position
-                    amount_clearing_after_fee = float(res["cumQuote"])*(1 + position_for_clearing*self.transaction_cost)  # `Fee deducted`
-                    self.capital += amount_clearing_after_fee
+            self.exit_retry_delays.pop(symbol, None)
+
+            side = "BUY" if position.position==1 else "SELL"
+            self.logger.info(f"Early-cleared {side} position of {position.symbol} ({reason}). Return: {(price_clear/price_entry-1)*100:.3f}%.")
+
+            self.positions_holding.remove(position)
+
+            # Update balance status
+            if position.position==1:
+                self.collateral_long -= abs(position.amount)
+            if position.position==-1:
+                self.collateral_short -= abs(position.amount)
+
+            self.capital += amount_clearing_after_fee
 
+            self.record_transaction(positions_to_record=[Position(symbol=position.symbol,
+                                                                  position=position_for_clearing,
+                                                                  fetched_price=trigger_price,
+                                                                  entry_price=price_clear,
+                                                                  quantity=position.quantity,
+                                                                  amount=amount_clearing_after_fee)],
+                                    open_close="exit",
+                                    mirror=False)
+            self.save_state()